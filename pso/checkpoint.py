@@ -0,0 +1,70 @@
+"""
+This module writes and reads checkpoints: the complete state of an
+optimization (see Optimization.save_checkpoint) in a single binary file,
+so a run that was interrupted can continue exactly where it was.
+
+A checkpoint is an uncompressed .npz file. Every array of the state is
+stored as it is (float64 arrays barely compress), and the rest of the
+state (numbers, strings and the states of the random generators, whose
+integers can be larger than 64 bits) is stored as a JSON string. The file
+is written next to its destination and then renamed, so an interruption
+while writing never leaves a broken checkpoint behind.
+
+## Functions
+- save_checkpoint(path: str, state: dict) -> None
+- load_checkpoint(path: str) -> dict
+"""
+
+import json
+import os
+
+import numpy as np
+
+FORMAT_VERSION: int = 1
+# * Name of the JSON entry of the file
+STATE_KEY: str = "__state__"
+
+def _split(value, path: str, arrays: dict[str, np.ndarray]):
+    """Returns the value with its arrays replaced by references to the
+    entries of arrays where they are moved."""
+    if isinstance(value, np.ndarray):
+        arrays[path] = value
+        return {"__array__": path}
+    if isinstance(value, dict):
+        return {key: _split(item, f"{path}/{key}", arrays) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_split(item, f"{path}/{index}", arrays) for index, item in enumerate(value)]
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+def _join(value, arrays):
+    """Inverse of _split."""
+    if isinstance(value, dict):
+        if set(value) == {"__array__"}:
+            return arrays[value["__array__"]]
+        return {key: _join(item, arrays) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_join(item, arrays) for item in value]
+    return value
+
+def save_checkpoint(path: str, state: dict) -> None:
+    """Writes the state (a dict of arrays, numbers, strings, lists and
+    dicts) to path."""
+    arrays: dict[str, np.ndarray] = {}
+    structure: dict = _split(state, "state", arrays)
+    directory: str = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(f"{path}.tmp", "wb") as checkpoint_file:
+        np.savez(checkpoint_file, **arrays, **{STATE_KEY: np.array(json.dumps({"format": FORMAT_VERSION, "state": structure}))})
+    os.replace(f"{path}.tmp", path)
+
+def load_checkpoint(path: str) -> dict:
+    """Returns the state written to path by save_checkpoint."""
+    with np.load(path) as checkpoint:
+        header: dict = json.loads(str(checkpoint[STATE_KEY]))
+        if header.get("format") != FORMAT_VERSION:
+            raise ValueError(f"Unknown checkpoint format {header.get('format')} in {path}.")
+        arrays: dict[str, np.ndarray] = {name: checkpoint[name] for name in checkpoint.files if name != STATE_KEY}
+    return _join(header["state"], arrays)
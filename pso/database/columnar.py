@@ -0,0 +1,109 @@
+"""
+This module exports the history of an optimization in a columnar layout,
+one numeric column per coordinate, for analytics that read many runs
+(parsing the strings of the workbook back into floats is much slower).
+
+The columns are iteration, particle, heuristic, is_gbest and, for every
+coordinate i, position_i, velocity_i and pbest_i, with one row per
+particle and recorded iteration. A Trace (see pso.recording) is exported
+with its own columns, one row per recorded iteration. The metadata of the
+run (the header of the history, see History.get_metadata, plus anything
+passed along) is stored with them.
+
+Parquet and Arrow (Feather) files need pyarrow, which is optional. Without
+it, the export falls back to a compressed NPZ file.
+
+## Functions
+- columnar_formats() -> tuple[str, ...]
+- history_columns(history: History | Trace) -> dict[str, np.ndarray]
+- export_history(history: History | Trace, path: str, file_format: str = "auto", metadata: dict = None) -> str
+- read_columns(path: str) -> tuple[dict[str, np.ndarray], dict]
+"""
+
+import json
+import os
+
+import numpy as np
+
+from pso.history import History, Trace
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as pa_feather
+    import pyarrow.parquet as pa_parquet
+except ImportError:
+    # ! Without pyarrow only the NPZ format is available
+    pa = None
+
+# * The extension of every format
+EXTENSIONS: dict[str, str] = {"parquet": ".parquet", "arrow": ".arrow", "npz": ".npz"}
+# * Key of the metadata in the schema of Parquet and Arrow files and in NPZ files
+METADATA_KEY: str = "pso"
+
+def columnar_formats() -> tuple[str, ...]:
+    """Returns the formats available with the installed packages."""
+    return ("parquet", "arrow", "npz") if pa is not None else ("npz",)
+
+def history_columns(history: History | Trace) -> dict[str, np.ndarray]:
+    """Returns the columns of the recorded iterations of the history, every
+    coordinate column being a view of the arrays (reshaped, not copied)."""
+    if isinstance(history, Trace):
+        return history.get_columns()
+    fitness: np.ndarray = history.get_fitness()
+    iterations, particle_amount = fitness.shape
+    columns: dict[str, np.ndarray] = {
+        "iteration": np.repeat(history.get_iteration_numbers().astype(np.int64), particle_amount),
+        "particle": np.tile(np.arange(particle_amount, dtype=np.int64), iterations),
+        "heuristic": fitness.reshape(-1),
+        "is_gbest": (np.arange(particle_amount) == history.get_gbest_indexes()[:, np.newaxis]).reshape(-1)}
+    for name, array in (("position", history.get_positions()), ("velocity", history.get_velocities()), ("pbest", history.get_pbests())):
+        flat: np.ndarray = array.reshape(-1, history.get_dimensions())
+        for coordinate in range(history.get_dimensions()):
+            columns[f"{name}_{coordinate}"] = flat[:, coordinate]
+    return columns
+
+def export_history(history: History | Trace, path: str, file_format: str = "auto", metadata: dict = None) -> str:
+    """Writes the history to path (its extension is added if missing) as a
+    columnar file and returns the path written. The format "auto" is
+    Parquet if pyarrow is installed and NPZ otherwise."""
+    if file_format == "auto":
+        file_format = columnar_formats()[0]
+    if file_format not in EXTENSIONS:
+        raise ValueError(f"Unknown columnar format {file_format}, it must be one of {tuple(EXTENSIONS)}.")
+    if file_format not in columnar_formats():
+        raise ImportError(f"The {file_format} format needs pyarrow, which is not installed.")
+    if not path.endswith(EXTENSIONS[file_format]):
+        path += EXTENSIONS[file_format]
+    header: dict = history.get_metadata()
+    # * The shapes of the arrays are replaced by the ones of the columns
+    header.pop("arrays", None)
+    header.update(metadata or {})
+    header_json: str = json.dumps(header)
+    columns: dict[str, np.ndarray] = history_columns(history)
+    directory: str = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    if file_format == "npz":
+        # * A 0-d string array, so it is read back without pickle
+        np.savez_compressed(path, **columns, **{f"__{METADATA_KEY}_metadata__": np.array(header_json)})
+        return path
+    table = pa.table(columns).replace_schema_metadata({METADATA_KEY: header_json})
+    if file_format == "parquet":
+        pa_parquet.write_table(table, path, compression="zstd")
+    else:
+        pa_feather.write_feather(table, path, compression="zstd")
+    return path
+
+def read_columns(path: str) -> tuple[dict[str, np.ndarray], dict]:
+    """Returns the columns and the metadata of a file written by
+    export_history, in any of the formats."""
+    if path.endswith(EXTENSIONS["npz"]):
+        with np.load(path) as npz:
+            metadata_key: str = f"__{METADATA_KEY}_metadata__"
+            metadata: dict = json.loads(str(npz[metadata_key]))
+            return {name: npz[name] for name in npz.files if name != metadata_key}, metadata
+    if pa is None:
+        raise ImportError(f"Reading {path} needs pyarrow, which is not installed.")
+    table = pa_parquet.read_table(path) if path.endswith(EXTENSIONS["parquet"]) else pa_feather.read_table(path)
+    metadata = json.loads(table.schema.metadata[METADATA_KEY.encode()])
+    return {name: table.column(name).to_numpy() for name in table.column_names}, metadata
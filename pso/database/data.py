@@ -1,38 +1,201 @@
+import atexit
 import os
+import queue
+import threading
 
 import numpy as np
 import openpyxl as px
 import openpyxl.styles as px_styles
 import openpyxl.worksheet.worksheet as px_worksheet
 import pandas as pd
+import xlsxwriter
+import xlsxwriter.worksheet
+
+from pso.database.columnar import export_history
+from pso.history import History, Trace
+
+# * The libraries that can write the workbook
+ENGINES: tuple[str, ...] = ("xlsxwriter", "openpyxl")
+
+def _iteration_rows(optimization: History | pd.DataFrame):
+    """Yields, for every recorded iteration of the optimization, its number
+    and a list with the four vectors (heuristic, position, velocity and
+    pbest) of every particle, rounded to two decimals and joined as strings
+    like the cells of the workbook. A History is read one iteration at a
+    time, so a memory-mapped one is never loaded whole."""
+    if isinstance(optimization, History):
+        iteration_numbers: list[int] = optimization.get_iteration_numbers().tolist()
+        for iteration_num in range(optimization.get_iterations_recorded()):
+            positions: np.ndarray = np.round(optimization.get_positions()[iteration_num], 2)
+            heuristic: np.ndarray = np.round(np.column_stack((optimization.get_positions()[iteration_num], optimization.get_fitness()[iteration_num])), 2)
+            arrays: tuple[list, ...] = (heuristic.tolist(), positions.tolist(),
+                np.round(optimization.get_velocities()[iteration_num], 2).tolist(), np.round(optimization.get_pbests()[iteration_num], 2).tolist())
+            yield iteration_numbers[iteration_num], [[", ".join(map(str, array[particle])) for array in arrays] for particle in range(optimization.get_particle_amount())]
+        return
+    # * A DataFrame in the layout of History.to_dataframe, whose iterations are separated by rows of nan's
+    vectors: list[list[str]] = []
+    iteration_num: int = 0
+    for record in optimization.to_records(index=False):
+        if not isinstance(record[0], np.ndarray):
+            yield iteration_num, vectors
+            vectors = []
+            iteration_num += 1
+            continue
+        vectors.append([", ".join(map(str, value.tolist())) for value in record])
+    if vectors:
+        yield iteration_num, vectors
+
+def _trace_rows(trace: Trace) -> list[list]:
+    """Returns the rows of values of a trace, with None (a blank cell) in
+    place of the values that are not finite, which the cells of a workbook
+    can not hold."""
+    values: np.ndarray = np.column_stack(list(trace.get_columns().values()))
+    return np.where(np.isfinite(values), values, None).tolist()
 
 class Data:
-    def __init__(self, excel_file_name: str) -> None:
-        self.__particle_history: list[pd.DataFrame] = []
+    def __init__(self, excel_file_name: str, columnar_format: str = None, engine: str = "openpyxl", autosave: bool = False, background: bool = False, queue_size: int = 4, keep_histories: bool = True) -> None:
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine {engine}, it must be one of {ENGINES}.")
+        # * Histories are kept as they are and only turned into DataFrames when needed.
+        # * Without keep_histories (and autosave, which rewrites them) every sheet is written once and forgotten
+        self.__keep_histories: bool = keep_histories or autosave
+        self.__particle_history: list[History | Trace | pd.DataFrame] = []
         self.__gbest_history: list[list[int]] = []
+        self.__stopping_reasons: list[str] = []
         self.__number_of_optimizations: int = 0
         self.__xlsx_name: str = excel_file_name # * Without the extension and directory
         self.__xlsx_path: str = f"database/optimization_results/{self.__xlsx_name}.xlsx" # * It is determined if it exists in Main
+        # * Where the files of the session other than the workbook (e.g. memory-mapped histories) are kept
+        self.__session_directory: str = f"database/optimization_results/{self.__xlsx_name}"
+        # * If set ("auto", "parquet", "arrow" or "npz"), every History is also exported in a columnar file of the session directory
+        self.__columnar_format: str = columnar_format
+        self.__columnar_paths: list[str] = []
+        # * openpyxl (the default) loads and saves the file to add a sheet per optimization, so it is complete after each one.
+        # * xlsxwriter streams the sheet of every optimization to the workbook of the session, which is finished by save or close
+        self.__engine: str = engine
+        # * If xlsxwriter rewrites the whole workbook after every optimization, so the file is complete after each one.
+        # * Its cost grows with the session, so by default every sheet is written once and the file finished by save
+        self.__autosave: bool = autosave
+        # * The open workbook of the session and its formats, and the sheets of the last one finished
+        self.__workbook: xlsxwriter.Workbook = None
+        self.__formats: dict = None
+        self.__sheets_saved: int = 0
+        self.__exit_registered: bool = False
+        # * If the optimizations are written by a background thread, so the runs don't wait for the disk.
+        # * The queue is bounded: when it is full, append_optimization blocks until the writer catches up
+        self.__background: bool = background
+        self.__queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self.__writer: threading.Thread = None
+        # * The first error of the writer, raised in the next call of append_optimization, flush or close
+        self.__writer_error: BaseException = None
         # * The two dots are needed if the GUI is directly executed.
         # ! For now, the execution will continue to be done in the gui.py file, but the final version MUST CHANGE the paths to execute everything from the main.py file.
     def append_gbest_indexes(self, optimization_gbest_indexes: list[int]) -> None:
         self.__gbest_history.append(optimization_gbest_indexes)
         self.__number_of_optimizations += 1
     
-    def append_optimization(self, optimization_df: pd.DataFrame) -> None:
+    def append_stopping_reason(self, stopping_reason: str) -> None:
+        self.__stopping_reasons.append(stopping_reason)
+
+    def append_optimization(self, optimization: History | Trace | pd.DataFrame) -> None:
         # TODO: Test the whole class with multiple sessions and files. Also, update and add documentation and the class diagram.
-        
         if "optimization_results" not in os.listdir("database"):
             os.mkdir("database/optimization_results")
-            
+
+        if self.__engine == "xlsxwriter" and not self.__autosave and self.__sheets_saved > 0 and not self.__keep_histories:
+            raise ValueError("The workbook of the session was already saved, appending to it needs keep_histories=True to rewrite its sheets.")
+        if self.__keep_histories:
+            self.__particle_history.append(optimization)
+        if not self.__background:
+            self.__persist(optimization, self.__number_of_optimizations)
+            return
+        self.__raise_writer_error()
+        if self.__writer is None:
+            self.__writer = threading.Thread(target=self.__write_in_background, name=f"Data writer ({self.__xlsx_name})", daemon=True)
+            self.__writer.start()
+            # * The thread is a daemon, so whatever is still queued is written before the interpreter exits
+            self.__register_exit()
+        self.__queue.put((optimization, self.__number_of_optimizations))
+
+    def __persist(self, optimization: History | Trace | pd.DataFrame, optimization_number: int) -> None:
+        """Writes an optimization to the workbook (and the columnar file)."""
+        if self.__engine == "openpyxl" and isinstance(optimization, Trace):
+            self.__append_trace_sheet(optimization, optimization_number)
+        elif self.__engine == "openpyxl":
+            optimization_df: pd.DataFrame = optimization.to_dataframe() if isinstance(optimization, History) else optimization
+            iteration_numbers: list[int] = optimization.get_iteration_numbers().tolist() if isinstance(optimization, History) else None
+            self.__append_sheet(optimization_df, optimization_number, iteration_numbers)
+        elif not self.__autosave:
+            self.__stream_sheet(optimization, optimization_number)
+        # * In the background, a rewrite is skipped if other optimizations are waiting, the last one writes them all
+        elif not self.__background or self.__queue.unfinished_tasks <= 1:
+            self.__write_workbook()
+        if self.__columnar_format is not None and isinstance(optimization, (History, Trace)):
+            self.export_columnar(optimization, optimization_number)
+
+    def __write_in_background(self) -> None:
+        while True:
+            item: tuple = self.__queue.get()
+            try:
+                if item is None:
+                    return
+                self.__persist(*item)
+            except BaseException as error:
+                if self.__writer_error is None:
+                    self.__writer_error = error
+            finally:
+                self.__queue.task_done()
+
+    def __raise_writer_error(self) -> None:
+        error: BaseException = self.__writer_error
+        if error is not None:
+            self.__writer_error = None
+            raise error
+
+    def flush(self) -> None:
+        """Waits until every optimization appended so far is written, and
+        raises the error of the background writer if it failed."""
+        if self.__writer is not None:
+            self.__queue.join()
+        self.__raise_writer_error()
+
+    def close(self) -> None:
+        """Flushes and stops the background writer and finishes the
+        workbook of the session (see save). Appending again starts a new
+        writer."""
+        if self.__exit_registered:
+            atexit.unregister(self.close)
+            self.__exit_registered = False
+        if self.__writer is not None:
+            writer: threading.Thread = self.__writer
+            self.__writer = None
+            # * Only put once the queue is empty, so no rewrite is skipped in favor of the sentinel
+            self.__queue.join()
+            self.__queue.put(None)
+            writer.join()
+            self.__raise_writer_error()
+        self.__finish_workbook()
+
+    def __register_exit(self) -> None:
+        """Makes sure close is called when the interpreter exits, so the
+        queued optimizations are written and the workbook is finished."""
+        if not self.__exit_registered:
+            atexit.register(self.close)
+            self.__exit_registered = True
+
+    def __append_sheet(self, optimization_df: pd.DataFrame, optimization_number: int, iteration_numbers: list[int] = None) -> None:
+        """Adds the sheet of the last optimization to the workbook with
+        openpyxl, which loads and saves the whole file. The iterations are
+        numbered from 0 unless their numbers are given."""
         # ? We may want to implement this using with
         
-        if self.__xlsx_name not in os.listdir():
+        # * Only once per file, creating it again would discard the sheets of the previous optimizations
+        if not os.path.exists(self.__xlsx_path):
             self.create_spreadsheet()
         
         # * Open the workbook and CREATE THE SHEET
         workbook: px.Workbook = px.load_workbook(self.__xlsx_path)
-        sheet_number: int = self.__number_of_optimizations
+        sheet_number: int = optimization_number
         sheet_name: str = f"Optimization {sheet_number}"
         if sheet_name not in workbook.sheetnames:
             workbook.create_sheet(title=f"Optimization {sheet_number}")
@@ -70,7 +233,7 @@ class Data:
         # * Setting and styling the TITLE
         sheet.merge_cells("B2:G2")
         sheet.row_dimensions[2].height = 45
-        sheet["B2"] = f"PSO optimization session {self.__number_of_optimizations} results"
+        sheet["B2"] = f"PSO optimization session {optimization_number} results"
         title_cell = sheet.cell(row=2, column=2)
         title_cell.alignment = px_styles.Alignment(horizontal="center",
             vertical="center")
@@ -79,6 +242,8 @@ class Data:
         title_cell.fill = px_styles.GradientFill(stop=("085063", "d6e416"),
             type="linear", degree=90) # ! Replace for a Color attribute once the branch is merged. AND CHECK THE GRADIENT
         title_cell.border = title_border
+        if len(self.__stopping_reasons) >= optimization_number > 0:
+            sheet["I2"] = f"Stopping reason: {self.__stopping_reasons[optimization_number - 1]}"
         
         # * Naming the columns by naming and styling their HEADERS
         sheet["B3"] = "Iteration"
@@ -109,13 +274,14 @@ class Data:
         # * Couting the AMOUNT OF PARTICLES
         # ? It could be passed as a parameter of the class's constructor
         number_of_particles: int = 0
-        while optimization_records[number_of_particles][0] is not np.nan:
+        # * A single recorded iteration has no spacing row to stop at
+        while number_of_particles < len(optimization_records) and isinstance(optimization_records[number_of_particles][0], np.ndarray):
             number_of_particles += 1
         particle_index: int = 1
         # * Setting the particle indexes in the "C" column and styling them
         for row in range(optimization_df.shape[0]):
             cell = sheet.cell(row=row + 4, column=3)
-            if optimization_records[row][0] is not np.nan:
+            if isinstance(optimization_records[row][0], np.ndarray):
                 cell.value = particle_index
                 cell.alignment = px_styles.Alignment(horizontal="center",
                     vertical="center")
@@ -135,9 +301,10 @@ class Data:
         ending_row: str = number_of_particles + 3
         iteration_number: int = 0
         # ! The condition of the while cycle is the reason the number_of_iterations is not needed
-        while starting_row < optimization_df.shape[0]:
+        # * The data starts at row 4, so its last row is the row shape[0] + 3
+        while starting_row <= optimization_df.shape[0] + 3:
             sheet.merge_cells(f"B{starting_row}:B{ending_row}")
-            sheet[f"B{starting_row}"] = iteration_number
+            sheet[f"B{starting_row}"] = iteration_numbers[iteration_number] if iteration_numbers is not None else iteration_number
             sheet.cell(row=starting_row, column=2).fill = px_styles.PatternFill(start_color="dfdfdf", end_color="dfdfdf",
                 fill_type="solid") # ! Replace for a Color attribute once the branch is merged
             sheet.cell(row=starting_row, column=2).border = common_border
@@ -167,7 +334,162 @@ class Data:
                 # * Rows and columns start at 1
 
         workbook.save(self.__xlsx_path)
-        self.__particle_history.append(optimization_df)
+
+    def save(self) -> None:
+        """Waits for the background writer and finishes the workbook of the
+        session, whose sheets were written by xlsxwriter in constant memory
+        mode as the optimizations were appended: every row is written once,
+        in order, and flushed to disk before the next one. Appending after
+        saving rewrites the saved sheets into a new workbook, so it needs
+        keep_histories. With autosave the whole workbook is rewritten
+        instead. The openpyxl engine saves after every optimization, so it
+        only waits for the background writer."""
+        self.flush()
+        if self.__engine != "xlsxwriter":
+            return
+        if self.__autosave:
+            self.__write_workbook()
+        else:
+            self.__finish_workbook()
+
+    def __open_workbook(self) -> None:
+        self.__workbook = xlsxwriter.Workbook(self.__xlsx_path, {"constant_memory": True})
+        self.__formats = self.__create_formats(self.__workbook)
+        self.__register_exit()
+        # * A new workbook replaces the saved one, so its sheets are written again
+        for optimization_index, optimization in enumerate(self.__particle_history[:self.__sheets_saved]):
+            self.__add_sheet(self.__workbook, self.__formats, optimization, optimization_index)
+
+    def __add_sheet(self, workbook: xlsxwriter.Workbook, formats: dict, optimization: History | Trace | pd.DataFrame, optimization_index: int) -> None:
+        sheet: xlsxwriter.worksheet.Worksheet = workbook.add_worksheet(f"Optimization {optimization_index + 1}")
+        if isinstance(optimization, Trace):
+            self.__write_trace_sheet(sheet, optimization_index, optimization, formats)
+        else:
+            self.__write_sheet(sheet, optimization_index, optimization, formats)
+
+    def __stream_sheet(self, optimization: History | Trace | pd.DataFrame, optimization_number: int) -> None:
+        """Writes the sheet of an optimization to the open workbook of the
+        session (opening it first if needed). Its rows are flushed to a
+        temporary file as they are written, so the optimization is not
+        needed afterwards."""
+        if self.__workbook is None:
+            self.__open_workbook()
+        self.__add_sheet(self.__workbook, self.__formats, optimization, optimization_number - 1)
+
+    def __finish_workbook(self) -> None:
+        """Writes the open workbook of the session to its file."""
+        if self.__workbook is None:
+            return
+        workbook: xlsxwriter.Workbook = self.__workbook
+        self.__workbook = None
+        self.__formats = None
+        self.__sheets_saved = len(workbook.worksheets())
+        workbook.close()
+
+    def __write_workbook(self) -> None:
+        """Rewrites the workbook of the whole session from the kept
+        histories in a single pass (see autosave)."""
+        workbook: xlsxwriter.Workbook = xlsxwriter.Workbook(self.__xlsx_path, {"constant_memory": True})
+        formats: dict = self.__create_formats(workbook)
+        # * A copy, the background writer may rewrite it while another optimization is appended
+        for optimization_index, optimization in enumerate(list(self.__particle_history)):
+            self.__add_sheet(workbook, formats, optimization, optimization_index)
+        workbook.close()
+
+    def __create_formats(self, workbook: xlsxwriter.Workbook) -> dict:
+        # ! Replace the colors for Color attributes once the branch is merged
+        # * xlsxwriter has no gradient fills, so the title uses the first color of the gradient of the openpyxl engine
+        font: dict = {"font_name": "FreeMono", "font_size": 11, "bold": True}
+        centered: dict = {"align": "center", "valign": "vcenter"}
+        common: dict = {**font, **centered, "bg_color": "#dfdfdf", "border": 1, "border_color": "#000000"}
+        spacing: dict = {**font, **centered, "left": 1, "right": 1, "left_color": "#ffffff", "right_color": "#ffffff",
+            "top": 1, "bottom": 1, "top_color": "#000000", "bottom_color": "#000000"}
+        return {
+            "title": workbook.add_format({**font, **centered, "font_size": 18, "font_color": "#f0f0f0",
+                "bg_color": "#085063", "border": 9, "border_color": "#ffffff"}),
+            "header": workbook.add_format({**font, **centered, "text_wrap": True, "font_color": "#ffffff",
+                "bg_color": "#042d53", "border": 5, "border_color": "#ffffff"}),
+            "particle": workbook.add_format(common),
+            "vector": workbook.add_format({**common, "text_wrap": True}),
+            # * The iteration cells are not merged (constant memory mode needs the rows in order), the column is drawn as one block per iteration
+            "iteration_first": workbook.add_format({**common, "bottom": 0}),
+            "iteration_middle": workbook.add_format({**common, "top": 0, "bottom": 0}),
+            "iteration_last": workbook.add_format({**common, "top": 0}),
+            "spacing": workbook.add_format(spacing)}
+
+    def __write_header(self, sheet: xlsxwriter.worksheet.Worksheet, optimization_index: int, headers: list[str], formats: dict) -> None:
+        # * Rows and columns start at 0, so row 3 is the row 4 of the openpyxl engine
+        sheet.freeze_panes(3, 0)
+        sheet.set_default_row(18)
+        sheet.set_column(1, 1, 10)
+        sheet.set_row(1, 45)
+        sheet.merge_range(1, 1, 1, max(len(headers), 2), f"PSO optimization session {optimization_index + 1} results", formats["title"])
+        if optimization_index < len(self.__stopping_reasons):
+            sheet.write_string(1, max(len(headers), 2) + 2, f"Stopping reason: {self.__stopping_reasons[optimization_index]}")
+        sheet.set_row(2, 40)
+        for column, header in enumerate(headers, start=1):
+            sheet.write_string(2, column, header, formats["header"])
+
+    def __write_sheet(self, sheet: xlsxwriter.worksheet.Worksheet, optimization_index: int, optimization: History | pd.DataFrame, formats: dict) -> None:
+        self.__write_header(sheet, optimization_index, ["Iteration", "Particle", "Heuristic coordinates", "Position coordinates",
+            "Velocity coordinates", "Best personal position coordinates"], formats)
+        row: int = 3
+        for row_index, (iteration_num, vectors) in enumerate(_iteration_rows(optimization)):
+            if row_index == 0:
+                # * The heuristic vector has the coordinates and the heuristic value
+                sheet.set_column(2, 6, 6*(vectors[0][0].count(",") + 2))
+            if row_index > 0:
+                for column in range(1, 7):
+                    sheet.write_blank(row, column, None, formats["spacing"])
+                row += 1
+            last: int = len(vectors) - 1
+            for particle_index, particle_vectors in enumerate(vectors):
+                iteration_format = formats["iteration_first" if particle_index == 0 else "iteration_last" if particle_index == last else "iteration_middle"]
+                if particle_index == 0:
+                    sheet.write_number(row, 1, iteration_num, iteration_format)
+                else:
+                    sheet.write_blank(row, 1, None, iteration_format)
+                sheet.write_number(row, 2, particle_index + 1, formats["particle"])
+                for column, vector in enumerate(particle_vectors, start=3):
+                    sheet.write_string(row, column, vector, formats["vector"])
+                row += 1
+
+    def __write_trace_sheet(self, sheet: xlsxwriter.worksheet.Worksheet, optimization_index: int, trace: Trace, formats: dict) -> None:
+        columns: dict[str, np.ndarray] = trace.get_columns()
+        self.__write_header(sheet, optimization_index, list(columns), formats)
+        sheet.set_column(2, len(columns), 16)
+        for row, row_values in enumerate(_trace_rows(trace), start=3):
+            sheet.write_row(row, 1, row_values, formats["particle"])
+
+    def __append_trace_sheet(self, trace: Trace, optimization_number: int) -> None:
+        """Adds the sheet of a trace to the workbook with openpyxl, as a
+        plain table with a column per value."""
+        if os.path.exists(self.__xlsx_path):
+            workbook: px.Workbook = px.load_workbook(self.__xlsx_path)
+        else:
+            workbook = px.Workbook()
+            # * A new workbook comes with an empty "Sheet", the optimization sheets are the only ones
+            workbook.remove(workbook.active)
+        sheet: px_worksheet.Worksheet = workbook.create_sheet(title=f"Optimization {optimization_number}")
+        sheet["B2"] = f"PSO optimization session {optimization_number} results"
+        if len(self.__stopping_reasons) >= optimization_number > 0:
+            sheet["I2"] = f"Stopping reason: {self.__stopping_reasons[optimization_number - 1]}"
+        columns: dict[str, np.ndarray] = trace.get_columns()
+        sheet.append([None] + list(columns))
+        for row_values in _trace_rows(trace):
+            sheet.append([None] + row_values)
+        workbook.save(self.__xlsx_path)
+
+    def export_columnar(self, history: History | Trace, optimization_number: int) -> str:
+        """Exports the history to optimization_<number> in the session
+        directory in the columnar format of the session, with the stopping
+        reason and the number of the optimization as metadata, and returns
+        the path of the file."""
+        metadata: dict = {"session": self.__xlsx_name, "optimization_number": optimization_number,
+            "stopping_reason": self.__stopping_reasons[optimization_number - 1] if len(self.__stopping_reasons) >= optimization_number else None}
+        path: str = export_history(history, self.get_optimization_path(optimization_number), self.__columnar_format, metadata)
+        self.__columnar_paths.append(path)
+        return path
 
     def create_spreadsheet(self) -> None:
         try:
@@ -186,7 +508,42 @@ class Data:
         pd.set_option("display.expand_frame_repr", False)
         pd.set_option("max_colwidth", None)
         pd.set_option("display.max_rows", None)
-        print(self.__particle_history[optimization_index])
+        print(self.get_particle_history()[optimization_index])
         
     def get_particle_history(self) -> list[pd.DataFrame]:
-        return self.__particle_history
\ No newline at end of file
+        """Returns the kept histories (see keep_histories) as DataFrames."""
+        return [optimization.to_dataframe() if isinstance(optimization, (History, Trace)) else optimization
+            for optimization in self.__particle_history]
+
+    def get_stopping_reasons(self) -> list[str]:
+        return self.__stopping_reasons
+
+    def get_session_directory(self) -> str:
+        return self.__session_directory
+
+    def get_optimization_path(self, optimization_number: int) -> str:
+        """Returns where the files of an optimization (its memory-mapped
+        history directory or its columnar file, without the extension) are
+        kept. Optimizations are numbered from 1, like their sheets."""
+        return os.path.join(self.__session_directory, f"optimization_{optimization_number}")
+
+    def get_number_of_optimizations(self) -> int:
+        return self.__number_of_optimizations
+
+    def get_engine(self) -> str:
+        return self.__engine
+
+    def is_autosave(self) -> bool:
+        return self.__autosave
+
+    def keeps_histories(self) -> bool:
+        return self.__keep_histories
+
+    def is_background(self) -> bool:
+        return self.__background
+
+    def get_columnar_format(self) -> str:
+        return self.__columnar_format
+
+    def get_columnar_paths(self) -> list[str]:
+        return self.__columnar_paths
\ No newline at end of file
@@ -0,0 +1,167 @@
+"""
+This module defines the FitnessCache class, a memoizing wrapper around a
+heuristic function with a bounded least recently used (LRU) eviction.
+
+## Classes
+- FitnessCache: Remembers the heuristic values of the positions already
+evaluated.
+
+### Methods
+- __call__(positions: np.ndarray) -> np.ndarray
+- lookup(positions: np.ndarray) -> tuple[np.ndarray, np.ndarray]
+- store(positions: np.ndarray, values: np.ndarray) -> None
+- clear() -> None
+
+#### Getters
+- get_heuristic_f() -> callable
+- get_hits() -> int
+- get_misses() -> int
+- get_hit_rate() -> float
+- get_max_size() -> int
+- get_size() -> int
+- get_tolerance() -> float
+"""
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from pso.vector.heuristic import evaluate_batch
+
+class FitnessCache:
+    """
+    Memoizing wrapper around a heuristic function. Positions are quantized
+    to a grid of the given tolerance, so positions closer than it (e.g.
+    the ones clipped to the same bound) share an entry. When the cache is
+    full, the least recently used entry is discarded.
+
+    A FitnessCache is itself a batch heuristic function, so it can be given
+    to a ParticleSwarm instead of the function it wraps. The evaluators
+    recognize it and only send the positions that miss the cache to their
+    workers, so hits never leave the calling process.
+
+    ## Parameters
+    - heuristic_f : callable
+        The (batch or legacy) heuristic function to memoize.
+    - tolerance : float, optional
+        The size of the grid the positions are quantized to. Default is 1e-9.
+    - max_size : int, optional
+        The maximum number of stored values. Default is 100000.
+
+    ## Attributes
+    - is_batch : bool
+        Always True (see the heuristic module).
+    - __heuristic_f : callable
+        The memoized heuristic function.
+    - __tolerance : float
+        The size of the quantization grid.
+    - __max_size : int
+        The maximum number of stored values.
+    - __values : OrderedDict[bytes, float]
+        The stored values, from the least to the most recently used.
+    - __hits : int
+        The number of positions found in the cache.
+    - __misses : int
+        The number of positions not found in the cache.
+    - __lock : threading.Lock
+        Protects the stored values when evaluations finish in other threads.
+    """
+
+    is_batch: bool = True
+
+    def __init__(self, heuristic_f: callable, tolerance: float = 1e-9, max_size: int = 100000) -> None:
+        if tolerance <= 0:
+            raise ValueError("The tolerance must be greater than zero.")
+        if max_size < 1:
+            raise ValueError("The maximum size must be greater than zero.")
+        self.__heuristic_f: callable = heuristic_f
+        self.__tolerance: float = tolerance
+        self.__max_size: int = max_size
+        self.__values: OrderedDict = OrderedDict()
+        self.__hits: int = 0
+        self.__misses: int = 0
+        self.__lock: threading.Lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f"Fitness cache with {self.get_size()} of {self.__max_size} values, {self.__hits} hits and {self.__misses} misses."
+
+    def __call__(self, positions: np.ndarray) -> np.ndarray:
+        """Returns the heuristic values of every row of positions,
+        evaluating only the ones that are not in the cache."""
+        values, missing = self.lookup(positions)
+        if np.any(missing):
+            values[missing] = evaluate_batch(self.__heuristic_f, positions[missing])
+            self.store(positions[missing], values[missing])
+        return values
+
+    def _keys(self, positions: np.ndarray) -> list[bytes]:
+        quantized: np.ndarray = np.round(positions / self.__tolerance).astype(np.int64)
+        return [row.tobytes() for row in quantized]
+
+    def lookup(self, positions: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Looks every row of positions up in the cache.
+
+        ## Parameters
+        positions : np.ndarray
+            An (N, D) array with one position per row.
+
+        ## Returns
+        tuple[np.ndarray, np.ndarray]
+            The (N,) array of values (nan where missing) and the (N,) boolean
+            array of the rows that were not found.
+        """
+        values: np.ndarray = np.full(positions.shape[0], np.nan)
+        missing: np.ndarray = np.ones(positions.shape[0], dtype=bool)
+        with self.__lock:
+            for row, key in enumerate(self._keys(positions)):
+                value: float = self.__values.get(key)
+                if value is not None:
+                    self.__values.move_to_end(key)
+                    values[row] = value
+                    missing[row] = False
+            hits: int = int(positions.shape[0] - np.count_nonzero(missing))
+            self.__hits += hits
+            self.__misses += positions.shape[0] - hits
+        return values, missing
+
+    def store(self, positions: np.ndarray, values: np.ndarray) -> None:
+        """Stores the heuristic values of every row of positions,
+        discarding the least recently used ones if the cache is full."""
+        with self.__lock:
+            for key, value in zip(self._keys(positions), values):
+                self.__values[key] = float(value)
+                self.__values.move_to_end(key)
+            while len(self.__values) > self.__max_size:
+                self.__values.popitem(last=False)
+
+    def clear(self) -> None:
+        """Discards every stored value and resets the statistics."""
+        with self.__lock:
+            self.__values.clear()
+            self.__hits = 0
+            self.__misses = 0
+
+    # * Getters
+
+    def get_heuristic_f(self) -> callable:
+        return self.__heuristic_f
+
+    def get_hits(self) -> int:
+        return self.__hits
+
+    def get_misses(self) -> int:
+        return self.__misses
+
+    def get_hit_rate(self) -> float:
+        lookups: int = self.__hits + self.__misses
+        return self.__hits / lookups if lookups > 0 else 0.0
+
+    def get_max_size(self) -> int:
+        return self.__max_size
+
+    def get_size(self) -> int:
+        return len(self.__values)
+
+    def get_tolerance(self) -> float:
+        return self.__tolerance
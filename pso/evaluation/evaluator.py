@@ -0,0 +1,275 @@
+"""
+This module defines the evaluation backends used by a ParticleSwarm to
+compute the heuristic values of all its particles in each iteration.
+
+## Classes
+- Evaluator: Evaluates the whole swarm in the calling process (serial).
+- _PoolEvaluator: Splits the swarm in chunks of particles and evaluates
+them in a concurrent.futures pool (abstract).
+- ProcessPoolEvaluator: Evaluates the chunks in a pool of worker processes.
+- ThreadPoolEvaluator: Evaluates the chunks in a pool of threads, for
+heuristic functions that release the GIL (NumPy, compiled extensions, I/O).
+
+### Methods
+- evaluate(heuristic_f: callable, positions: np.ndarray) -> np.ndarray
+- submit(heuristic_f: callable, position: np.ndarray) -> Future
+- close() -> None
+- _seed(seed_sequence: np.random.SeedSequence) -> None
+
+#### Getters
+- get_workers() -> int (pool evaluators)
+- get_chunk_size() -> int (pool evaluators)
+"""
+
+import math
+import multiprocessing
+import os
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import repeat
+
+import numpy as np
+
+from pso.evaluation.cache import FitnessCache
+from pso.vector.heuristic import evaluate_batch
+
+def _evaluate_single(heuristic_f: callable, position: np.ndarray) -> float:
+    # * Module-level so it can be sent to worker processes
+    return float(evaluate_batch(heuristic_f, position[np.newaxis])[0])
+
+def _seed_worker(seed_sequence: np.random.SeedSequence, worker_counter) -> None:
+    """Seeds the global NumPy random state of a worker process with its own
+    child of seed_sequence, so stochastic heuristic functions never share
+    a stream with another worker. The workers take their indexes from the
+    shared worker_counter in the order they start, so the streams of a
+    pool are the same in every run."""
+    with worker_counter.get_lock():
+        worker_index: int = worker_counter.value
+        worker_counter.value += 1
+    child: np.random.SeedSequence = np.random.SeedSequence(seed_sequence.entropy, spawn_key=seed_sequence.spawn_key + (worker_index,))
+    np.random.seed(child.generate_state(4))
+
+class Evaluator:
+    """
+    Evaluates a heuristic function on every position of the swarm in
+    the calling process. It is the default evaluation backend.
+
+    Evaluators can be used as context managers, in which case close() is
+    called on exit. An evaluator may leave the value of a position as nan
+    to signal that it was not evaluated (see SurrogateEvaluator).
+
+    ## Methods
+    - evaluate(heuristic_f, positions) -> np.ndarray
+        Returns the heuristic value of every row of positions.
+    - submit(heuristic_f, position) -> Future
+        Starts the evaluation of a single position and returns a Future
+        with its heuristic value (used by the asynchronous mode).
+    - close()
+        Releases the resources of the evaluator (nothing for this class).
+    - _evaluate(heuristic_f, positions) -> np.ndarray
+        Evaluates the positions that were not cached (overridden by the
+        pool evaluators).
+    - _submit(heuristic_f, position) -> Future
+        Starts the evaluation of a position that was not cached
+        (overridden by the pool evaluators).
+    - _seed(seed_sequence)
+        Receives the child stream of the swarm for the workers of the
+        evaluator (nothing for this class).
+    """
+
+    def __enter__(self) -> "Evaluator":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def evaluate(self, heuristic_f: callable, positions: np.ndarray) -> np.ndarray:
+        """Evaluates heuristic_f on every row of positions (see
+        evaluate_batch in the heuristic module). If heuristic_f is a
+        FitnessCache, only the rows missing from it are evaluated.
+
+        ## Parameters
+        heuristic_f : callable
+            A batch or legacy heuristic function.
+        positions : np.ndarray
+            An (N, D) array with one position per row.
+        """
+        if not isinstance(heuristic_f, FitnessCache):
+            return self._evaluate(heuristic_f, positions)
+        values, missing = heuristic_f.lookup(positions)
+        if np.any(missing):
+            values[missing] = self._evaluate(heuristic_f.get_heuristic_f(), positions[missing])
+            # * Rows left as nan were not evaluated (see SurrogateEvaluator)
+            stored: np.ndarray = missing & ~np.isnan(values)
+            heuristic_f.store(positions[stored], values[stored])
+        return values
+
+    def submit(self, heuristic_f: callable, position: np.ndarray) -> Future:
+        """Starts the evaluation of heuristic_f on a single position and
+        returns a Future with its value. If heuristic_f is a FitnessCache
+        and has the value, the Future is already completed.
+
+        ## Parameters
+        heuristic_f : callable
+            A batch or legacy heuristic function.
+        position : np.ndarray
+            A 1-D array with the coordinates of the position.
+        """
+        if not isinstance(heuristic_f, FitnessCache):
+            return self._submit(heuristic_f, position)
+        values, missing = heuristic_f.lookup(position[np.newaxis])
+        if not missing[0]:
+            future: Future = Future()
+            future.set_result(float(values[0]))
+            return future
+        future = self._submit(heuristic_f.get_heuristic_f(), position)
+
+        def store(done: Future) -> None:
+            if not done.cancelled() and done.exception() is None:
+                heuristic_f.store(position[np.newaxis], np.array([done.result()]))
+
+        future.add_done_callback(store)
+        return future
+
+    def _evaluate(self, heuristic_f: callable, positions: np.ndarray) -> np.ndarray:
+        return evaluate_batch(heuristic_f, positions)
+
+    def _submit(self, heuristic_f: callable, position: np.ndarray) -> Future:
+        # * Evaluated right away, so the Future is already completed
+        future: Future = Future()
+        try:
+            future.set_result(_evaluate_single(heuristic_f, position))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def close(self) -> None:
+        pass
+
+    def _seed(self, seed_sequence: np.random.SeedSequence) -> None:
+        pass
+
+class _PoolEvaluator(Evaluator):
+    """
+    Evaluates the swarm in a concurrent.futures executor created by
+    _create_executor (implemented by the subclasses). The positions are
+    split in chunks of consecutive particles, each chunk is evaluated in a
+    worker (with evaluate_batch) and the results are put back together in
+    the original order, so the values are the same as the ones of the
+    serial Evaluator.
+
+    The pool is created the first time it is needed and reused by every
+    following evaluation, including the ones of other swarms or
+    optimizations that share the evaluator, until close() is called.
+
+    ## Parameters
+    - workers : int, optional
+        The number of workers. Default is the number of CPUs.
+    - chunk_size : int, optional
+        The number of particles sent to a worker in each task. Default is
+        None, which splits the swarm evenly between the workers.
+
+    ## Attributes
+    - __workers : int
+        The number of workers.
+    - __chunk_size : int | None
+        The number of particles per task, if fixed.
+    - __executor : Executor | None
+        The pool of workers, None until the first evaluation.
+    """
+
+    def __init__(self, workers: int = None, chunk_size: int = None) -> None:
+        self.__workers: int = workers if workers is not None else (os.cpu_count() or 1)
+        if self.__workers < 1:
+            raise ValueError("The number of workers must be greater than zero.")
+        if chunk_size is not None and chunk_size < 1:
+            raise ValueError("The chunk size must be greater than zero.")
+        self.__chunk_size: int = chunk_size
+        self.__executor: Executor = None
+
+    def _create_executor(self) -> Executor:
+        raise NotImplementedError
+
+    def _get_executor(self) -> Executor:
+        if self.__executor is None:
+            self.__executor = self._create_executor()
+        return self.__executor
+
+    def _split(self, positions: np.ndarray) -> list[np.ndarray]:
+        """Splits positions in chunks of consecutive rows."""
+        chunk_size: int = self.__chunk_size
+        if chunk_size is None:
+            chunk_size = max(1, math.ceil(positions.shape[0] / self.__workers))
+        return [positions[start:start + chunk_size] for start in range(0, positions.shape[0], chunk_size)]
+
+    def _evaluate(self, heuristic_f: callable, positions: np.ndarray) -> np.ndarray:
+        chunks: list[np.ndarray] = self._split(positions)
+        if len(chunks) <= 1:
+            # * Not worth a round trip to the pool
+            return evaluate_batch(heuristic_f, positions)
+        results = self._get_executor().map(evaluate_batch, repeat(heuristic_f), chunks)
+        return np.concatenate(list(results))
+
+    def _submit(self, heuristic_f: callable, position: np.ndarray) -> Future:
+        # * The chunk size does not apply to single positions
+        return self._get_executor().submit(_evaluate_single, heuristic_f, position)
+
+    def close(self) -> None:
+        """Shuts the pool down. A later evaluation creates a new one."""
+        if self.__executor is not None:
+            self.__executor.shutdown(wait=True)
+            self.__executor = None
+
+    # * Getters
+
+    def get_workers(self) -> int:
+        return self.__workers
+
+    def get_chunk_size(self) -> int:
+        return self.__chunk_size
+
+class ProcessPoolEvaluator(_PoolEvaluator):
+    """
+    Evaluates the swarm in a ProcessPoolExecutor (see _PoolEvaluator). Best
+    suited for CPU-heavy pure-Python heuristic functions.
+
+    ## Notes
+    - The heuristic function and the positions are pickled to be sent to
+    the workers, so lambdas and local functions can not be used.
+    - On platforms that spawn the workers (Windows and macOS) the code that
+    runs the optimization must be under an `if __name__ == "__main__":` guard.
+    - Each worker seeds its global NumPy random state with an independent
+    child of the stream the swarm gives to the evaluator, chosen by the
+    order in which the workers start (not by their pids), so a pool always
+    has the same streams. Which worker evaluates each chunk is not fixed,
+    so stochastic heuristic functions are still not reproducible with this
+    evaluator unless it has a single worker.
+    """
+
+    def __init__(self, workers: int = None, chunk_size: int = None) -> None:
+        super().__init__(workers, chunk_size)
+        self.__seed_sequence: np.random.SeedSequence = None
+
+    def _seed(self, seed_sequence: np.random.SeedSequence) -> None:
+        # * Used by the next pool, a running one keeps its streams
+        self.__seed_sequence = seed_sequence
+
+    def _create_executor(self) -> Executor:
+        if self.__seed_sequence is None:
+            return ProcessPoolExecutor(max_workers=self.get_workers())
+        context = multiprocessing.get_context()
+        # * Shared with the workers, which number themselves with it
+        worker_counter = context.Value("i", 0)
+        return ProcessPoolExecutor(max_workers=self.get_workers(), mp_context=context, initializer=_seed_worker,
+            initargs=(self.__seed_sequence, worker_counter))
+
+class ThreadPoolEvaluator(_PoolEvaluator):
+    """
+    Evaluates the swarm in a ThreadPoolExecutor (see _PoolEvaluator). The
+    chunks are shared with the threads without copying or pickling and
+    there are no processes to start, but the threads only run in parallel
+    while the heuristic function releases the GIL (NumPy kernels, compiled
+    extensions, I/O waits). The heuristic function must be thread-safe.
+    """
+
+    def _create_executor(self) -> Executor:
+        return ThreadPoolExecutor(max_workers=self.get_workers(), thread_name_prefix="pso-evaluator")
@@ -0,0 +1,242 @@
+"""
+This module defines the SurrogateEvaluator class, an evaluation backend
+that pre-screens the positions of the swarm with a cheap model of the
+heuristic function and only evaluates the most promising ones.
+
+## Classes
+- SurrogateEvaluator: Surrogate-assisted evaluation backend.
+
+### Methods
+- evaluate(heuristic_f: callable, positions: np.ndarray) -> np.ndarray (inherited)
+- submit(heuristic_f: callable, position: np.ndarray) -> Future (inherited)
+- predict(positions: np.ndarray) -> np.ndarray
+- close() -> None
+
+#### Getters
+- get_evaluator() -> Evaluator
+- get_model() -> str
+- get_sample_count() -> int
+- get_true_evaluations() -> int
+- get_skipped_evaluations() -> int
+- get_fit_count() -> int
+"""
+
+import math
+import threading
+from concurrent.futures import Future
+
+import numpy as np
+
+from pso.evaluation.evaluator import Evaluator
+
+MODELS: tuple[str, ...] = ("rbf", "quadratic")
+
+class SurrogateEvaluator(Evaluator):
+    """
+    Evaluation backend that fits a surrogate model on every (position,
+    heuristic value) pair evaluated so far and uses it to choose which
+    positions are worth a real evaluation. Only the evaluation_fraction
+    of the positions with the best predictions are sent to the wrapped
+    evaluator; the rest are left as nan, which the swarm treats as "not
+    evaluated" (their pbests are not updated and they are not counted as
+    evaluations).
+
+    Until the model has min_samples pairs every position is evaluated. The
+    single evaluations of the asynchronous mode are never skipped, but
+    their results are also used to fit the model.
+
+    The fitted model is kept between predictions and only refitted once
+    refit_interval batches of new pairs have been added since the last
+    fit, so predicting again without new evaluations costs no fit.
+
+    ## Parameters
+    - evaluator : Evaluator, optional
+        The backend of the real evaluations. Default is None (serial).
+    - model : str, optional
+        "rbf" (cubic radial basis function interpolation with a linear
+        tail) or "quadratic" (least squares quadratic without cross
+        terms). Default is "rbf".
+    - evaluation_fraction : float, optional
+        The fraction of the positions evaluated in each call, at least one.
+        Default is 0.3.
+    - min_samples : int, optional
+        The number of pairs needed before screening. Default is None, the
+        minimum the model needs plus the dimensions.
+    - max_samples : int, optional
+        The number of most recent pairs the model is fitted on (fitting an
+        RBF is cubic in it). Default is 500.
+    - refit_interval : int, optional
+        The number of batches of new pairs (one per evaluate call, or one
+        per asynchronous evaluation) added before the model is refitted.
+        Larger intervals screen with a slightly older model and fit less
+        often. Default is 1, refit whenever new pairs arrived.
+
+    ## Attributes
+    - __evaluator : Evaluator
+        The backend of the real evaluations.
+    - __model : str
+        The kind of surrogate model.
+    - __evaluation_fraction : float
+        The fraction of the positions evaluated in each call.
+    - __min_samples : int | None
+        The number of pairs needed before screening.
+    - __max_samples : int
+        The maximum number of pairs the model is fitted on.
+    - __refit_interval : int
+        The number of batches of new pairs added before refitting.
+    - __samples : list[np.ndarray]
+        The evaluated positions.
+    - __values : list[float]
+        Their heuristic values.
+    - __true_evaluations : int
+        The number of real evaluations requested.
+    - __skipped_evaluations : int
+        The number of positions that were not evaluated.
+    - __fit : tuple[np.ndarray, np.ndarray] | None
+        The samples and coefficients of the last fitted model.
+    - __pending_batches : int
+        The number of batches of pairs added since the last fit.
+    - __fit_count : int
+        The number of times the model was fitted.
+    - __lock : threading.Lock
+        Protects the samples when asynchronous evaluations finish in other threads.
+    """
+
+    def __init__(self, evaluator: Evaluator = None, model: str = "rbf", evaluation_fraction: float = 0.3, min_samples: int = None, max_samples: int = 500, refit_interval: int = 1) -> None:
+        if model not in MODELS:
+            raise ValueError(f"Unknown surrogate model: {model}. Available models: {MODELS}.")
+        if not 0 < evaluation_fraction <= 1:
+            raise ValueError("The evaluation fraction must be in (0, 1].")
+        if refit_interval < 1:
+            raise ValueError("The refit interval must be greater than zero.")
+        self.__evaluator: Evaluator = evaluator if evaluator is not None else Evaluator()
+        self.__model: str = model
+        self.__evaluation_fraction: float = evaluation_fraction
+        self.__min_samples: int = min_samples
+        self.__max_samples: int = max_samples
+        self.__refit_interval: int = refit_interval
+        self.__samples: list[np.ndarray] = []
+        self.__values: list[float] = []
+        self.__true_evaluations: int = 0
+        self.__skipped_evaluations: int = 0
+        self.__fit: tuple[np.ndarray, np.ndarray] = None
+        self.__pending_batches: int = 0
+        self.__fit_count: int = 0
+        self.__lock: threading.Lock = threading.Lock()
+
+    def _evaluate(self, heuristic_f: callable, positions: np.ndarray) -> np.ndarray:
+        values: np.ndarray = np.full(positions.shape[0], np.nan)
+        if self.get_sample_count() < self._required_samples(positions.shape[1]):
+            chosen: np.ndarray = np.arange(positions.shape[0])
+        else:
+            amount: int = max(1, math.ceil(self.__evaluation_fraction * positions.shape[0]))
+            chosen = np.argsort(self.predict(positions), kind="stable")[:amount]
+        values[chosen] = self.__evaluator.evaluate(heuristic_f, positions[chosen])
+        self._add_samples(positions[chosen], values[chosen])
+        self.__true_evaluations += chosen.shape[0]
+        self.__skipped_evaluations += positions.shape[0] - chosen.shape[0]
+        return values
+
+    def _submit(self, heuristic_f: callable, position: np.ndarray) -> Future:
+        future: Future = self.__evaluator.submit(heuristic_f, position)
+        self.__true_evaluations += 1
+
+        def add_sample(done: Future) -> None:
+            if not done.cancelled() and done.exception() is None:
+                self._add_samples(position[np.newaxis], np.array([done.result()]))
+
+        future.add_done_callback(add_sample)
+        return future
+
+    def _required_samples(self, dimensions: int) -> int:
+        minimum: int = dimensions + 1 if self.__model == "rbf" else 2 * dimensions + 1
+        return max(self.__min_samples or minimum + dimensions, minimum + 1)
+
+    def _add_samples(self, positions: np.ndarray, values: np.ndarray) -> None:
+        with self.__lock:
+            self.__samples.extend(positions.copy())
+            self.__values.extend(float(value) for value in values)
+            # * Only the most recent samples are kept
+            del self.__samples[:-self.__max_samples]
+            del self.__values[:-self.__max_samples]
+            self.__pending_batches += 1
+
+    def predict(self, positions: np.ndarray) -> np.ndarray:
+        """Returns the heuristic values predicted by the surrogate model for
+        every row of positions. The model is refitted first if enough new
+        pairs were added since the last fit."""
+        with self.__lock:
+            refit: bool = self.__fit is None or self.__pending_batches >= self.__refit_interval
+            if refit:
+                samples: np.ndarray = np.array(self.__samples)
+                values: np.ndarray = np.array(self.__values)
+                self.__pending_batches = 0
+        if refit:
+            fit_f: callable = self._fit_rbf if self.__model == "rbf" else self._fit_quadratic
+            self.__fit = (samples, fit_f(samples, values))
+            self.__fit_count += 1
+        if self.__model == "rbf":
+            return self._predict_rbf(*self.__fit, positions)
+        return self._predict_quadratic(*self.__fit, positions)
+
+    @staticmethod
+    def _distances(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        squared: np.ndarray = np.sum(a**2, axis=1)[:, np.newaxis] + np.sum(b**2, axis=1) - 2 * a @ b.T
+        return np.sqrt(np.maximum(squared, 0))
+
+    @staticmethod
+    def _fit_rbf(samples: np.ndarray, values: np.ndarray) -> np.ndarray:
+        # * Cubic kernel with a linear tail: [[Phi, P], [P^T, 0]] [w, c] = [y, 0]
+        sample_amount: int = samples.shape[0]
+        tail: np.ndarray = np.column_stack((np.ones(sample_amount), samples))
+        system: np.ndarray = np.zeros((sample_amount + tail.shape[1],) * 2)
+        system[:sample_amount, :sample_amount] = SurrogateEvaluator._distances(samples, samples)**3
+        system[:sample_amount, sample_amount:] = tail
+        system[sample_amount:, :sample_amount] = tail.T
+        right_side: np.ndarray = np.concatenate((values, np.zeros(tail.shape[1])))
+        # * Least squares, since repeated samples make the system singular
+        return np.linalg.lstsq(system, right_side, rcond=None)[0]
+
+    @staticmethod
+    def _predict_rbf(samples: np.ndarray, coefficients: np.ndarray, positions: np.ndarray) -> np.ndarray:
+        sample_amount: int = samples.shape[0]
+        kernel: np.ndarray = SurrogateEvaluator._distances(positions, samples)**3
+        return kernel @ coefficients[:sample_amount] + np.column_stack((np.ones(positions.shape[0]), positions)) @ coefficients[sample_amount:]
+
+    @staticmethod
+    def _quadratic_features(x: np.ndarray) -> np.ndarray:
+        return np.column_stack((np.ones(x.shape[0]), x, x**2))
+
+    @staticmethod
+    def _fit_quadratic(samples: np.ndarray, values: np.ndarray) -> np.ndarray:
+        return np.linalg.lstsq(SurrogateEvaluator._quadratic_features(samples), values, rcond=None)[0]
+
+    @staticmethod
+    def _predict_quadratic(samples: np.ndarray, coefficients: np.ndarray, positions: np.ndarray) -> np.ndarray:
+        return SurrogateEvaluator._quadratic_features(positions) @ coefficients
+
+    def close(self) -> None:
+        self.__evaluator.close()
+
+    def _seed(self, seed_sequence: np.random.SeedSequence) -> None:
+        self.__evaluator._seed(seed_sequence)
+
+    # * Getters
+
+    def get_evaluator(self) -> Evaluator:
+        return self.__evaluator
+
+    def get_model(self) -> str:
+        return self.__model
+
+    def get_sample_count(self) -> int:
+        return len(self.__values)
+
+    def get_true_evaluations(self) -> int:
+        return self.__true_evaluations
+
+    def get_skipped_evaluations(self) -> int:
+        return self.__skipped_evaluations
+
+    def get_fit_count(self) -> int:
+        return self.__fit_count
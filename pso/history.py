@@ -0,0 +1,413 @@
+"""
+This module defines the History class, where an optimization records the
+state of its swarm after every iteration (or some of them, see
+pso.recording), either in memory or in .npy files memory-mapped from a
+directory, and the Trace class, where it records one row of values per
+iteration instead (e.g. the gbest or summary statistics).
+
+## Classes
+- History: Preallocated arrays with the state of the swarm in the recorded iterations.
+- Trace: A preallocated table of values per recorded iteration.
+
+### Methods
+- open(directory: str, mode: str = "r") -> History
+- record(iteration: int, positions, velocities, pbests, fitness, gbest_index) -> None
+- flush() -> None
+- to_dataframe(start: int = 0, stop: int = None) -> pd.DataFrame
+- _get_state() -> dict
+- _restore_state(state: dict) -> None
+
+#### Getters
+- get_positions() -> np.ndarray
+- get_velocities() -> np.ndarray
+- get_pbests() -> np.ndarray
+- get_fitness() -> np.ndarray
+- get_gbest_indexes() -> np.ndarray
+- get_iteration_numbers() -> np.ndarray
+- get_iterations_recorded() -> int
+- get_particle_amount() -> int
+- get_dimensions() -> int
+- get_directory() -> str | None
+- get_metadata() -> dict
+
+### Methods of Trace
+- record(iteration: int, values) -> None
+- to_dataframe() -> pd.DataFrame
+- _get_state() -> dict
+- _restore_state(state: dict) -> None
+
+#### Getters of Trace
+- get_columns() -> dict[str, np.ndarray]
+- get_column_names() -> list[str]
+- get_gbest_indexes() -> np.ndarray
+- get_iteration_numbers() -> np.ndarray
+- get_iterations_recorded() -> int
+- get_metadata() -> dict
+"""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+COLUMNS: list[str] = ["Heuristic", "Position", "Velocity", "Pbest"]
+
+# * Name of every array (and of its .npy file) and the number of its axes
+ARRAYS: dict[str, int] = {"positions": 3, "velocities": 3, "pbests": 3, "fitness": 2, "gbest_indexes": 1, "iteration_numbers": 1}
+METADATA_FILE: str = "metadata.json"
+FORMAT_VERSION: int = 1
+
+class History:
+    """
+    The state of a swarm in every iteration of an optimization (0 being
+    the initial state), stored in arrays allocated once for the whole run,
+    so recording an iteration is a copy into the next row and nothing is
+    concatenated. If only some iterations are recorded, the arrays can
+    have fewer rows, and the number of the iteration of every row is kept.
+
+    The DataFrame layout used by Data (one row per particle with the rounded
+    vectors in its cells and a row of nan's between iterations) is only
+    built when to_dataframe is called, and then kept.
+
+    If a directory is given, the arrays are .npy files in it, memory-mapped
+    (so a run longer than the RAM only keeps the pages being written), next
+    to a metadata.json header with their shapes and dtypes, the number of
+    iterations recorded and the parameters of the run. The header is
+    rewritten by flush, which Optimization.optimize calls at the end of the
+    run. History.open maps a past run again without reading it, so any
+    range of iterations can be sliced from its getters or turned into a
+    DataFrame with to_dataframe(start, stop).
+
+    ## Parameters
+    - iterations : int
+        The maximum number of iterations (the arrays have one more row for
+        the initial state).
+    - particle_amount : int
+        The number of particles.
+    - dimensions : int
+        The dimensions of the positions (without the heuristic value).
+    - directory : str, optional
+        Where to keep the memory-mapped arrays (created if needed). Default
+        is None, which keeps them in memory.
+    - parameters : dict, optional
+        Parameters of the run (JSON serializable) stored in the header.
+        Default is None.
+    - rows : int, optional
+        The number of iterations that will be recorded. Default is None,
+        which is all of them (iterations + 1).
+
+    ## Attributes
+    - __iterations : int
+        The maximum number of iterations of the run.
+    - __positions : np.ndarray
+        The (iterations + 1, particles, dimensions) array of positions.
+    - __velocities : np.ndarray
+        The (iterations + 1, particles, dimensions) array of velocities.
+    - __pbests : np.ndarray
+        The (iterations + 1, particles, dimensions) array of personal bests.
+    - __fitness : np.ndarray
+        The (iterations + 1, particles) array of heuristic values.
+    - __gbest_indexes : np.ndarray
+        The (iterations + 1,) array of indexes of the particle with the gbest.
+    - __iteration_numbers : np.ndarray
+        The (iterations + 1,) array of numbers of the iteration of every row.
+    - __iterations_recorded : int
+        The number of rows recorded so far.
+    - __dataframe : pd.DataFrame | None
+        The DataFrame layout, once it has been built.
+    - __directory : str | None
+        The directory of the memory-mapped arrays.
+    - __parameters : dict
+        The parameters of the run.
+
+    ## Methods
+    - open(directory, mode="r") -> History
+        Maps the arrays of a past run (class method).
+    - record(iteration, positions, velocities, pbests, fitness, gbest_index)
+        Copies the state of the swarm into the next row.
+    - flush()
+        Writes the memory-mapped arrays and the header to disk.
+    - to_dataframe(start=0, stop=None) -> pd.DataFrame
+        Returns a range of the recorded iterations in the DataFrame layout of Data.
+    - _get_state() -> dict
+        Returns copies of the recorded rows, saved in checkpoints.
+    - _restore_state(state)
+        Records again the rows of a checkpoint.
+    """
+
+    def __init__(self, iterations: int, particle_amount: int, dimensions: int, directory: str = None, parameters: dict = None, rows: int = None) -> None:
+        shape: tuple[int, int, int] = (iterations + 1 if rows is None else rows, particle_amount, dimensions)
+        self.__iterations: int = iterations
+        self.__directory: str = directory
+        self.__parameters: dict = dict(parameters or {})
+        self.__iterations_recorded: int = 0
+        self.__dataframe: pd.DataFrame = None
+        if directory is None:
+            self.__positions: np.ndarray = np.empty(shape)
+            self.__velocities: np.ndarray = np.empty(shape)
+            self.__pbests: np.ndarray = np.empty(shape)
+            self.__fitness: np.ndarray = np.empty(shape[:2])
+            self.__gbest_indexes: np.ndarray = np.zeros(shape[0], dtype=int)
+            self.__iteration_numbers: np.ndarray = np.zeros(shape[0], dtype=int)
+            return
+        os.makedirs(directory, exist_ok=True)
+        def create(name: str, dtype: type) -> np.memmap:
+            return np.lib.format.open_memmap(os.path.join(directory, f"{name}.npy"), mode="w+",
+                dtype=dtype, shape=shape[:ARRAYS[name]])
+        self.__positions = create("positions", np.float64)
+        self.__velocities = create("velocities", np.float64)
+        self.__pbests = create("pbests", np.float64)
+        self.__fitness = create("fitness", np.float64)
+        self.__gbest_indexes = create("gbest_indexes", np.int64)
+        self.__iteration_numbers = create("iteration_numbers", np.int64)
+        self.__write_metadata()
+
+    @classmethod
+    def open(cls, directory: str, mode: str = "r") -> "History":
+        """Returns the history stored in the directory, with its arrays
+        memory-mapped in the given mode ("r" to only read them, "r+" to also
+        modify them), so nothing is read until it is sliced."""
+        with open(os.path.join(directory, METADATA_FILE)) as metadata_file:
+            metadata: dict = json.load(metadata_file)
+        if metadata.get("format") != FORMAT_VERSION:
+            raise ValueError(f"Unknown history format {metadata.get('format')} in {directory}.")
+        history: History = cls.__new__(cls)
+        history.__iterations = metadata["iterations"]
+        history.__directory = directory
+        history.__parameters = metadata["parameters"]
+        history.__iterations_recorded = metadata["iterations_recorded"]
+        history.__dataframe = None
+        arrays: dict[str, np.ndarray] = {name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mode)
+            for name in ARRAYS}
+        history.__positions = arrays["positions"]
+        history.__velocities = arrays["velocities"]
+        history.__pbests = arrays["pbests"]
+        history.__fitness = arrays["fitness"]
+        history.__gbest_indexes = arrays["gbest_indexes"]
+        history.__iteration_numbers = arrays["iteration_numbers"]
+        return history
+
+    def __repr__(self) -> str:
+        return f"History of {self.__iterations_recorded} of {self.__fitness.shape[0]} iterations of {self.get_particle_amount()} particles."
+
+    def record(self, iteration: int, positions: np.ndarray, velocities: np.ndarray, pbests: np.ndarray, fitness: np.ndarray, gbest_index: int) -> None:
+        """Copies the state of the swarm after the given iteration into the
+        next row of the arrays. Iterations must be recorded in order."""
+        row: int = self.__iterations_recorded
+        self.__positions[row] = positions
+        self.__velocities[row] = velocities
+        self.__pbests[row] = pbests
+        self.__fitness[row] = fitness
+        self.__gbest_indexes[row] = gbest_index
+        self.__iteration_numbers[row] = iteration
+        self.__iterations_recorded = row + 1
+        self.__dataframe = None
+
+    def _get_state(self) -> dict:
+        """Returns copies of the recorded rows, for checkpoints."""
+        return {"positions": np.array(self.get_positions()), "velocities": np.array(self.get_velocities()),
+            "pbests": np.array(self.get_pbests()), "fitness": np.array(self.get_fitness()),
+            "gbest_indexes": np.array(self.get_gbest_indexes()), "iteration_numbers": np.array(self.get_iteration_numbers())}
+
+    def _restore_state(self, state: dict) -> None:
+        """Records again the rows returned by _get_state."""
+        for row, iteration in enumerate(state["iteration_numbers"]):
+            self.record(int(iteration), state["positions"][row], state["velocities"][row], state["pbests"][row],
+                state["fitness"][row], int(state["gbest_indexes"][row]))
+
+    def flush(self) -> None:
+        """Writes the memory-mapped arrays to disk and updates the header
+        with the iterations recorded so far. Does nothing in memory."""
+        if self.__directory is None:
+            return
+        for array in (self.__positions, self.__velocities, self.__pbests, self.__fitness, self.__gbest_indexes, self.__iteration_numbers):
+            if isinstance(array, np.memmap) and array.flags.writeable:
+                array.flush()
+        self.__write_metadata()
+
+    def __write_metadata(self) -> None:
+        # * Written to a temporary file and renamed, so readers never see half a header
+        path: str = os.path.join(self.__directory, METADATA_FILE)
+        with open(f"{path}.tmp", "w") as metadata_file:
+            json.dump(self.get_metadata(), metadata_file, indent=2)
+        os.replace(f"{path}.tmp", path)
+
+    def to_dataframe(self, start: int = 0, stop: int = None) -> pd.DataFrame:
+        """Returns the recorded iterations from start to stop (all of them by
+        default) as a DataFrame with the columns Heuristic, Position,
+        Velocity and Pbest, one row per particle whose cells hold the vectors
+        rounded to two decimals, and a row of nan's between two iterations.
+        Only the whole history is kept once built."""
+        whole: bool = start == 0 and stop is None
+        if whole and self.__dataframe is not None:
+            return self.__dataframe
+        start, stop, _ = slice(start, stop).indices(self.__iterations_recorded)
+        particle_amount: int = self.get_particle_amount()
+        positions: np.ndarray = self.__positions[start:stop]
+        # * Rounded once for the whole range instead of once per iteration
+        rounded: dict[str, np.ndarray] = {
+            "Heuristic": np.round(np.concatenate((positions, self.__fitness[start:stop, :, np.newaxis]), axis=2), 2),
+            "Position": np.round(positions, 2),
+            "Velocity": np.round(self.__velocities[start:stop], 2),
+            "Pbest": np.round(self.__pbests[start:stop], 2)}
+        columns: dict[str, list] = {column: [] for column in COLUMNS}
+        index: list[int] = []
+        for iteration_num in range(stop - start):
+            if iteration_num > 0:
+                for column in COLUMNS:
+                    columns[column].append(np.nan)
+                index.append(0)
+            for column in COLUMNS:
+                columns[column].extend(rounded[column][iteration_num])
+            index.extend(range(particle_amount))
+        dataframe: pd.DataFrame = pd.DataFrame(columns, index=index, columns=COLUMNS)
+        if whole:
+            self.__dataframe = dataframe
+        return dataframe
+
+    # * Getters
+
+    def get_positions(self) -> np.ndarray:
+        return self.__positions[:self.__iterations_recorded]
+
+    def get_velocities(self) -> np.ndarray:
+        return self.__velocities[:self.__iterations_recorded]
+
+    def get_pbests(self) -> np.ndarray:
+        return self.__pbests[:self.__iterations_recorded]
+
+    def get_fitness(self) -> np.ndarray:
+        return self.__fitness[:self.__iterations_recorded]
+
+    def get_gbest_indexes(self) -> np.ndarray:
+        return self.__gbest_indexes[:self.__iterations_recorded]
+
+    def get_iteration_numbers(self) -> np.ndarray:
+        return self.__iteration_numbers[:self.__iterations_recorded]
+
+    def get_iterations_recorded(self) -> int:
+        return self.__iterations_recorded
+
+    def get_particle_amount(self) -> int:
+        return self.__fitness.shape[1]
+
+    def get_dimensions(self) -> int:
+        return self.__positions.shape[2]
+
+    def get_directory(self) -> str:
+        return self.__directory
+
+    def get_metadata(self) -> dict:
+        """Returns the header of the history: the format version, the shape
+        and dtype of every array, the iterations recorded and the
+        parameters of the run."""
+        arrays: tuple[np.ndarray, ...] = (self.__positions, self.__velocities, self.__pbests, self.__fitness, self.__gbest_indexes, self.__iteration_numbers)
+        return {"format": FORMAT_VERSION, "iterations": self.__iterations,
+            "particle_amount": self.get_particle_amount(), "dimensions": self.get_dimensions(),
+            "iterations_recorded": self.__iterations_recorded,
+            "arrays": {name: {"shape": list(array.shape), "dtype": array.dtype.str} for name, array in zip(ARRAYS, arrays)},
+            "parameters": self.__parameters}
+
+class Trace:
+    """
+    A table with one row of values per recorded iteration of an
+    optimization, allocated once for the whole run, for the recording
+    policies that do not keep the state of every particle (see
+    pso.recording). It must have a gbest_index column.
+
+    ## Parameters
+    - column_names : list[str]
+        The names of the values of every row.
+    - iterations : int
+        The maximum number of iterations of the run.
+    - rows : int, optional
+        The number of iterations that will be recorded. Default is None,
+        which is all of them (iterations + 1).
+    - parameters : dict, optional
+        Parameters of the run (JSON serializable). Default is None.
+
+    ## Attributes
+    - __column_names : list[str]
+        The names of the values of every row.
+    - __values : np.ndarray
+        The (rows, columns) array of values.
+    - __iteration_numbers : np.ndarray
+        The number of the iteration of every row.
+    - __iterations : int
+        The maximum number of iterations of the run.
+    - __iterations_recorded : int
+        The number of rows recorded so far.
+    - __parameters : dict
+        The parameters of the run.
+
+    ## Methods
+    - record(iteration, values)
+        Copies the values of the iteration into the next row.
+    - to_dataframe() -> pd.DataFrame
+        Returns the recorded rows with an Iteration column.
+    - _get_state() -> dict
+        Returns copies of the recorded rows, saved in checkpoints.
+    - _restore_state(state)
+        Records again the rows of a checkpoint.
+    """
+
+    def __init__(self, column_names: list[str], iterations: int, rows: int = None, parameters: dict = None) -> None:
+        if "gbest_index" not in column_names:
+            raise ValueError("A trace must have a gbest_index column.")
+        self.__column_names: list[str] = list(column_names)
+        self.__iterations: int = iterations
+        self.__values: np.ndarray = np.empty((iterations + 1 if rows is None else rows, len(column_names)))
+        self.__iteration_numbers: np.ndarray = np.zeros(self.__values.shape[0], dtype=int)
+        self.__iterations_recorded: int = 0
+        self.__parameters: dict = dict(parameters or {})
+
+    def __repr__(self) -> str:
+        return f"Trace of {self.__iterations_recorded} of {self.__values.shape[0]} iterations with the columns {self.__column_names}."
+
+    def record(self, iteration: int, values) -> None:
+        """Copies the values (in the order of the columns) of the given
+        iteration into the next row. Iterations must be recorded in order."""
+        row: int = self.__iterations_recorded
+        self.__values[row] = values
+        self.__iteration_numbers[row] = iteration
+        self.__iterations_recorded = row + 1
+
+    def _get_state(self) -> dict:
+        """Returns copies of the recorded rows, for checkpoints."""
+        return {"values": self.__values[:self.__iterations_recorded].copy(), "iteration_numbers": self.get_iteration_numbers().copy()}
+
+    def _restore_state(self, state: dict) -> None:
+        """Records again the rows returned by _get_state."""
+        for row, iteration in enumerate(state["iteration_numbers"]):
+            self.record(int(iteration), state["values"][row])
+
+    def to_dataframe(self) -> pd.DataFrame:
+        return pd.DataFrame(self.get_columns())
+
+    # * Getters
+
+    def get_columns(self) -> dict[str, np.ndarray]:
+        """Returns the recorded values of every column (views, not copies)
+        after an iteration column."""
+        recorded: int = self.__iterations_recorded
+        columns: dict[str, np.ndarray] = {"iteration": self.__iteration_numbers[:recorded]}
+        for column, name in enumerate(self.__column_names):
+            columns[name] = self.__values[:recorded, column]
+        return columns
+
+    def get_column_names(self) -> list[str]:
+        return self.__column_names
+
+    def get_gbest_indexes(self) -> np.ndarray:
+        return self.__values[:self.__iterations_recorded, self.__column_names.index("gbest_index")].astype(int)
+
+    def get_iteration_numbers(self) -> np.ndarray:
+        return self.__iteration_numbers[:self.__iterations_recorded]
+
+    def get_iterations_recorded(self) -> int:
+        return self.__iterations_recorded
+
+    def get_metadata(self) -> dict:
+        return {"format": FORMAT_VERSION, "iterations": self.__iterations, "iterations_recorded": self.__iterations_recorded,
+            "columns": self.__column_names, "parameters": self.__parameters}
@@ -7,136 +7,456 @@ Main: Main class to run the Particle Swarm Optimization (PSO) algorithm.
 ### Methods
 - graph_heuristic() -> None
 - graph_particles() -> None
-- heuristic(position: Position) -> float
+- heuristic(position: Vector | np.ndarray, selection: str = "2") -> float | np.ndarray
 - optimize() -> None
+- iterate(include_arrays: bool = False) -> Generator[Snapshot]
+- save_checkpoint(path: str = None) -> None
+- load_checkpoint(path: str = None) -> None
+- _move_particles(rows: slice) -> None
+- _synchronous_iterations() -> Generator
+- _asynchronous_iterations() -> Generator
+- _set_history(history: History | Trace, stopping_reason: str = MAX_ITERATIONS_REASON, iterations_run: int = None) -> None
 
 #### Getters
+- get_cache() -> FitnessCache
 - get_cognitive_coefficient() -> float
 - get_dimensions() -> int
+- get_evaluation_count() -> int
+- get_history() -> History | Trace
+- get_recording() -> RecordingPolicy
 - get_inertia_coefficient() -> float
 - get_iterations() -> int
+- get_iterations_run() -> int
+- get_checkpoint_path() -> str
+- get_parameters() -> dict
+- get_profiler() -> Profiler
+- get_stopping_criteria() -> list[StoppingCriterion]
+- get_stopping_reason() -> str
+- is_asynchronous() -> bool
+- is_verbose() -> bool
 - get_particle_amount() -> int
 - get_social_coefficient() -> float
 - get_swarm() -> ParticleSwarm
 """
-import math
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, wait
 
 import numpy as np
-import pandas as pd
 
+from pso.checkpoint import load_checkpoint, save_checkpoint
+from pso.evaluation.cache import FitnessCache
+from pso.evaluation.evaluator import Evaluator
+from pso.history import History, Trace
+from pso.profiling import Profiler
+from pso.recording import FullRecording, RecordingPolicy
+from pso.snapshot import Snapshot
+from pso.swarm.domain import Domain
 from pso.swarm.particle_swarm import ParticleSwarm
-from pso.vector.position import Position
+from pso.swarm.stopping import StoppingCriterion
+from pso.swarm.topology import Topology
+from pso.vector.base_vector import Vector
+from pso.vector.benchmarks import BenchmarkFunction, get_benchmark
+from pso.vector.heuristic import evaluate_position
 from pso.database.data import Data
 
+MAX_ITERATIONS_REASON: str = "The maximum number of iterations was reached."
+# * The functions of the benchmark registry the selections of the heuristic method stand for, the sphere for any other
+HEURISTIC_SELECTIONS: dict[str, str] = {"1": "sphere", "2": "rastrigin", "3": "goldstein_price", "4": "booth"}
+
 class Optimization:
-    def __init__(self, index: int, data: Data = Data("test"), cognitive_coefficient: float = 2.05, inertia_coefficient: float = 0.7, social_coefficient: float = 2.05, particle_amount: int = 10, dimensions: int = 3, iterations: int = 20) -> None:
+    def __init__(self, index: int, data: Data = Data("test"), cognitive_coefficient: float = 2.05, inertia_coefficient: float = 0.7, social_coefficient: float = 2.05, particle_amount: int = 10, dimensions: int = 3, iterations: int = 20, evaluator: Evaluator = None, asynchronous: bool = False, cache_size: int = 0, cache_tolerance: float = 1e-9, stopping_criteria: list[StoppingCriterion] = None, topology: Topology = None, seed: int | np.random.SeedSequence = None, random_coefficients: str = "particle", domain: Domain = None, heuristic = None, profile: bool = False, memory_mapped_history: bool = False, recording: RecordingPolicy = None, checkpoint_path: str = None, checkpoint_interval: int = None, checkpoint_seconds: float = None, verbose: bool = True) -> None:
         self.__data: Data = data
-        # ? Might need to make a heuristic function class or at least a
-        # ? heuristic function attribute to display it in the select menu of the GUI.
         self.__iterations: int = iterations
+        # * A name of the benchmark registry or any batch or legacy heuristic function, searched in the bounds of the
+        # * registry. By default, the function of the heuristic method in the default domain of the swarm ([-10, 10])
+        registry_bounds: bool = heuristic is not None
+        if heuristic is None:
+            heuristic = HEURISTIC_SELECTIONS["2"]
+        heuristic_f: callable = get_benchmark(heuristic) if isinstance(heuristic, str) else heuristic
+        if isinstance(heuristic_f, BenchmarkFunction):
+            # * The heuristic value is one of the dimensions
+            if not heuristic_f.supports(dimensions - 1):
+                raise ValueError(f"The {heuristic_f.get_name()} function does not support {dimensions - 1} dimensions.")
+            if domain is None and registry_bounds:
+                domain = Domain(*heuristic_f.get_bounds())
+        if cache_size > 0:
+            # * Kept with the swarm, so later runs of the optimization reuse it
+            heuristic_f = FitnessCache(heuristic_f, cache_tolerance, cache_size)
         # * So it doesn't create two particle swarms with different dimensions
-        self.__swarm: ParticleSwarm = ParticleSwarm(inertia_coefficient, cognitive_coefficient, social_coefficient, dimensions, particle_amount, self.heuristic)
+        self.__swarm: ParticleSwarm = ParticleSwarm(inertia_coefficient, cognitive_coefficient, social_coefficient, dimensions, particle_amount, heuristic_f, evaluator, topology, seed, random_coefficients, domain)
         self.__index: int = index
         self._dimensions: int = dimensions
+        # * If the swarm is updated particle by particle (steady-state PSO)
+        self.__asynchronous: bool = asynchronous
+        # * Checked after every iteration, the first one that is met stops the run
+        self.__stopping_criteria: list[StoppingCriterion] = list(stopping_criteria or [])
+        self.__stopping_reason: str = None
+        self.__iterations_run: int = 0
+        # * Disabled unless asked for, then it only costs a method call per phase
+        self.__profiler: Profiler = Profiler(profile)
+        # * Recorded by optimize, the DataFrame layout is only built when asked for
+        self.__history: History | Trace = None
+        # * What optimize records of every iteration, the state of every particle by default
+        self.__recording: RecordingPolicy = recording if recording is not None else FullRecording()
+        # * Where the state of the run is written every checkpoint_interval iterations and/or checkpoint_seconds seconds
+        if asynchronous and checkpoint_path is not None:
+            raise ValueError("The asynchronous mode can not be checkpointed, its evaluations in flight are not part of the state.")
+        self.__checkpoint_path: str = checkpoint_path
+        self.__checkpoint_interval: int = checkpoint_interval
+        self.__checkpoint_seconds: float = checkpoint_seconds
+        # * If optimize prints the gbest of every iteration, as it always did
+        self.__verbose: bool = verbose
+        # * The iteration the swarm is at and if the stopping criteria have seen it, both saved in checkpoints
+        self.__iteration: int = 0
+        self.__criteria_checked: bool = False
+        # * Set by load_checkpoint, the next run continues from it instead of initializing the swarm
+        self.__resume: dict = None
+        # * While optimize records a run, checkpoints also save what it recorded so far
+        self.__recording_run: bool = False
+        # * If the history is kept in .npy files in the session directory of the Data object instead of in memory
+        if memory_mapped_history and data is None:
+            raise ValueError("A memory-mapped history needs a Data object for its session directory.")
+        self.__memory_mapped_history: bool = memory_mapped_history
+        self.__parameters: dict = {"index": index, "cognitive_coefficient": cognitive_coefficient,
+            "inertia_coefficient": inertia_coefficient, "social_coefficient": social_coefficient,
+            "particle_amount": particle_amount, "dimensions": dimensions, "iterations": iterations,
+            "heuristic": heuristic if isinstance(heuristic, str) else getattr(heuristic, "__name__", type(heuristic).__name__),
+            "asynchronous": asynchronous, "topology": type(self.__swarm.get_topology()).__name__,
+            "random_coefficients": random_coefficients, "boundary": self.__swarm.get_domain().get_boundary(),
+            "seed_entropy": self.__swarm.get_seed_sequence().entropy,
+            "seed_spawn_key": list(self.__swarm.get_seed_sequence().spawn_key)}
     
-    def heuristic(self, position: Position, selection: str = "2") -> float:
-        """Heuristic function to be optimized."""
-        # TODO: Make a better implementation of choosing the desired function, at the moment it's done manually, by modifying the variable selection through the parameters
-        # TODO: Implement the second function to the dimension that the user selects. It is set to two dimensions. ? A dimension parameter in the heuristic ? 
-        # * Agree, but what should be then the type of the heuristic_value? A list or maybe an ndarray?
-        
-        if selection == "1":
-            return np.sum(np.square(position.get_coordinates()))
-        
-        elif selection == "2":
-            #return 20 + np.sum(np.square(position.get_coordinates()) - 10*math.cos(2 * math.pi *position.get_coordinates()[0]))
-            # Don't know why self._dimensions doesn't work, have to put manually the number of dimensions
-            sum = 10 * 2
-            for i in range (2):
-                sum += position.get_coordinates()[i]**2 - 10*math.cos(2 * math.pi *position.get_coordinates()[i])
-            return sum 
-        
-        elif selection == "3": #(0,-1)
-            x = position.get_coordinates()[0]
-            y = position.get_coordinates()[1]
-            return((1 + (x+y+1)**2 * (19 - 14 * x + 3 * x**2 - 14 * y + 6*x*y + 3*y**2)) * (30 + (2*x - 3*y)**2 * (18 - 32 * x + 12 * x**2 + 48 * y - 36*x*y + 27 * y**2)))
-        
-        elif selection == "4": #(1,3)
-            x = position.get_coordinates()[0]
-            y = position.get_coordinates()[1]
-            return (x + 2*y - 7)**2 + (2*x + y - 5)**2
-        
-        else:
-            return np.sum(np.square(position.get_coordinates()))
-        
+    def heuristic(self, position: Vector | np.ndarray, selection: str = "2") -> float | np.ndarray:
+        """Heuristic function to be optimized: the function of the benchmark
+        registry given by selection (see HEURISTIC_SELECTIONS), evaluated on
+        every coordinate of a single Position or of every row of an (N, D)
+        array at once."""
+        heuristic_f: BenchmarkFunction = get_benchmark(HEURISTIC_SELECTIONS.get(selection, "sphere"))
+        if isinstance(position, Vector):
+            return evaluate_position(heuristic_f, position)
+        return heuristic_f(position)
+
     def optimize(self) -> None:
-        """Optimizes the heuristic function using the PSO algorithm."""
+        """Optimizes the heuristic function using the PSO algorithm, either
+        synchronously (every particle is evaluated before gbest is updated)
+        or asynchronously (see _asynchronous_iterations), and stores the
+        history of the run (what its recording policy keeps) in the Data
+        object."""
         swarm = self.__swarm
-        swarm._initialize_particles_randomly()
-        swarm.update_gbest()
-        swarm_gbest_index: list[int] = []
-        optimization_df: pd.DataFrame = pd.DataFrame(columns = ["Heuristic",
-                                            "Position", "Velocity", "Pbest"])
-        # * A df of nan's is created to separate optimizations more evidently when passing them to the database and when showing them in the GUI
-        nan_df = pd.DataFrame(([np.nan] * 4), index = ["Heuristic", "Position",
-                                                       "Velocity", "Pbest"]).T
-
-        for iteration_num in range(self.__iterations + 1):
-            iteration_data: dict = {"Heuristic": [], "Position": [],
-                                    "Velocity": [], "Pbest": []}
-            for particle in swarm.get_particles():
-                if iteration_num > 0: 
-                    # * To record the initial states of the particles before optimizing them
-                    particle._update_velocity(swarm.get_gbest())
-                    particle.get_position()._update(particle.get_velocity())
-                    particle.get_velocity().set_coordinates(np.clip(particle.get_position().get_coordinates(), -5, 5))
-                    
-                    new_position = particle.get_position().get_coordinates()
-                    new_position = np.clip(new_position, -10, 10)
-                    particle.get_position().set_coordinates(new_position) 
-                    
-                    # ! Gbest is not actually gbest
-                    particle.get_heuristic()._update(particle.get_position())
-                    particle._update_pbest()
-
-                # * Append the data of each particle after a certain iteration
-                # * to a temporary dictionary
-                # ? Should the np.ndarrays be copies?
-                iteration_data["Heuristic"].append(np.round(particle.
-                    get_heuristic().get_coordinates().copy(), 2))
-                iteration_data["Position"].append(np.round(particle.
-                    get_position().get_coordinates().copy(), 2))
-                iteration_data["Velocity"].append(np.round(particle.
-                    get_velocity().get_coordinates().copy(), 2))
-                iteration_data["Pbest"].append(np.round(particle.
-                    get_pbest().get_coordinates().copy(), 2))
-
-            # * Append the last iteration's data and the index of the particle
-            # * with the best heuristic to the database.
-            swarm.update_gbest()
-            # print(swarm.get_gbest())
-            optimization_df = pd.concat([optimization_df, pd.DataFrame(iteration_data)])
-            # TODO: Check the logic behind the if.
-            # * Seems to be working fine
-            if iteration_num != self.__iterations:
-                optimization_df = pd.concat([optimization_df, nan_df])
-            print(f"Global best: {swarm.get_gbest()}, Heuristic value:{swarm.get_heuristic()(swarm.get_gbest())}\n")
+        directory: str = None
+        if self.__memory_mapped_history:
+            # * Numbered like the sheet and the columnar file the run will get
+            directory = self.__data.get_optimization_path(self.__data.get_number_of_optimizations() + 1)
+        recording: RecordingPolicy = self.__recording
+        history: History | Trace = recording._start(self.__iterations, swarm.get_particle_amount(), swarm.get_positions().shape[1],
+            directory, self.__parameters)
+        self.__history = history
+        profiler: Profiler = self.__profiler
+        # * A resumed run starts with what was recorded before its checkpoint, which may include the iteration it resumes at
+        recorded_until: int = -1
+        if self.__resume is not None and self.__resume["history"] is not None:
+            history._restore_state(self.__resume["history"])
+            if history.get_iterations_recorded() > 0:
+                recorded_until = int(history.get_iteration_numbers()[-1])
+
+        # * The initial states of the particles are recorded before optimizing them
+        self.__recording_run = True
+        try:
+            for snapshot in self.iterate(include_arrays=recording.needs_arrays()):
+                if snapshot.get_iteration() > recorded_until:
+                    with profiler.measure("history"):
+                        recording.record(snapshot)
+                if self.__verbose:
+                    print(f"Global best: {swarm.get_gbest()}, Heuristic value:{snapshot.get_gbest_fitness()}\n")
+        finally:
+            self.__recording_run = False
+        # * The arrays of the last snapshot still hold the final state of the swarm
+        with profiler.measure("history"):
+            recording.finish(snapshot)
 
         # * Append the indexes of the particles with the best heuristic to the
         # * database and create a spreadsheet with the optimization results.
-        self.__data.append_gbest_indexes(swarm_gbest_index)
-        self.__data.append_optimization(optimization_df)
+        with profiler.measure("persistence"):
+            if isinstance(history, History):
+                history.flush()
+            self.__data.append_gbest_indexes(history.get_gbest_indexes().tolist())
+            self.__data.append_stopping_reason(self.__stopping_reason)
+            self.__data.append_optimization(history)
         # self.__data.print_optimization(0)   
+
+    def iterate(self, include_arrays: bool = False):
+        """Generator that initializes the swarm and runs the optimization one
+        iteration at a time, yielding a Snapshot of the initial state and of
+        the state after every iteration. Nothing is recorded or stored, so
+        the memory used does not grow with the iterations, and the caller
+        can stop whenever it wants by not resuming (or closing) it.
+
+        The run also ends when the iterations are over or a stopping
+        criterion is met (checked after each snapshot is consumed), and
+        get_stopping_reason and get_iterations_run describe how it ended.
+
+        ## Parameters
+        include_arrays : bool
+            If the snapshots carry read-only views of the arrays of the
+            swarm (valid until the generator is resumed). Default is False.
+        """
+        swarm = self.__swarm
+        resume: dict = self.__resume
+        self.__resume = None
+        start: int = 0
+        # * After load_checkpoint the swarm and the criteria are already where the run was
+        if resume is None:
+            swarm._initialize_particles_randomly()
+            for criterion in self.__stopping_criteria:
+                criterion.reset()
+        else:
+            start = resume["iteration"]
+        self.__stopping_reason = MAX_ITERATIONS_REASON
+        self.__iterations_run = start
+        profiler: Profiler = self.__profiler
+        profiler.reset()
+        if self.__asynchronous:
+            iteration_steps = self._asynchronous_iterations()
+        else:
+            iteration_steps = self._synchronous_iterations()
+        last_checkpoint: float = time.perf_counter()
+
+        try:
+            for iteration_num in range(start, self.__iterations + 1):
+                if iteration_num > start:
+                    next(iteration_steps)
+                self.__iteration = iteration_num
+                self.__criteria_checked = False
+                yield self._snapshot(iteration_num, include_arrays)
+                profiler.end_iteration()
+                self.__iterations_run = iteration_num
+                # * The criteria are not shown again the iteration of a checkpoint they had already seen
+                if iteration_num == start and resume is not None and resume["criteria_checked"]:
+                    met: StoppingCriterion = None
+                else:
+                    met = next((criterion for criterion in self.__stopping_criteria if criterion.check(swarm)), None)
+                self.__criteria_checked = True
+                if met is not None:
+                    self.__stopping_reason = met.get_reason()
+                    break
+                if self.__checkpoint_path is not None and iteration_num > start and iteration_num < self.__iterations and (
+                        (self.__checkpoint_interval is not None and iteration_num % self.__checkpoint_interval == 0)
+                        or (self.__checkpoint_seconds is not None and time.perf_counter() - last_checkpoint >= self.__checkpoint_seconds)):
+                    self.save_checkpoint()
+                    last_checkpoint = time.perf_counter()
+        finally:
+            iteration_steps.close()
+
+    def save_checkpoint(self, path: str = None) -> None:
+        """Writes the complete state of the run to path (the checkpoint_path
+        of the optimization by default): the arrays and gbest of the swarm,
+        its random generator and topology, the stopping criteria and the
+        iteration, so load_checkpoint can continue it bit for bit.
+
+        It can be called between two iterations of iterate. The evaluator
+        is not part of the state, so heuristic functions that draw their
+        own random numbers (or surrogate evaluators) only continue exactly
+        if they do not depend on what they saw before.
+
+        While optimize runs, the rows its recording policy has recorded so
+        far are saved too, so the resumed run stores the history of the
+        whole run. The checkpoint grows with them, so long runs that are
+        checkpointed often are better recorded with a decimated, gbest or
+        summary policy. Runs driven by iterate record nothing, so nothing
+        else is saved."""
+        if self.__asynchronous:
+            raise ValueError("The asynchronous mode can not be checkpointed, its evaluations in flight are not part of the state.")
+        save_checkpoint(path if path is not None else self.__checkpoint_path, {
+            "iteration": self.__iteration, "criteria_checked": self.__criteria_checked, "iterations": self.__iterations,
+            "swarm": self.__swarm._get_state(),
+            "stopping_criteria": [criterion._get_state() for criterion in self.__stopping_criteria],
+            "history": self.__history._get_state() if self.__recording_run else None,
+            "parameters": self.__parameters})
+
+    def load_checkpoint(self, path: str = None) -> None:
+        """Restores the state written by save_checkpoint to path (the
+        checkpoint_path of the optimization by default). The next call of
+        optimize or iterate continues the run from it instead of starting
+        a new one. The optimization must have been created with the same
+        parameters as the one that wrote the checkpoint."""
+        state: dict = load_checkpoint(path if path is not None else self.__checkpoint_path)
+        if state["iterations"] != self.__iterations or len(state["stopping_criteria"]) != len(self.__stopping_criteria):
+            raise ValueError("The checkpoint was written by an optimization with other iterations or stopping criteria.")
+        self.__swarm._restore_state(state["swarm"])
+        for criterion, criterion_state in zip(self.__stopping_criteria, state["stopping_criteria"]):
+            criterion._set_state(criterion_state)
+        self.__iteration = state["iteration"]
+        self.__criteria_checked = state["criteria_checked"]
+        self.__iterations_run = state["iteration"]
+        self.__resume = {"iteration": state["iteration"], "criteria_checked": state["criteria_checked"], "history": state.get("history")}
+
+    def _snapshot(self, iteration_num: int, include_arrays: bool) -> Snapshot:
+        """Returns the Snapshot of the current state of the swarm."""
+        swarm = self.__swarm
+        arrays: dict[str, np.ndarray] = {}
+        if include_arrays:
+            for name, array in (("positions", swarm.get_positions()), ("velocities", swarm.get_velocities()),
+                    ("pbests", swarm.get_pbests()), ("fitness", swarm.get_fitness()), ("pbest_fitness", swarm.get_pbest_fitness())):
+                # * A read-only view, so the caller can not corrupt the swarm
+                arrays[name] = array.view()
+                arrays[name].flags.writeable = False
+        return Snapshot(iteration_num, swarm.get_gbest().get_coordinates().copy(), swarm.get_gbest_fitness(),
+            swarm.get_gbest_index(), swarm.get_evaluation_count(), **arrays)
+
+    def _move_particles(self, rows: slice = slice(None)) -> None:
+        """Updates the velocities and positions of the swarm (or of the
+        given rows) and keeps them inside the domain of the swarm.
+
+        ## Parameters
+        rows : slice
+            The particles to move. Default is the whole swarm.
+        """
+        swarm = self.__swarm
+        profiler: Profiler = self.__profiler
+        with profiler.measure("velocity"):
+            swarm._update_velocities(rows=rows)
+        with profiler.measure("position"):
+            swarm._update_positions(rows)
+        with profiler.measure("clipping"):
+            swarm._enforce_domain(rows)
+
+    def _synchronous_iterations(self):
+        """Generator that runs one iteration of the swarm each time it is
+        resumed: every particle is moved and evaluated, and only then are
+        the pbests and gbest updated."""
+        swarm = self.__swarm
+        profiler: Profiler = self.__profiler
+        for _ in range(self.__iterations):
+            self._move_particles()
+            with profiler.measure("evaluation"):
+                swarm._evaluate()
+            with profiler.measure("pbest"):
+                swarm._update_pbests()
+            with profiler.measure("gbest"):
+                swarm.update_gbest()
+            swarm.get_topology()._next_iteration()
+            yield
+
+    def _asynchronous_iterations(self):
+        """Generator for the asynchronous (steady-state) mode. Each particle
+        is submitted to the evaluator on its own and, as soon as its
+        evaluation finishes, its pbest and the gbest are updated and it is
+        moved (with the latest gbest) and submitted again, so no particle
+        waits for the slowest evaluation of an iteration.
+
+        It yields every time as many evaluations as particles have finished,
+        which is what counts as an iteration in this mode.
+
+        ### Notes
+        - With the default (serial) evaluator the particles are evaluated
+        one after the other, each one already seeing the updates of the
+        previous ones.
+        - With a pool evaluator the order in which the evaluations finish
+        (and so the random numbers each particle gets) is not reproducible.
+        """
+        swarm = self.__swarm
+        profiler: Profiler = self.__profiler
+        evaluator = swarm.get_evaluator()
+        heuristic_f: callable = swarm.get_heuristic()
+        particle_amount: int = swarm.get_particle_amount()
+        budget: int = self.__iterations * particle_amount
+        cache: FitnessCache = self.get_cache()
+        pending: dict[Future, int] = {}
+        # * The futures of the positions found in the cache, which are not counted as evaluations
+        cached: set[Future] = set()
+        submitted: int = 0
+        completed: int = 0
+
+        def submit(index: int) -> None:
+            self._move_particles(slice(index, index + 1))
+            hits: int = cache.get_hits() if cache is not None else 0
+            # * A copy so the evaluation is not affected by later updates
+            with profiler.measure("evaluation"):
+                future: Future = evaluator.submit(heuristic_f, swarm.get_positions()[index].copy())
+            pending[future] = index
+            if cache is not None and cache.get_hits() > hits:
+                cached.add(future)
+
+        for index in range(min(particle_amount, budget)):
+            submit(index)
+            submitted += 1
+        try:
+            while pending:
+                with profiler.measure("evaluation"):
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                # * Sorted so the serial evaluator is deterministic
+                for future in sorted(done, key=pending.get):
+                    index: int = pending.pop(future)
+                    with profiler.measure("pbest"):
+                        swarm._store_fitness(index, future.result(), future not in cached)
+                    cached.discard(future)
+                    completed += 1
+                    if submitted < budget:
+                        submit(index)
+                        submitted += 1
+                    if completed % particle_amount == 0:
+                        swarm.get_topology()._next_iteration()
+                        yield
+        finally:
+            for future in pending:
+                future.cancel()
     
+    def get_cache(self) -> FitnessCache:
+        """Returns the fitness cache of the heuristic function, or None if
+        the optimization does not use one."""
+        heuristic_f: callable = self.__swarm.get_heuristic()
+        return heuristic_f if isinstance(heuristic_f, FitnessCache) else None
+
     def get_dimensions(self) -> int:
         return self._dimensions
     
+    def get_evaluation_count(self) -> int:
+        return self.__swarm.get_evaluation_count()
+    
+    def get_checkpoint_path(self) -> str:
+        return self.__checkpoint_path
+
+    def get_recording(self) -> RecordingPolicy:
+        return self.__recording
+
+    def get_history(self) -> History | Trace:
+        return self.__history
+
+    def _set_history(self, history: History | Trace, stopping_reason: str = MAX_ITERATIONS_REASON, iterations_run: int = None) -> None:
+        """Sets the history of a run recorded elsewhere (e.g. the islands of
+        an IslandModel) and how that run ended. The iterations run are the
+        last one recorded by default."""
+        self.__history = history
+        self.__stopping_reason = stopping_reason
+        self.__iterations_run = int(history.get_iteration_numbers()[-1]) if iterations_run is None else iterations_run
+    
     def get_index(self) -> int:
         return self.__index
     
+    def get_profiler(self) -> Profiler:
+        return self.__profiler
+
+    def get_parameters(self) -> dict:
+        return self.__parameters
+    
     def get_iterations(self) -> int:
         return self.__iterations
 
+    def get_iterations_run(self) -> int:
+        return self.__iterations_run
+
+    def get_stopping_criteria(self) -> list[StoppingCriterion]:
+        return self.__stopping_criteria
+
+    def get_stopping_reason(self) -> str:
+        return self.__stopping_reason
+
+    def is_asynchronous(self) -> bool:
+        return self.__asynchronous
+
+    def is_verbose(self) -> bool:
+        return self.__verbose
+
     def get_swarm(self) -> ParticleSwarm:
         return self.__swarm
 
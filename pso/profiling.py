@@ -0,0 +1,148 @@
+"""
+This module defines the Profiler class, which measures the wall time spent
+in each phase of an optimization (see Optimization.optimize).
+
+## Classes
+- Profiler: Cumulative and per-iteration wall time of the phases of an optimization.
+
+### Methods
+- measure(phase: str) -> context manager
+- end_iteration() -> None
+- reset() -> None
+- format_report() -> str
+
+#### Getters
+- get_report() -> dict[str, dict]
+- get_series() -> list[dict[str, float]]
+- is_enabled() -> bool
+"""
+
+import contextlib
+import time
+
+PHASES: tuple[str, ...] = ("velocity", "position", "clipping", "evaluation", "pbest", "gbest", "history", "persistence")
+
+# * Shared by every disabled profiler, entering and exiting it does nothing
+_NULL_CONTEXT: contextlib.nullcontext = contextlib.nullcontext()
+
+class _PhaseTimer:
+    """Context manager that adds the time spent inside it to a phase of a
+    profiler. There is one per phase, created with the profiler, so
+    measuring does not allocate anything."""
+
+    def __init__(self, profiler: "Profiler", phase: str) -> None:
+        self.__profiler: Profiler = profiler
+        self.__phase: str = phase
+        self.__start: float = 0.0
+
+    def __enter__(self) -> None:
+        self.__start = time.perf_counter()
+
+    def __exit__(self, *exc_info) -> None:
+        self.__profiler._add(self.__phase, time.perf_counter() - self.__start)
+
+class Profiler:
+    """
+    Measures the cumulative wall time and the number of calls of each phase
+    of an optimization, and the time of each phase in every iteration.
+
+    The phases are the velocity update, the position update, the clipping
+    (boundary handling of the domain), the evaluation of the heuristic
+    function, the pbest update, the gbest update, the recording of the
+    history and the persistence through Data. In the asynchronous mode
+    the evaluation is the time spent submitting the evaluations and
+    waiting for them to finish, and the pbest phase includes the gbest
+    update, since both are done at once for each particle.
+
+    The per-iteration series only covers the iterations themselves: the
+    final recording of the history and the persistence happen once, after
+    the last iteration is closed, so they are only in the cumulative
+    report (the persistence column of the series is always zero).
+
+    A disabled profiler hands out a shared no-op context manager, so the
+    instrumented code only pays for a method call per phase.
+
+    ## Parameters
+    - enabled : bool, optional
+        If the phases are measured. Default is True.
+
+    ## Attributes
+    - __enabled : bool
+        If the phases are measured.
+    - __seconds : dict[str, float]
+        The cumulative time of each phase.
+    - __calls : dict[str, int]
+        The number of times each phase was measured.
+    - __current : dict[str, float]
+        The time of each phase in the current iteration.
+    - __series : list[dict[str, float]]
+        The time of each phase in every finished iteration.
+    - __timers : dict[str, _PhaseTimer]
+        The context manager of each phase.
+
+    ## Methods
+    - measure(phase)
+        Returns a context manager that adds the time spent inside it to the phase.
+    - end_iteration()
+        Closes the current iteration of the per-iteration series.
+    - reset()
+        Forgets every measurement.
+    - format_report() -> str
+        Returns the report as a table.
+    """
+
+    def __init__(self, enabled: bool = True) -> None:
+        self.__enabled: bool = enabled
+        self.__timers: dict[str, _PhaseTimer] = {phase: _PhaseTimer(self, phase) for phase in PHASES}
+        self.reset()
+
+    def __repr__(self) -> str:
+        return f"Profiler ({'enabled' if self.__enabled else 'disabled'}) of {len(self.__series)} iterations."
+
+    def measure(self, phase: str):
+        """Returns a context manager that adds the wall time spent inside it
+        to the given phase (one of PHASES)."""
+        if not self.__enabled:
+            return _NULL_CONTEXT
+        return self.__timers[phase]
+
+    def _add(self, phase: str, seconds: float) -> None:
+        self.__seconds[phase] += seconds
+        self.__calls[phase] += 1
+        self.__current[phase] += seconds
+
+    def end_iteration(self) -> None:
+        """Adds the times of the current iteration to the series and starts
+        a new one."""
+        if self.__enabled:
+            self.__series.append(self.__current)
+            self.__current = dict.fromkeys(PHASES, 0.0)
+
+    def reset(self) -> None:
+        self.__seconds: dict[str, float] = dict.fromkeys(PHASES, 0.0)
+        self.__calls: dict[str, int] = dict.fromkeys(PHASES, 0)
+        self.__current: dict[str, float] = dict.fromkeys(PHASES, 0.0)
+        self.__series: list[dict[str, float]] = []
+
+    def format_report(self) -> str:
+        """Returns the report as a table with the time, calls and share of
+        the total of every phase."""
+        lines: list[str] = [f"{'phase':>12} {'seconds':>12} {'calls':>8} {'share':>7}"]
+        for phase, row in self.get_report().items():
+            lines.append(f"{phase:>12} {row['seconds']:>12.6f} {row['calls']:>8} {row['fraction']:>7.1%}")
+        return "\n".join(lines)
+
+    # * Getters
+
+    def get_report(self) -> dict[str, dict]:
+        """Returns, for every phase, its cumulative time in seconds, its
+        number of calls and its fraction of the total measured time."""
+        total: float = sum(self.__seconds.values())
+        return {phase: {"seconds": self.__seconds[phase], "calls": self.__calls[phase],
+            "fraction": self.__seconds[phase] / total if total > 0 else 0.0} for phase in PHASES}
+
+    def get_series(self) -> list[dict[str, float]]:
+        return self.__series
+
+    def is_enabled(self) -> bool:
+        return self.__enabled
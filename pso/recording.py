@@ -0,0 +1,178 @@
+"""
+This module defines the recording policies, which decide what an
+optimization records of every iteration (see Optimization.optimize) and so
+what Data writes: the whole state of the swarm in every iteration, in some
+of them, or a single row of values per iteration.
+
+## Classes
+- RecordingPolicy: Base class of the recording policies.
+- FullRecording: The state of every particle in every iteration.
+- DecimatedRecording: The state of every particle every k iterations (and the last one).
+- FinalStateRecording: The state of every particle after the last iteration.
+- GbestRecording: The trajectory of the gbest.
+- SummaryRecording: Summary statistics of the swarm in every iteration.
+
+### Methods
+- needs_arrays() -> bool
+- _start(iterations: int, particle_amount: int, dimensions: int, directory: str = None, parameters: dict = None) -> History | Trace
+- record(snapshot: Snapshot) -> None
+- finish(snapshot: Snapshot) -> None
+- get_recording() -> History | Trace
+"""
+
+import numpy as np
+
+from pso.history import History, Trace
+from pso.snapshot import Snapshot
+
+class RecordingPolicy:
+    """
+    Base class of the recording policies. Optimization.optimize starts the
+    policy at the beginning of every run, passes it the snapshot of every
+    iteration and then the last snapshot again, once the run is over.
+
+    ## Attributes
+    - _recording : History | Trace
+        Where the current run is recorded.
+
+    ## Methods
+    - needs_arrays() -> bool
+        Returns True if the snapshots must include the arrays of the swarm.
+    - _start(iterations, particle_amount, dimensions, directory=None, parameters=None) -> History | Trace
+        Creates and returns the recording of a new run. The directory is
+        where a History is memory-mapped (None keeps it in memory).
+    - record(snapshot)
+        Records an iteration, if the policy keeps it.
+    - finish(snapshot)
+        Called with the last snapshot once the run is over.
+    """
+
+    def __init__(self) -> None:
+        self._recording: History | Trace = None
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__} recording policy."
+
+    def needs_arrays(self) -> bool:
+        return True
+
+    def _start(self, iterations: int, particle_amount: int, dimensions: int, directory: str = None, parameters: dict = None) -> History | Trace:
+        raise NotImplementedError
+
+    def record(self, snapshot: Snapshot) -> None:
+        raise NotImplementedError
+
+    def finish(self, snapshot: Snapshot) -> None:
+        pass
+
+    def get_recording(self) -> History | Trace:
+        return self._recording
+
+    def _record_state(self, snapshot: Snapshot) -> None:
+        self._recording.record(snapshot.get_iteration(), snapshot.get_positions(), snapshot.get_velocities(),
+            snapshot.get_pbests(), snapshot.get_fitness(), snapshot.get_gbest_index())
+
+class FullRecording(RecordingPolicy):
+    """
+    Records the state of every particle in every iteration. The default.
+    """
+
+    def _start(self, iterations: int, particle_amount: int, dimensions: int, directory: str = None, parameters: dict = None) -> History:
+        self._recording = History(iterations, particle_amount, dimensions, directory, {**(parameters or {}), "recording": "full"})
+        return self._recording
+
+    def record(self, snapshot: Snapshot) -> None:
+        self._record_state(snapshot)
+
+class DecimatedRecording(RecordingPolicy):
+    """
+    Records the state of every particle every k iterations, starting with
+    the initial state, and after the last iteration.
+
+    ## Parameters
+    - every : int, optional
+        The number of iterations between two recorded ones. Default is 10.
+    """
+
+    def __init__(self, every: int = 10) -> None:
+        super().__init__()
+        if every < 1:
+            raise ValueError("The recorded iterations must be at least 1 iteration apart.")
+        self.__every: int = every
+
+    def _start(self, iterations: int, particle_amount: int, dimensions: int, directory: str = None, parameters: dict = None) -> History:
+        self._recording = History(iterations, particle_amount, dimensions, directory,
+            {**(parameters or {}), "recording": "decimated", "every": self.__every}, rows=iterations // self.__every + 2)
+        return self._recording
+
+    def record(self, snapshot: Snapshot) -> None:
+        if snapshot.get_iteration() % self.__every == 0:
+            self._record_state(snapshot)
+
+    def finish(self, snapshot: Snapshot) -> None:
+        if snapshot.get_iteration() % self.__every != 0:
+            self._record_state(snapshot)
+
+    def get_every(self) -> int:
+        return self.__every
+
+class FinalStateRecording(RecordingPolicy):
+    """
+    Records the state of every particle after the last iteration only.
+    """
+
+    def _start(self, iterations: int, particle_amount: int, dimensions: int, directory: str = None, parameters: dict = None) -> History:
+        self._recording = History(iterations, particle_amount, dimensions, directory, {**(parameters or {}), "recording": "final"}, rows=1)
+        return self._recording
+
+    def record(self, snapshot: Snapshot) -> None:
+        pass
+
+    def finish(self, snapshot: Snapshot) -> None:
+        self._record_state(snapshot)
+
+class GbestRecording(RecordingPolicy):
+    """
+    Records the trajectory of the gbest: its heuristic value, the index of
+    its particle, the evaluations so far and its coordinates (gbest_0,
+    gbest_1, ...) in every iteration. It does not need the arrays of the
+    swarm, so the snapshots are not given them.
+    """
+
+    def needs_arrays(self) -> bool:
+        return False
+
+    def _start(self, iterations: int, particle_amount: int, dimensions: int, directory: str = None, parameters: dict = None) -> Trace:
+        self._recording = Trace(["gbest_fitness", "gbest_index", "evaluation_count"] + [f"gbest_{coordinate}" for coordinate in range(dimensions)],
+            iterations, parameters={**(parameters or {}), "recording": "gbest"})
+        return self._recording
+
+    def record(self, snapshot: Snapshot) -> None:
+        self._recording.record(snapshot.get_iteration(), np.concatenate(
+            ((snapshot.get_gbest_fitness(), snapshot.get_gbest_index(), snapshot.get_evaluation_count()), snapshot.get_gbest())))
+
+class SummaryRecording(RecordingPolicy):
+    """
+    Records summary statistics of the swarm in every iteration: the best,
+    mean, standard deviation and worst of the heuristic values of the
+    particles, the gbest's heuristic value and particle, the evaluations so
+    far, the diversity (mean distance of the particles to their centroid)
+    and the mean speed. The statistics of the heuristic values only include
+    the particles that were evaluated in the iteration.
+    """
+
+    COLUMN_NAMES: list[str] = ["best_fitness", "mean_fitness", "std_fitness", "worst_fitness",
+        "gbest_fitness", "gbest_index", "evaluation_count", "diversity", "mean_speed"]
+
+    def _start(self, iterations: int, particle_amount: int, dimensions: int, directory: str = None, parameters: dict = None) -> Trace:
+        self._recording = Trace(self.COLUMN_NAMES, iterations, parameters={**(parameters or {}), "recording": "summary"})
+        return self._recording
+
+    def record(self, snapshot: Snapshot) -> None:
+        # * The positions a SurrogateEvaluator skipped are nan, so they are left out of the statistics
+        fitness: np.ndarray = snapshot.get_fitness()
+        positions: np.ndarray = snapshot.get_positions()
+        diversity: float = np.linalg.norm(positions - positions.mean(axis=0), axis=1).mean()
+        mean_speed: float = np.linalg.norm(snapshot.get_velocities(), axis=1).mean()
+        self._recording.record(snapshot.get_iteration(), (np.nanmin(fitness), np.nanmean(fitness), np.nanstd(fitness), np.nanmax(fitness),
+            snapshot.get_gbest_fitness(), snapshot.get_gbest_index(), snapshot.get_evaluation_count(), diversity, mean_speed))
@@ -0,0 +1,94 @@
+"""
+This module defines the Snapshot class, the lightweight state of an
+optimization after an iteration, which Optimization.iterate yields.
+
+## Classes
+- Snapshot: The gbest and (optionally) the arrays of the swarm after an iteration.
+
+#### Getters
+- get_iteration() -> int
+- get_gbest() -> np.ndarray
+- get_gbest_fitness() -> float
+- get_gbest_index() -> int
+- get_evaluation_count() -> int
+- get_positions() -> np.ndarray | None
+- get_velocities() -> np.ndarray | None
+- get_pbests() -> np.ndarray | None
+- get_fitness() -> np.ndarray | None
+- get_pbest_fitness() -> np.ndarray | None
+"""
+
+import numpy as np
+
+class Snapshot:
+    """
+    The state of an optimization after an iteration (0 being the initial
+    state). The gbest is a copy, so it can be kept, while the arrays of the
+    swarm (only present if they were asked for) are read-only views of the
+    live arrays: they are overwritten by the next iteration, so whoever
+    needs them later must copy them.
+
+    ## Parameters
+    - iteration : int
+        The number of the iteration.
+    - gbest : np.ndarray
+        The coordinates of the global best position.
+    - gbest_fitness : float
+        Its heuristic value.
+    - gbest_index : int
+        The index of the particle whose pbest is the gbest.
+    - evaluation_count : int
+        The number of heuristic evaluations so far.
+    - positions, velocities, pbests, fitness, pbest_fitness : np.ndarray, optional
+        Views of the arrays of the swarm. Default is None.
+    """
+
+    __slots__ = ("__iteration", "__gbest", "__gbest_fitness", "__gbest_index", "__evaluation_count",
+        "__positions", "__velocities", "__pbests", "__fitness", "__pbest_fitness")
+
+    def __init__(self, iteration: int, gbest: np.ndarray, gbest_fitness: float, gbest_index: int, evaluation_count: int, positions: np.ndarray = None, velocities: np.ndarray = None, pbests: np.ndarray = None, fitness: np.ndarray = None, pbest_fitness: np.ndarray = None) -> None:
+        self.__iteration: int = iteration
+        self.__gbest: np.ndarray = gbest
+        self.__gbest_fitness: float = gbest_fitness
+        self.__gbest_index: int = gbest_index
+        self.__evaluation_count: int = evaluation_count
+        self.__positions: np.ndarray = positions
+        self.__velocities: np.ndarray = velocities
+        self.__pbests: np.ndarray = pbests
+        self.__fitness: np.ndarray = fitness
+        self.__pbest_fitness: np.ndarray = pbest_fitness
+
+    def __repr__(self) -> str:
+        return f"Snapshot of iteration {self.__iteration} with global best {self.__gbest} and heuristic value {self.__gbest_fitness}."
+
+    # * Getters
+
+    def get_iteration(self) -> int:
+        return self.__iteration
+
+    def get_gbest(self) -> np.ndarray:
+        return self.__gbest
+
+    def get_gbest_fitness(self) -> float:
+        return self.__gbest_fitness
+
+    def get_gbest_index(self) -> int:
+        return self.__gbest_index
+
+    def get_evaluation_count(self) -> int:
+        return self.__evaluation_count
+
+    def get_positions(self) -> np.ndarray:
+        return self.__positions
+
+    def get_velocities(self) -> np.ndarray:
+        return self.__velocities
+
+    def get_pbests(self) -> np.ndarray:
+        return self.__pbests
+
+    def get_fitness(self) -> np.ndarray:
+        return self.__fitness
+
+    def get_pbest_fitness(self) -> np.ndarray:
+        return self.__pbest_fitness
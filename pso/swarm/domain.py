@@ -0,0 +1,183 @@
+"""
+This module defines the Domain class, the search space of a particle swarm:
+the lower and upper bound of every dimension, the maximum velocity and
+what happens to the particles that leave it.
+
+Every boundary mode is applied to the whole swarm (or to the rows being
+moved) at once with array operations.
+
+## Classes
+- Domain: Per-dimension bounds, velocity limit and boundary handling.
+
+### Methods
+- _build(dimensions: int) -> None
+- apply(positions: np.ndarray, velocities: np.ndarray, rng: np.random.Generator) -> None
+- clamp_velocities(velocities: np.ndarray) -> None
+- sample(rng: np.random.Generator, size: tuple) -> np.ndarray
+- contains(positions: np.ndarray) -> np.ndarray
+
+#### Getters
+- get_lower() -> np.ndarray
+- get_upper() -> np.ndarray
+- get_width() -> np.ndarray
+- get_velocity_limit() -> np.ndarray
+- get_boundary() -> str
+"""
+
+import numpy as np
+
+BOUNDARY_MODES: tuple[str, ...] = ("clip", "reflect", "periodic", "random", "absorb")
+
+class Domain:
+    """
+    The search space of a swarm, a box with its own lower and upper bound
+    in every dimension. The velocity of each dimension is limited to
+    velocity_fraction of its width, so dimensions of very different scales
+    are explored at the same relative speed.
+
+    The boundary modes decide what happens to the coordinates that end
+    outside of the box after a move:
+    - "clip": they are moved to the closest bound.
+    - "reflect": they bounce back from the bound (as many times as needed)
+    and the velocity of the dimension changes sign if they bounced an odd
+    number of times.
+    - "periodic": the box wraps around, leaving through a bound enters
+    through the opposite one.
+    - "random": they are drawn again uniformly inside the bounds.
+    - "absorb": they are moved to the closest bound and the velocity of the
+    dimension is set to zero.
+
+    ## Parameters
+    - lower : float | np.ndarray, optional
+        The lower bound, shared by every dimension or one per dimension.
+        Default is -10.
+    - upper : float | np.ndarray, optional
+        The upper bound, shared by every dimension or one per dimension.
+        Default is 10.
+    - boundary : str, optional
+        The boundary mode (see above). Default is "clip".
+    - velocity_fraction : float, optional
+        The maximum absolute velocity of each dimension, as a fraction of
+        its width. Default is 0.25.
+
+    ## Attributes
+    - __lower : np.ndarray
+        The lower bound of every dimension.
+    - __upper : np.ndarray
+        The upper bound of every dimension.
+    - __boundary : str
+        The boundary mode.
+    - __velocity_fraction : float
+        The velocity limit as a fraction of the width.
+    - __velocity_limit : np.ndarray
+        The maximum absolute velocity of every dimension.
+
+    ## Methods
+    - _build(dimensions)
+        Broadcasts the bounds to the dimensions of a swarm.
+    - apply(positions, velocities, rng)
+        Brings the positions back into the domain, in place.
+    - clamp_velocities(velocities)
+        Limits the velocities to the velocity limit, in place.
+    - sample(rng, size) -> np.ndarray
+        Returns positions drawn uniformly inside the domain.
+    - contains(positions) -> np.ndarray
+        Returns which positions are inside the domain.
+    """
+
+    def __init__(self, lower: float | np.ndarray = -10, upper: float | np.ndarray = 10, boundary: str = "clip", velocity_fraction: float = 0.25) -> None:
+        if boundary not in BOUNDARY_MODES:
+            raise ValueError(f"Unknown boundary mode: {boundary}. Available modes: {BOUNDARY_MODES}.")
+        if velocity_fraction <= 0:
+            raise ValueError("The velocity fraction must be greater than zero.")
+        self.__lower: np.ndarray = np.atleast_1d(np.asarray(lower, dtype=float))
+        self.__upper: np.ndarray = np.atleast_1d(np.asarray(upper, dtype=float))
+        self.__boundary: str = boundary
+        self.__velocity_fraction: float = velocity_fraction
+        self.__velocity_limit: np.ndarray = None
+        if self.__lower.shape[0] > 1 and self.__upper.shape[0] > 1 and self.__lower.shape != self.__upper.shape:
+            raise ValueError("The lower and upper bounds must have the same number of dimensions.")
+        if np.any(self.__lower >= self.__upper):
+            raise ValueError("Every lower bound must be lower than its upper bound.")
+
+    def __repr__(self) -> str:
+        return f"Domain from {self.__lower} to {self.__upper} with {self.__boundary} boundaries."
+
+    def _build(self, dimensions: int) -> None:
+        """Broadcasts the bounds to the given number of dimensions (the
+        ones of the positions, without the heuristic value)."""
+        for bound in (self.__lower, self.__upper):
+            if bound.shape[0] not in (1, dimensions):
+                raise ValueError(f"The domain has {bound.shape[0]} dimensions, but the positions have {dimensions}.")
+        self.__lower = np.broadcast_to(self.__lower, (dimensions,)).copy()
+        self.__upper = np.broadcast_to(self.__upper, (dimensions,)).copy()
+        self.__velocity_limit = self.__velocity_fraction * self.get_width()
+
+    def apply(self, positions: np.ndarray, velocities: np.ndarray, rng: np.random.Generator) -> None:
+        """Brings every coordinate of positions that is outside of the
+        domain back into it according to the boundary mode. Both arrays
+        are modified in place.
+
+        ## Parameters
+        positions : np.ndarray
+            An (N, D) array (or view) with one position per row.
+        velocities : np.ndarray
+            The (N, D) array (or view) of their velocities.
+        rng : np.random.Generator
+            The generator of the "random" mode (the swarm's).
+        """
+        lower: np.ndarray = self.__lower
+        upper: np.ndarray = self.__upper
+        if self.__boundary == "clip":
+            np.clip(positions, lower, upper, out=positions)
+        elif self.__boundary == "absorb":
+            outside: np.ndarray = (positions < lower) | (positions > upper)
+            np.clip(positions, lower, upper, out=positions)
+            velocities[outside] = 0
+        elif self.__boundary == "periodic":
+            positions[...] = lower + np.mod(positions - lower, self.get_width())
+        elif self.__boundary == "reflect":
+            width: np.ndarray = self.get_width()
+            # * A triangle wave of period 2 * width folds any distance back into the box
+            folded: np.ndarray = np.mod(positions - lower, 2 * width)
+            # * On the descending half of the wave the coordinate bounced an odd number of times
+            odd_folds: np.ndarray = folded > width
+            positions[...] = lower + np.where(odd_folds, 2 * width - folded, folded)
+            np.negative(velocities, out=velocities, where=odd_folds)
+        else:
+            outside = (positions < lower) | (positions > upper)
+            if np.any(outside):
+                # * Drawn for the whole array so the stream does not depend on which ones left
+                positions[...] = np.where(outside, self.sample(rng, positions.shape), positions)
+
+    def clamp_velocities(self, velocities: np.ndarray) -> None:
+        """Limits every component of velocities to the velocity limit of
+        its dimension, in place."""
+        np.clip(velocities, -self.__velocity_limit, self.__velocity_limit, out=velocities)
+
+    def sample(self, rng: np.random.Generator, size: tuple) -> np.ndarray:
+        """Returns an array of the given (N, D) size drawn uniformly inside
+        the domain."""
+        return rng.uniform(self.__lower, self.__upper, size=size)
+
+    def contains(self, positions: np.ndarray) -> np.ndarray:
+        """Returns the (N,) boolean array of the rows of positions that are
+        inside the domain."""
+        return np.all((positions >= self.__lower) & (positions <= self.__upper), axis=1)
+
+    # * Getters
+
+    def get_lower(self) -> np.ndarray:
+        return self.__lower
+
+    def get_upper(self) -> np.ndarray:
+        return self.__upper
+
+    def get_width(self) -> np.ndarray:
+        return self.__upper - self.__lower
+
+    def get_velocity_limit(self) -> np.ndarray:
+        return self.__velocity_limit
+
+    def get_boundary(self) -> str:
+        return self.__boundary
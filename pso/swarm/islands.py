@@ -0,0 +1,264 @@
+"""
+This module defines the IslandModel class, which runs several particle
+swarms (islands) in separate processes. Every few iterations each island
+sends its best positions to its neighbors in the migration topology, which
+replace their worst particles with them if they are better.
+
+## Classes
+- IslandModel: Runs an optimization as several islands with migration.
+
+### Methods
+- run() -> Optimization: Runs the islands and returns the combined optimization.
+
+#### Getters
+- get_island_amount() -> int
+- get_migration_interval() -> int
+- get_migration_size() -> int
+- get_migration_targets() -> list[list[int]]
+"""
+
+import multiprocessing
+import traceback
+
+import numpy as np
+
+from pso.database.data import Data
+from pso.history import History
+from pso.optimization import MAX_ITERATIONS_REASON, Optimization
+
+# * Parameters of Optimization the islands can not honor: they run in lockstep through the migrations, synchronously, and are recorded whole
+UNSUPPORTED_PARAMETERS: tuple[str, ...] = ("stopping_criteria", "asynchronous", "recording", "checkpoint_path",
+    "checkpoint_interval", "checkpoint_seconds", "memory_mapped_history")
+
+def _migration_targets(topology, island_amount: int) -> list[list[int]]:
+    """Returns the islands each island sends its migrants to.
+
+    ## Parameters
+    topology : str | dict
+        "ring" (each island sends to the next one), "fully_connected" (to
+        every other island) or a dictionary that maps each island to the
+        list of islands it sends to.
+    island_amount : int
+        The number of islands.
+    """
+    if topology == "ring":
+        return [[(island + 1) % island_amount] if island_amount > 1 else [] for island in range(island_amount)]
+    if topology == "fully_connected":
+        return [[target for target in range(island_amount) if target != island] for island in range(island_amount)]
+    if isinstance(topology, dict):
+        targets: list[list[int]] = [sorted(set(topology.get(island, []))) for island in range(island_amount)]
+        for island, island_targets in enumerate(targets):
+            if any(target == island or not 0 <= target < island_amount for target in island_targets):
+                raise ValueError(f"Island {island} has invalid migration targets: {island_targets}.")
+        return targets
+    raise ValueError(f"Unknown migration topology: {topology}.")
+
+def _run_island(island: int, optimization_parameters: dict, iterations: int, migration_interval: int, migration_size: int, targets: list[int], source_amount: int, inboxes: list, results, seed: np.random.SeedSequence) -> None:
+    """Runs a single island in a worker process and puts its recorded
+    history in the results queue (or the traceback if it fails)."""
+    optimization: Optimization = None
+    try:
+        optimization = Optimization(island, None, iterations=iterations, **{"seed": seed, **optimization_parameters})
+        swarm = optimization.get_swarm()
+        swarm._initialize_particles_randomly()
+        # * Migrants of later epochs may arrive before the ones being waited for
+        received: dict[int, list[tuple]] = {}
+
+        def migrate(epoch: int) -> None:
+            best: np.ndarray = np.argsort(swarm.get_pbest_fitness(), kind="stable")[:migration_size]
+            message: tuple = (epoch, swarm.get_pbests()[best].copy(), swarm.get_pbest_fitness()[best].copy())
+            for target in targets:
+                inboxes[target].put(message)
+            while len(received.get(epoch, [])) < source_amount:
+                message_epoch, positions, fitness = inboxes[island].get()
+                received.setdefault(message_epoch, []).append((positions, fitness))
+            migrants: list[tuple] = received.pop(epoch, [])
+            if migrants:
+                swarm._receive_migrants(np.concatenate([positions for positions, _ in migrants]),
+                    np.concatenate([fitness for _, fitness in migrants]))
+
+        history: dict[str, list[np.ndarray]] = {"positions": [], "velocities": [], "pbests": [], "fitness": [], "pbest_fitness": []}
+
+        def record() -> None:
+            history["positions"].append(swarm.get_positions().copy())
+            history["velocities"].append(swarm.get_velocities().copy())
+            history["pbests"].append(swarm.get_pbests().copy())
+            history["fitness"].append(swarm.get_fitness().copy())
+            history["pbest_fitness"].append(swarm.get_pbest_fitness().copy())
+
+        record()
+        iteration_steps = optimization._synchronous_iterations()
+        for iteration_num in range(1, iterations + 1):
+            next(iteration_steps)
+            # * No migration after the last iteration, nobody would use it
+            if iteration_num % migration_interval == 0 and iteration_num < iterations:
+                migrate(iteration_num // migration_interval)
+            record()
+        payload: dict = {key: np.stack(values) for key, values in history.items()}
+        payload["evaluation_count"] = swarm.get_evaluation_count()
+        payload["iterations_run"] = iterations
+        payload["stopping_reason"] = MAX_ITERATIONS_REASON
+        results.put((island, payload, None))
+    except Exception:
+        results.put((island, None, traceback.format_exc()))
+    finally:
+        # * A pool evaluator of the island has its own workers (the island processes are not daemons, so they can)
+        if optimization is not None:
+            optimization.get_swarm().get_evaluator().close()
+
+class IslandModel:
+    """
+    Runs an optimization as several islands, each one an Optimization with
+    its own swarm and coefficients running in its own process. Every
+    migration_interval iterations each island sends copies of its
+    migration_size best pbests to the islands it points to in the
+    topology, and waits for the migrants of the islands that point to it.
+
+    The histories of the islands are put together as the history of a
+    single optimization whose particles are the ones of every island (in
+    island order), which is stored in the Data object like the one of any
+    other optimization.
+
+    The islands are not daemon processes, so their parameters may include
+    a pool evaluator (e.g. a ProcessPoolEvaluator), which is closed when
+    the island ends. They are joined (or terminated, if another island
+    failed) before run returns.
+
+    ## Parameters
+    - index : int
+        The index of the resulting optimization.
+    - data : Data, optional
+        Where the resulting optimization is stored. Default is None (not stored).
+    - islands : list[dict], optional
+        The parameters of the Optimization of each island (e.g.
+        inertia_coefficient, cognitive_coefficient, social_coefficient or
+        particle_amount). Default is None, which creates island_amount
+        islands with the default coefficients. The parameters in
+        UNSUPPORTED_PARAMETERS (stopping criteria, the asynchronous mode,
+        recording policies and checkpoints) raise a ValueError, since every
+        island runs all the iterations in lockstep with the others.
+    - island_amount : int, optional
+        The number of islands if islands is not given. Default is 4.
+    - particle_amount : int, optional
+        The number of particles of the islands that do not set it. Default is 10.
+    - dimensions : int, optional
+        The dimensions of the search space (including the heuristic value,
+        as in Optimization). Default is 3.
+    - iterations : int, optional
+        The number of iterations of every island. Default is 20.
+    - migration_interval : int, optional
+        The number of iterations between migrations. Default is 5.
+    - migration_size : int, optional
+        The number of positions each island sends to each neighbor. Default is 1.
+    - topology : str | dict, optional
+        "ring", "fully_connected" or a dictionary mapping each island to the
+        islands it sends migrants to. Default is "ring".
+    - seed : int, optional
+        Seed of the random numbers of the islands. Each island gets an
+        independent child stream of it (unless its parameters set a seed),
+        so the run is reproducible. Default is None.
+
+    ## Methods
+    - run() -> Optimization
+        Runs the islands and returns the combined optimization, whose swarm
+        holds the final state of every island, whose history (get_history)
+        is the combined one and whose coefficients are the ones of the
+        first island.
+    """
+
+    def __init__(self, index: int, data: Data = None, islands: list[dict] = None, island_amount: int = 4, particle_amount: int = 10, dimensions: int = 3, iterations: int = 20, migration_interval: int = 5, migration_size: int = 1, topology = "ring", seed: int = None) -> None:
+        if islands is None:
+            islands = [{} for _ in range(island_amount)]
+        if len(islands) < 1:
+            raise ValueError("There must be at least one island.")
+        for island, parameters in enumerate(islands):
+            unsupported: list[str] = [name for name in UNSUPPORTED_PARAMETERS if name in parameters]
+            if unsupported:
+                raise ValueError(f"Island {island} sets {', '.join(unsupported)}, which the islands do not support.")
+        if migration_interval < 1 or migration_size < 1:
+            raise ValueError("The migration interval and size must be greater than zero.")
+        self.__index: int = index
+        self.__data: Data = data
+        self.__islands: list[dict] = [{"particle_amount": particle_amount, **island} for island in islands]
+        self.__dimensions: int = dimensions
+        self.__iterations: int = iterations
+        self.__migration_interval: int = migration_interval
+        self.__migration_size: int = migration_size
+        self.__migration_targets: list[list[int]] = _migration_targets(topology, len(islands))
+        self.__seed: int = seed
+
+    def run(self) -> Optimization:
+        """Runs every island in its own process, waits for all of them and
+        returns the combined optimization (also stored in the Data object,
+        if any)."""
+        island_amount: int = len(self.__islands)
+        source_amounts: list[int] = [sum(island in targets for targets in self.__migration_targets) for island in range(island_amount)]
+        seeds: list[np.random.SeedSequence] = np.random.SeedSequence(self.__seed).spawn(island_amount)
+        context = multiprocessing.get_context()
+        inboxes: list = [context.Queue() for _ in range(island_amount)]
+        results = context.Queue()
+        processes: list = [context.Process(target=_run_island, args=(
+            island, {"dimensions": self.__dimensions, **self.__islands[island]}, self.__iterations,
+            self.__migration_interval, self.__migration_size, self.__migration_targets[island],
+            source_amounts[island], inboxes, results, seeds[island]))
+            for island in range(island_amount)]
+        for process in processes:
+            process.start()
+        payloads: dict[int, dict] = {}
+        try:
+            while len(payloads) < island_amount:
+                island, payload, error = results.get()
+                if error is not None:
+                    raise RuntimeError(f"Island {island} failed:\n{error}")
+                payloads[island] = payload
+        finally:
+            for process in processes:
+                if len(payloads) < island_amount:
+                    # * The other islands may be waiting for the failed one's migrants
+                    process.terminate()
+                process.join()
+        return self._combine([payloads[island] for island in range(island_amount)])
+
+    def _combine(self, payloads: list[dict]) -> Optimization:
+        """Puts the histories of the islands together as a single optimization."""
+        history: dict[str, np.ndarray] = {key: np.concatenate([payload[key] for payload in payloads], axis=1)
+            for key in ("positions", "velocities", "pbests", "fitness", "pbest_fitness")}
+        gbest_indexes: np.ndarray = np.argmin(history["pbest_fitness"], axis=1)
+        parameters: dict = {**self.__islands[0], "particle_amount": history["fitness"].shape[1]}
+        optimization: Optimization = Optimization(self.__index, self.__data, dimensions=self.__dimensions,
+            iterations=self.__iterations, **parameters)
+        optimization.get_swarm()._set_state(history["positions"][-1], history["velocities"][-1],
+            history["pbests"][-1], history["fitness"][-1], history["pbest_fitness"][-1],
+            sum(payload["evaluation_count"] for payload in payloads))
+
+        combined: History = History(self.__iterations, history["fitness"].shape[1], history["positions"].shape[2],
+            parameters={**optimization.get_parameters(), "islands": len(payloads)})
+        for iteration_num in range(self.__iterations + 1):
+            combined.record(iteration_num, history["positions"][iteration_num], history["velocities"][iteration_num],
+                history["pbests"][iteration_num], history["fitness"][iteration_num], gbest_indexes[iteration_num])
+        # * Every island runs all the iterations, so they all end for the same reason
+        optimization._set_history(combined, payloads[0]["stopping_reason"], min(payload["iterations_run"] for payload in payloads))
+        if self.__data is not None:
+            self.__data.append_gbest_indexes(combined.get_gbest_indexes().tolist())
+            self.__data.append_stopping_reason(optimization.get_stopping_reason())
+            self.__data.append_optimization(combined)
+        return optimization
+
+    # * Getters
+
+    def get_island_amount(self) -> int:
+        return len(self.__islands)
+
+    def get_migration_interval(self) -> int:
+        return self.__migration_interval
+
+    def get_migration_size(self) -> int:
+        return self.__migration_size
+
+    def get_migration_targets(self) -> list[list[int]]:
+        return self.__migration_targets
+
+if __name__ == "__main__":
+    model: IslandModel = IslandModel(0, islands=[{"inertia_coefficient": 0.4}, {"inertia_coefficient": 0.7},
+        {"inertia_coefficient": 0.9}], particle_amount=20, iterations=50, seed=0)
+    print(model.run().get_swarm().get_gbest())
@@ -1,20 +1,25 @@
 """
 This module defines the Particle class, which represents a particle in a swarm in the context of the Particle Swarm Optimization (PSO) algorithm.
 
+The state of every particle lives in the arrays of its ParticleSwarm, so a
+Particle is only a thin view into the row of those arrays given by its index.
+
 ## Classes
 - Particle: Represents a particle in a swarm in the context of the PSO algorithm.
 
 ### Methods
-- initialize_randomly(bound=10): Initializes the position, velocity, heuristic, and pbest of the particle randomly.
-- _update_pbest(): Updates the best position of the particle (__pbest) comparing the heuristic value.
+- initialize_randomly(bound: float = None) -> None
+- _update_velocity(gbest: Position = None) -> None
+- _update_pbest() -> None
 
 #### Getters and setters
 - get_heuristic() -> Heuristic
+- get_index() -> int
 - get_pbest() -> Position
 - get_position() -> Position
 - get_velocity() -> Velocity
 - set_heuristic(heuristic: Vector) -> None
-- set_pbest(pbest: Position) -> None
+- set_pbest(pbest: Position, fitness: float = None) -> None
 - set_position(position: Position) -> None
 - set_velocity(velocity: Velocity) -> None
 """
@@ -22,41 +27,59 @@ This module defines the Particle class, which represents a particle in a swarm i
 import numpy as np
 
 from pso.vector.base_vector import Vector
-from pso.vector.heuristic import Heuristic, default_heuristic
+from pso.vector.heuristic import Heuristic
 from pso.vector.position import Position
 from pso.vector.velocity import Velocity
 
 class Particle:
     """
-    Particle class represents a particle in a swarm in the context of 
+    Particle class represents a particle in a swarm in the context of
     the Particle Swarm Optimization (PSO) algorithm.
 
+    ## Parameters
+    - swarm : ParticleSwarm
+        The swarm whose arrays hold the state of the particle.
+    - index : int
+        The row of the swarm's arrays that belongs to the particle.
+
     ## Attributes
-    
+
     ### Private
-    - heuristic : Heuristic
-        Fitness or heuristic value of the particle.
-    - pbest : Position
-        Position where the best heuristic value was found.
-    - position : Position
-        Current position of the particle.
-    - velocity : Velocity
-        Current velocity of the particle.
-    
+    - swarm : ParticleSwarm
+        The swarm that owns the particle's state.
+    - index : int
+        The row of the swarm's arrays that belongs to the particle.
+
     ### Public
     - color : dict
         Color of the particle's heuristic.
-    - has_gbest : bool
+    - has_gbest : bool (read-only)
         If the particle has a global best position.
 
     ## Methods
-    - initialize_randomly(bound=10)
-        Initializes the position, velocity, heuristic and pbest of the particle randomly.
+    The swarm updates all of its particles at once, these methods do it for
+    the row of the particle only.
+
+    - initialize_randomly(bound=None)
+        Initializes the position, velocity, heuristic and pbest of the
+        particle randomly inside the domain of the swarm.
+    - _update_velocity(gbest=None)
+        Updates the velocity of the particle (see
+        ParticleSwarm._update_velocities).
+    - _update_pbest()
+        Updates the pbest of the particle (and the gbest) if its current
+        heuristic value is better.
 
     ### Getters and setters
-
-    - get_heuristic() -> Vector
-        Returns the fitness or heuristic value of the particle.
+    The Position and Velocity objects returned by the getters wrap the
+    particle's row of the swarm's arrays, so updating them updates the
+    swarm. The setters copy the given coordinates into that row.
+
+    - get_heuristic() -> Heuristic
+        Returns the position of the particle with its fitness or heuristic
+        value appended (a copy).
+    - get_index() -> int
+        Returns the row of the particle in the swarm's arrays.
     - get_pbest() -> Position
         Returns the position where the best heuristic value was found.
     - get_position() -> Position
@@ -64,114 +87,111 @@ class Particle:
     - get_velocity() -> Velocity
         Returns the current velocity of the particle.
     - set_heuristic(heuristic: Vector) -> None
-        Sets the fitness or heuristic value of the particle.
-    - set_pbest(pbest: Position) -> None
-        Sets the position where the best heuristic value was found.
+        Sets the fitness or heuristic value of the particle (last coordinate)
+        and, as an evaluation would, its pbest and the gbest if it improved
+        on them. It is not counted as an evaluation.
+    - set_pbest(pbest: Position, fitness: float = None) -> None
+        Sets the position where the best heuristic value was found and that
+        value (evaluated, and counted as an evaluation, if not given), and
+        updates the gbest.
     - set_position(position: Position) -> None
         Sets the current position of the particle.
     - set_velocity(velocity: Velocity) -> None
         Sets the current velocity of the particle.
     """
-    # ! Update documentation
 
-    def __init__(self, index: int, has_gbest: bool, cognitive_coefficient: float = 2.0, dimensions: int = 3, heuristic: callable = default_heuristic, inertia_coefficient: float = 1.0, social_coefficient: float = 2.0) -> None:
-        self.__cognitive_coefficient: float = cognitive_coefficient
+    def __init__(self, swarm, index: int) -> None:
+        # * The swarm is not type hinted to avoid a circular import
+        self.__swarm = swarm
         self.__index: int = index
-        self.__inertia_coefficient: float = inertia_coefficient
-        self.__social_coefficient: float = social_coefficient
-        self.__position: Position = Position(dimensions-1)
-        self.__pbest: Position = Position(dimensions-1)
-        self.__heuristic: Heuristic = Heuristic(dimensions, heuristic)
-        self.__heuristic._update(self.get_pbest())
-        self.__velocity: Velocity = Velocity(dimensions-1)
         self.color : dict = {"r": 0, "g": 0, "b": 0}
-        self.has_gbest = has_gbest
 
     def __repr__(self) -> str:
-        return f"Particle at {self.__position.get_coordinates()} with pbest at {self.__pbest.get_coordinates()}, velocity {self.__velocity.get_coordinates()} and a heuristic value of {self.__heuristic.get_coordinates()}.\n"
-    
-    def initialize_randomly(self, bound: int = 10) -> None:
-        """Initializes the (__)position, (__)velocity, (__)heuristic and (__)pbest of the particle randomly.
-        
+        return f"Particle at {self.get_position().get_coordinates()} with pbest at {self.get_pbest().get_coordinates()}, velocity {self.get_velocity().get_coordinates()} and a heuristic value of {self.__swarm.get_fitness()[self.__index]}.\n"
+
+    @property
+    def has_gbest(self) -> bool:
+        return self.__swarm.get_gbest_index() == self.__index
+
+    def initialize_randomly(self, bound: float = None) -> None:
+        """Initializes the position, velocity, heuristic and pbest of the
+        particle randomly, like ParticleSwarm._initialize_particles_randomly
+        does for the whole swarm.
+
         ## Parameters
-        bound : int
-            The upper bound for the random initialization. Default is 10.
-        """
-        self.__position.initialize_randomly(bound, self.__position.get_dimensions())
-        self.__velocity.initialize_randomly(bound / 5, self.__position.get_dimensions())
-        self.__position._update(self.__velocity)
-        self.__heuristic._update(self.__position)
-        self.__pbest.set_coordinates(self.__position.get_coordinates().copy())
-
-    def _update_velocity(self, gbest: Position) -> None:
-        # ! There must be something wrong with this method: the operation is not being performed correctly.
-        # * It may be correct, just the parameters not the ideal ones.
-        """
-        Updates the velocity vector based on the particle swarm optimization
-        formula:
-        v(i + 1) = w * v(i) + c1 * r1 * (pbest - x(i)) + c2 * r2 * (gbest - x(i))
-
-        ### Notes
-        - The `position`, `pbest`, and `gbest` constants should have the same shape as the velocity vector.
-        - The `w` constant (inertia coefficient) ranges between 0 and 1.
-        - The `c1` (cognitive coefficient) and `c2` (social coefficient) constants range between 1 and 3.
-        - The `r1` and `r2` values are random numbers between 0 and 1.
+        bound : float
+            Ignored, the particle is initialized inside the domain of its
+            swarm. Kept so older callers still work.
         """
+        self.__swarm._initialize_particles_randomly(self.__rows())
 
-        x_i: np.ndarray = self.__position.get_coordinates()
-        pbest: np.ndarray = self.__pbest.get_coordinates()
-        initial_velocity: np.ndarray = self.__velocity.get_coordinates()
-        r1: float = np.random.uniform(0, 1)
-        r2: float = np.random.uniform(0, 1)
-        w: float = self.__inertia_coefficient
-        c1: float = self.__cognitive_coefficient
-        c2: float = self.__social_coefficient
-        final_velocity: np.ndarray = (w * initial_velocity) + (c1 * r1 * (pbest - x_i)) + (c2 * r2 * (gbest.get_coordinates() - x_i))
-        final = np.clip(final_velocity, -5, 5)
-        self.__velocity.set_coordinates(final)
+    def _update_velocity(self, gbest: Position = None) -> None:
+        """Updates the velocity of the particle with the formula of
+        ParticleSwarm._update_velocities.
+
+        ## Parameters
+        gbest : Position
+            Ignored, the social term uses the gbest (or lbest) of the swarm,
+            which is kept up to date. Kept so older callers still work.
+        """
+        self.__swarm._update_velocities(rows=self.__rows())
 
     def _update_pbest(self) -> None:
-        """Updates the best position of the particle (__pbest) comparing the heuristic
-        value (last coordinate of the heuristic vector) of the current position 
-        (__position) with the heuristic value of the best position found up to
-        the i-th iteration (__pbest)."""
-        heuristic_f = self.__heuristic.get_heuristic_f()
-        if heuristic_f(self.__position) < heuristic_f(self.__pbest):
-            self.__pbest.set_coordinates(self.__position.get_coordinates().copy())
-    
+        """Updates the pbest of the particle if the stored heuristic value of
+        its current position is lower than the one of its pbest, and the
+        gbest if it improved on it."""
+        self.__swarm._update_pbests(self.__rows())
+        self.__swarm.update_gbest(self.__index)
+
+    def __rows(self) -> slice:
+        """Returns the slice of the particle's row in the swarm's arrays."""
+        return slice(self.__index, self.__index + 1)
+
     # * Getters and setters
 
     def get_heuristic(self) -> Heuristic:
-        return self.__heuristic
-    
+        position: np.ndarray = self.__swarm.get_positions()[self.__index]
+        heuristic: Heuristic = Heuristic(position.shape[0] + 1, self.__swarm.get_heuristic())
+        heuristic.set_coordinates(np.append(position, self.__swarm.get_fitness()[self.__index]))
+        return heuristic
+
     def get_index(self) -> int:
         return self.__index
-    
+
     def get_pbest(self) -> Position:
-        return self.__pbest
-    
+        return Position(coordinates=self.__swarm.get_pbests()[self.__index])
+
     def get_position(self) -> Position:
-        return self.__position
-    
+        return Position(coordinates=self.__swarm.get_positions()[self.__index])
+
     def get_velocity(self) -> Velocity:
-        return self.__velocity
-    
+        return Velocity(coordinates=self.__swarm.get_velocities()[self.__index])
+
     def set_heuristic(self, heuristic: Vector) -> None:
-        self.__heuristic = heuristic
-    
-    def set_pbest(self, pbest: Position) -> None:
-        self.__pbest = pbest
-    
+        # * Like an evaluation, so the pbest and the gbest are updated if it improved on them
+        self.__swarm._store_fitness(self.__index, float(heuristic.get_coordinates()[-1]), evaluated=False)
+
+    def set_pbest(self, pbest: Position, fitness: float = None) -> None:
+        if fitness is None:
+            fitness = float(self.__swarm._evaluate_positions(pbest.get_coordinates()[np.newaxis])[0])
+        self.__swarm.get_pbests()[self.__index] = pbest.get_coordinates()
+        self.__swarm.get_pbest_fitness()[self.__index] = fitness
+        # * Recomputed over every particle, the new pbest may be worse than the gbest it replaces
+        self.__swarm.update_gbest()
+
     def set_position(self, position: Position) -> None:
-        self.__position = position
-    
+        self.__swarm.get_positions()[self.__index] = position.get_coordinates()
+
     def set_velocity(self, velocity: Velocity) -> None:
-        self.__velocity = velocity
-        
+        self.__swarm.get_velocities()[self.__index] = velocity.get_coordinates()
+
 
 if __name__ ==  "__main__":
-    dimensions: int = 4
-    p = Particle(0)
+    from pso.swarm.particle_swarm import ParticleSwarm
+
+    swarm: ParticleSwarm = ParticleSwarm(dimensions=4, particle_amount=1)
+    swarm._initialize_particles_randomly()
+    p: Particle = swarm.get_particles()[0]
     print(p.get_heuristic().get_coordinates())
     print(p.get_pbest().get_coordinates())
     print(p.get_position().get_coordinates())
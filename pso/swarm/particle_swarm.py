@@ -9,15 +9,40 @@ This module defines the ParticleSwarm class, which represents multiple Particle
 - __cognitive_coefficient: float - The cognitive coefficient used in the particle update equation.
 - __social_coefficient: float - The social coefficient used in the particle update equation.
 - __particle_amount: int - The number of particles in the swarm.
-- __particles: list[Particle] - The list of particles in the swarm.
+- __positions: np.ndarray - The (particles, dimensions) array of current positions.
+- __velocities: np.ndarray - The (particles, dimensions) array of current velocities.
+- __pbests: np.ndarray - The (particles, dimensions) array of personal best positions.
+- __fitness: np.ndarray - The (particles,) array of heuristic values of the current positions.
+- __pbest_fitness: np.ndarray - The (particles,) array of heuristic values of the personal bests.
+- __particles: list[Particle] - The list of particles in the swarm (views into the arrays).
 - __gbest: Position - The global best position found by the swarm.
-- _heuristic_f: callable - The heuristic function to be optimized.
+- __gbest_index: int - The index of the particle whose pbest is the global best.
+- __gbest_fitness: float - The heuristic value of the global best position.
+- __evaluation_count: int - The number of heuristic evaluations since the swarm was initialized.
+- _heuristic_f: callable - The heuristic function to be optimized (batch or legacy, see the heuristic module).
+- __evaluator: Evaluator - The backend used to evaluate the heuristic function on the swarm.
+- __topology: Topology - Which pbests attract each particle (the gbest by default).
+- __seed_sequence: np.random.SeedSequence - The root of every random stream of the swarm.
+- __rng: np.random.Generator - The generator of the random numbers of the swarm.
+- __random_coefficients: str - If r1 and r2 are drawn per particle or per dimension.
+- __domain: Domain - The bounds, velocity limit and boundary mode of the search space.
 
 ### Methods
-- __init__(inertia_coefficient: float = 1, cognitive_coefficient: float = 2, social_coefficient: float = 2, dimensions: int = 3, particle_amount: int = 10, heuristic: callable = default_heuristic) -> None: Initializes the particle swarm with the given parameters.
+- __init__(inertia_coefficient: float = 1, cognitive_coefficient: float = 2, social_coefficient: float = 2, dimensions: int = 3, particle_amount: int = 10, heuristic: callable = default_heuristic, evaluator: Evaluator = None, topology: Topology = None, seed: int | np.random.SeedSequence = None, random_coefficients: str = "particle", domain: Domain = None) -> None: Initializes the particle swarm with the given parameters.
 - __repr__() -> str: Returns a string representation of the particle swarm.
-- _initialize_particles_randomly(bound: float = 10) -> None: Initializes the positions and velocities of particles randomly.
-- update_gbest() -> None: Updates the global best position found by the swarm.
+- _initialize_particles_randomly(rows: slice = slice(None)) -> None: Initializes the positions and velocities of particles (or some rows) randomly inside the domain.
+- _evaluate(rows: slice = slice(None)) -> None: Evaluates the heuristic function on every particle's position (or some rows).
+- _evaluate_positions(positions: np.ndarray) -> np.ndarray: Evaluates the heuristic function on any positions, counting the evaluations.
+- _store_fitness(index: int, value: float, evaluated: bool = True) -> None: Stores the heuristic value of a single particle.
+- _set_state(positions, velocities, pbests, fitness, pbest_fitness, evaluation_count) -> None: Loads a previously computed state.
+- _receive_migrants(positions: np.ndarray, fitness: np.ndarray) -> None: Replaces the worst particles with better migrants.
+- _get_state() -> dict: Returns everything that changes during a run, for checkpoints.
+- _restore_state(state: dict) -> None: Restores a state returned by _get_state, random streams included.
+- _update_velocities(rows: slice = slice(None)) -> None: Updates the velocities of the whole swarm (or some rows).
+- _enforce_domain(rows: slice = slice(None)) -> None: Brings the particles (or some rows) that left the domain back into it.
+- _update_positions(rows: slice = slice(None)) -> None: Moves every particle (or some rows) according to its velocity.
+- _update_pbests(rows: slice = slice(None)) -> None: Updates the personal best positions of the whole swarm (or some rows).
+- update_gbest(index: int = None) -> None: Updates the global best position found by the swarm.
 
 ### Getters
 - get_inertia_coefficient() -> float: Returns the inertia coefficient.
@@ -25,14 +50,36 @@ This module defines the ParticleSwarm class, which represents multiple Particle
 - get_social_coefficient() -> float: Returns the social coefficient.
 - get_particle_amount() -> int: Returns the number of particles in the swarm.
 - get_particles() -> list[Particle]: Returns the list of particles in the swarm.
+- get_positions() -> np.ndarray: Returns the array of current positions.
+- get_velocities() -> np.ndarray: Returns the array of current velocities.
+- get_pbests() -> np.ndarray: Returns the array of personal best positions.
+- get_fitness() -> np.ndarray: Returns the heuristic values of the current positions.
+- get_pbest_fitness() -> np.ndarray: Returns the heuristic values of the personal bests.
 - get_gbest() -> Position: Returns the global best position found by the swarm.
+- get_gbest_index() -> int: Returns the index of the particle that found the global best.
+- get_gbest_fitness() -> float: Returns the heuristic value of the global best position.
+- get_evaluation_count() -> int: Returns the number of heuristic evaluations performed.
 - get_heuristic() -> callable: Returns the heuristic function to be optimized.
+- get_evaluator() -> Evaluator: Returns the evaluation backend.
+- get_topology() -> Topology: Returns the neighborhood topology.
+- get_rng() -> np.random.Generator: Returns the random number generator.
+- get_seed_sequence() -> np.random.SeedSequence: Returns the root seed sequence.
+- get_random_coefficients() -> str: Returns the mode of the r1 and r2 coefficients.
+- get_domain() -> Domain: Returns the search space.
 """
 
+import numpy as np
+
+from pso.evaluation.cache import FitnessCache
+from pso.evaluation.evaluator import Evaluator
 from pso.vector.heuristic import default_heuristic
+from pso.swarm.domain import Domain
 from pso.swarm.particle import Particle
+from pso.swarm.topology import Topology
 from pso.vector.position import Position
 
+RANDOM_COEFFICIENT_MODES: tuple[str, ...] = ("particle", "dimension")
+
 class ParticleSwarm:
     """
     Represents a particle swarm optimization algorithm.
@@ -50,7 +97,28 @@ class ParticleSwarm:
         The number of particles in the swarm. Default is 10.
     - heuristic : callable, optional
         The heuristic function to be optimized. Default is the default_heuristic function
-        imported from the heuristic module.
+        imported from the heuristic module. It can be a batch function
+        (declared with batch_heuristic) or a legacy one that receives a
+        single Position.
+    - evaluator : Evaluator, optional
+        The backend used to evaluate the heuristic function on the whole
+        swarm (e.g. a ProcessPoolEvaluator). Default is None, which
+        evaluates it in the calling process.
+    - topology : Topology, optional
+        The neighborhood topology that decides which pbest attracts each
+        particle (see the topology module). Default is None, the gbest.
+    - seed : int | np.random.SeedSequence, optional
+        The seed of the random numbers of the swarm. Two swarms with the
+        same seed and parameters produce the same run, bit by bit. Default
+        is None, fresh entropy from the operating system.
+    - random_coefficients : str, optional
+        "particle" draws one r1 and one r2 per particle and iteration,
+        "dimension" one per particle, dimension and iteration. Default is
+        "particle".
+    - domain : Domain, optional
+        The bounds of every dimension, the velocity limit and what happens
+        to the particles that leave them (see the domain module). Default
+        is None, the box [-10, 10] in every dimension with clipping.
 
     ## Attributes
     - __inertia_coefficient : float
@@ -61,19 +129,74 @@ class ParticleSwarm:
         The social coefficient used in the particle update equation.
     - __particle_amount : int
         The number of particles in the swarm.
+    - __positions : np.ndarray
+        The (particles, dimensions) array of current positions.
+    - __velocities : np.ndarray
+        The (particles, dimensions) array of current velocities.
+    - __pbests : np.ndarray
+        The (particles, dimensions) array of personal best positions.
+    - __fitness : np.ndarray
+        The heuristic values of the current positions.
+    - __pbest_fitness : np.ndarray
+        The heuristic values of the personal best positions.
     - __particles : list[Particle]
-        The list of particles in the swarm.
+        The list of particles in the swarm. Each one is a view into a row
+        of the arrays above.
     - __gbest : Vector
         The global best position found by the swarm.
+    - __gbest_index : int
+        The index of the particle whose pbest is the global best.
+    - __gbest_fitness : float
+        The heuristic value of the global best position.
+    - __evaluation_count : int
+        The number of heuristic evaluations (one per particle and position)
+        since the swarm was last initialized. Positions found in a
+        FitnessCache and the ones a SurrogateEvaluator skips are not
+        counted.
     - _heuristic_f : callable
         The heuristic function to be optimized.
+    - __evaluator : Evaluator
+        The backend used to evaluate the heuristic function on the swarm.
+    - __topology : Topology
+        Which pbests attract each particle (the gbest by default).
+    - __seed_sequence : np.random.SeedSequence
+        The root of every random stream of the swarm. The swarm draws from
+        it directly and spawns independent child streams for the topology
+        and the workers of the evaluator.
+    - __rng : np.random.Generator
+        The generator of the random numbers of the swarm.
+    - __random_coefficients : str
+        If r1 and r2 are drawn per particle or per dimension.
+    - __domain : Domain
+        The bounds, velocity limit and boundary mode of the search space.
 
     ## Methods
     - __repr__() 
         Returns a string representation of the particle swarm (overridden).
-    - _initialize_particles_randomly(bound=10)
-        Initializes the positions and velocities of particles randomly.
-    - update_gbest()
+    - _initialize_particles_randomly(rows=slice(None))
+        Initializes the positions and velocities of particles (or of some
+        rows) randomly inside the domain.
+    - _evaluate(rows=slice(None))
+        Evaluates the heuristic function on every particle's position (or
+        on some rows).
+    - _evaluate_positions(positions)
+        Evaluates the heuristic function on any positions, counting the
+        evaluations.
+    - _store_fitness(index, value, evaluated=True)
+        Stores the heuristic value of a single particle evaluated elsewhere.
+    - _set_state(positions, velocities, pbests, fitness, pbest_fitness, evaluation_count=0)
+        Loads a previously computed state into the swarm.
+    - _receive_migrants(positions, fitness)
+        Replaces the worst particles with better migrants from another swarm.
+    - _update_velocities(rows=slice(None))
+        Updates the velocities of the whole swarm (or some rows).
+    - _enforce_domain(rows=slice(None))
+        Brings the particles (or some rows) that left the domain back into it.
+    - _update_positions(rows=slice(None))
+        Moves every particle (or some rows) according to its velocity.
+    - _update_pbests(rows=slice(None))
+        Updates the personal best positions of the whole swarm (or some rows).
+    - update_gbest(index=None)
         Updates the global best position found by the swarm.
 
     ### Getters
@@ -87,14 +210,42 @@ class ParticleSwarm:
         Returns the number of particles in the swarm.
     - get_particles() -> list[Particle]
         Returns the list of particles in the swarm.
+    - get_positions() -> np.ndarray
+        Returns the array of current positions.
+    - get_velocities() -> np.ndarray
+        Returns the array of current velocities.
+    - get_pbests() -> np.ndarray
+        Returns the array of personal best positions.
+    - get_fitness() -> np.ndarray
+        Returns the heuristic values of the current positions.
+    - get_pbest_fitness() -> np.ndarray
+        Returns the heuristic values of the personal best positions.
     - get_gbest() -> Vector
         Returns the global best position found by the swarm.
+    - get_gbest_index() -> int
+        Returns the index of the particle that found the global best.
+    - get_gbest_fitness() -> float
+        Returns the heuristic value of the global best position.
+    - get_evaluation_count() -> int
+        Returns the number of heuristic evaluations performed.
     - get_heuristic() -> callable
         Returns the heuristic function to be optimized.
+    - get_evaluator() -> Evaluator
+        Returns the evaluation backend.
+    - get_topology() -> Topology
+        Returns the neighborhood topology.
+    - get_rng() -> np.random.Generator
+        Returns the random number generator.
+    - get_seed_sequence() -> np.random.SeedSequence
+        Returns the root seed sequence.
+    - get_random_coefficients() -> str
+        Returns the mode of the r1 and r2 coefficients.
+    - get_domain() -> Domain
+        Returns the search space.
     """
 
     # ? ARE THE PSO COEFFICIENTS REALLY NEEDED HERE?
-    def __init__(self, inertia_coefficient: float = 1, cognitive_coefficient: float = 2, social_coefficient: float = 2, dimensions: int = 3, particle_amount: int = 10, heuristic: callable = default_heuristic) -> None:
+    def __init__(self, inertia_coefficient: float = 1, cognitive_coefficient: float = 2, social_coefficient: float = 2, dimensions: int = 3, particle_amount: int = 10, heuristic: callable = default_heuristic, evaluator: Evaluator = None, topology: Topology = None, seed: int | np.random.SeedSequence = None, random_coefficients: str = "particle", domain: Domain = None) -> None:
         self.__inertia_coefficient: float = inertia_coefficient
         self.__cognitive_coefficient: float = cognitive_coefficient
         self.__social_coefficient: float = social_coefficient
@@ -113,47 +264,257 @@ class ParticleSwarm:
             print("Dimensions defaulted to 3.")
             dimensions = 3
         # TODO: Except TypeError (double)
-        # ? Should the following line be inside a finally block?
-        self.__particles: list[Particle] = [
-            Particle(index=p, has_gbest=False, cognitive_coefficient=cognitive_coefficient,
-            dimensions=dimensions, heuristic=heuristic, 
-            inertia_coefficient=inertia_coefficient, 
-            social_coefficient=social_coefficient) 
-            for p in range(self.__particle_amount)
-            ] # ! Test change of Particle's constructor
+        # * The last dimension is the heuristic value, so positions have one less
+        shape: tuple[int, int] = (self.__particle_amount, dimensions - 1)
+        # * The arrays are always modified in place, so the particles' views
+        # * (and anyone holding them) stay valid during the whole optimization
+        self.__positions: np.ndarray = np.zeros(shape)
+        self.__velocities: np.ndarray = np.zeros(shape)
+        self.__pbests: np.ndarray = np.zeros(shape)
+        self.__fitness: np.ndarray = np.full(self.__particle_amount, np.inf)
+        self.__pbest_fitness: np.ndarray = np.full(self.__particle_amount, np.inf)
+        self.__particles: list[Particle] = [Particle(self, p) for p in range(self.__particle_amount)]
         self.__gbest: Position = Position(dimensions - 1)
+        self.__gbest_index: int = 0
+        # * Fitness values are stored when they are computed so the heuristic
+        # * is never evaluated twice on the same position
+        self.__gbest_fitness: float = np.inf
+        self.__evaluation_count: int = 0
         self._heuristic_f: callable = heuristic
+        self.__evaluator: Evaluator = evaluator if evaluator is not None else Evaluator()
+        if random_coefficients not in RANDOM_COEFFICIENT_MODES:
+            raise ValueError(f"Unknown random coefficients mode: {random_coefficients}. Available modes: {RANDOM_COEFFICIENT_MODES}.")
+        self.__random_coefficients: str = random_coefficients
+        self.__seed_sequence: np.random.SeedSequence = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+        self.__rng: np.random.Generator = np.random.default_rng(self.__seed_sequence)
+        # * Spawned children are independent of the parent stream and of each other
+        topology_seed, evaluator_seed = self.__seed_sequence.spawn(2)
+        self.__evaluator._seed(evaluator_seed)
+        self.__topology: Topology = topology if topology is not None else Topology()
+        self.__topology._build(self.__particle_amount, np.random.default_rng(topology_seed))
+        self.__domain: Domain = domain if domain is not None else Domain()
+        self.__domain._build(dimensions - 1)
     
     def __repr__(self) -> str:
         return f"Particle swarm with {self.get_particle_amount()} particles, cognitive coefficient {self.get_cognitive_coefficient()}, inertia coefficient {self.get_inertia_coefficient()}, social coefficient {self.get_social_coefficient()} and global best position {self.get_gbest().get_coordinates()}."
 
-    def _initialize_particles_randomly(self, bound: float = 10) -> None:
-        """Calls the initialize_randomly method of each particle in the
-        swarm and then updates the global best position (__gbest).
-        
+    def _initialize_particles_randomly(self, rows: slice = slice(None)) -> None:
+        """Initializes the positions of the whole swarm (or of the given
+        rows) randomly inside the domain and their velocities within a
+        tenth of its width, evaluates them and then updates the personal
+        bests (__pbests) and the global best position (__gbest).
+
         ## Parameters
-        bound : float
-            The bound used to delimit the values of the particles' positions. Default is 10.
+        rows : slice
+            The particles to initialize. Default is the whole swarm, which
+            also restarts the evaluation count.
         """
-        for particle in self.__particles:
-            particle.initialize_randomly(bound)
-        self.__gbest.set_coordinates(self.__particles[0].get_position().get_coordinates().copy())
-        # print("BBBB", self.__gbest.get_coordinates())
+        shape: tuple[int, int] = self.__positions[rows].shape
+        self.__positions[rows] = self.__domain.sample(self.__rng, shape)
+        # * The initial velocities are at most a tenth of the width of each dimension
+        initial_speed: np.ndarray = self.__domain.get_width() / 10
+        self.__velocities[rows] = self.__rng.uniform(low=-initial_speed, high=initial_speed, size=shape)
+        self.__positions[rows] += self.__velocities[rows]
+        self._enforce_domain(rows)
+        if rows == slice(None):
+            self.__evaluation_count = 0
+        self._evaluate(rows)
+        self.__pbests[rows] = self.__positions[rows]
+        # * A position that was not evaluated can not be anyone's best
+        self.__pbest_fitness[rows] = np.where(np.isnan(self.__fitness[rows]), np.inf, self.__fitness[rows])
+        # * Recomputed over every particle, a reinitialized pbest may be worse than the gbest it was
         self.update_gbest()
 
+    def _evaluate(self, rows: slice = slice(None)) -> None:
+        """Evaluates the heuristic function on the current position of
+        every particle (or of the given rows) and stores the values in
+        __fitness. Batch heuristic functions are called once per evaluation
+        task (see evaluate_batch), which is the whole swarm unless the
+        evaluator splits it."""
+        self.__fitness[rows] = self._evaluate_positions(self.__positions[rows])
+
+    def _evaluate_positions(self, positions: np.ndarray) -> np.ndarray:
+        """Returns the heuristic values of the rows of positions, evaluated
+        by the evaluator of the swarm, and adds them to the evaluation
+        count."""
+        cache = self._heuristic_f if isinstance(self._heuristic_f, FitnessCache) else None
+        hits: int = cache.get_hits() if cache is not None else 0
+        values: np.ndarray = self.__evaluator.evaluate(self._heuristic_f, positions)
+        # * Positions left as nan by the evaluator were not evaluated, and cache hits cost no evaluation
+        if cache is not None:
+            hits = cache.get_hits() - hits
+        self.__evaluation_count += int(np.count_nonzero(~np.isnan(values))) - hits
+        return values
+
+    def _set_state(self, positions: np.ndarray, velocities: np.ndarray, pbests: np.ndarray, fitness: np.ndarray, pbest_fitness: np.ndarray, evaluation_count: int = 0) -> None:
+        """Copies a previously computed state into the swarm's arrays (in
+        place, so the particles' views stay valid) and updates the gbest.
+
+        ## Parameters
+        positions, velocities, pbests : np.ndarray
+            (particles, dimensions) arrays.
+        fitness, pbest_fitness : np.ndarray
+            (particles,) arrays of heuristic values.
+        evaluation_count : int
+            The number of evaluations that produced the state. Default is 0.
+        """
+        self.__positions[...] = positions
+        self.__velocities[...] = velocities
+        self.__pbests[...] = pbests
+        self.__fitness[...] = fitness
+        self.__pbest_fitness[...] = pbest_fitness
+        self.__evaluation_count = evaluation_count
+        self.update_gbest()
+
+    def _get_state(self) -> dict:
+        """Returns copies of everything that changes during a run: the
+        arrays, the gbest, the evaluation count, the state of the random
+        generator and the state of the topology. Restoring it with
+        _restore_state continues the run exactly where it was."""
+        return {"positions": self.__positions.copy(), "velocities": self.__velocities.copy(),
+            "pbests": self.__pbests.copy(), "fitness": self.__fitness.copy(), "pbest_fitness": self.__pbest_fitness.copy(),
+            "gbest": self.__gbest.get_coordinates().copy(), "gbest_index": self.__gbest_index,
+            "gbest_fitness": self.__gbest_fitness, "evaluation_count": self.__evaluation_count,
+            "rng_state": self.__rng.bit_generator.state, "topology": self.__topology._get_state()}
+
+    def _restore_state(self, state: dict) -> None:
+        """Restores a state returned by _get_state (in place, so the
+        particles' views stay valid). Unlike _set_state, the gbest is not
+        recomputed, so ties are resolved as in the original run."""
+        if state["positions"].shape != self.__positions.shape:
+            raise ValueError(f"The state is of a swarm of shape {state['positions'].shape}, not {self.__positions.shape}.")
+        self.__positions[...] = state["positions"]
+        self.__velocities[...] = state["velocities"]
+        self.__pbests[...] = state["pbests"]
+        self.__fitness[...] = state["fitness"]
+        self.__pbest_fitness[...] = state["pbest_fitness"]
+        self.__gbest.set_coordinates(np.array(state["gbest"], dtype=float))
+        self.__gbest_index = int(state["gbest_index"])
+        self.__gbest_fitness = float(state["gbest_fitness"])
+        self.__evaluation_count = int(state["evaluation_count"])
+        self.__rng.bit_generator.state = state["rng_state"]
+        self.__topology._set_state(state["topology"])
+
+    def _receive_migrants(self, positions: np.ndarray, fitness: np.ndarray) -> None:
+        """Replaces the worst particles of the swarm (by pbest) with the
+        given migrants that are better than them. The migrants become both
+        the position and the pbest of the particles they replace, which
+        keep their velocities.
+
+        ## Parameters
+        positions : np.ndarray
+            (migrants, dimensions) array of positions.
+        fitness : np.ndarray
+            (migrants,) array with their heuristic values.
+        """
+        amount: int = min(fitness.shape[0], self.__particle_amount)
+        best_migrants: np.ndarray = np.argsort(fitness, kind="stable")[:amount]
+        # * Worst particles first, matched with the best migrants first
+        worst_particles: np.ndarray = np.argsort(self.__pbest_fitness, kind="stable")[::-1][:amount]
+        accepted: np.ndarray = fitness[best_migrants] < self.__pbest_fitness[worst_particles]
+        best_migrants = best_migrants[accepted]
+        worst_particles = worst_particles[accepted]
+        self.__positions[worst_particles] = positions[best_migrants]
+        self.__pbests[worst_particles] = positions[best_migrants]
+        self.__fitness[worst_particles] = fitness[best_migrants]
+        self.__pbest_fitness[worst_particles] = fitness[best_migrants]
+        self.update_gbest()
+
+    def _store_fitness(self, index: int, value: float, evaluated: bool = True) -> None:
+        """Stores the heuristic value of a single particle evaluated outside
+        of _evaluate (asynchronous mode) and updates its pbest and, if it
+        improved on it, the global best position.
+
+        ## Parameters
+        index : int
+            The index of the evaluated particle.
+        value : float
+            The heuristic value of its current position.
+        evaluated : bool
+            If the value cost an evaluation (False for cache hits). Default is True.
+        """
+        self.__fitness[index] = value
+        self.__evaluation_count += int(evaluated)
+        self._update_pbests(slice(index, index + 1))
+        self.update_gbest(index)
+
+    def _update_velocities(self, rows: slice = slice(None)) -> None:
+        """
+        Updates the velocity of every particle (or of the given rows) at
+        once based on the particle swarm optimization formula:
+        v(i + 1) = w * v(i) + c1 * r1 * (pbest - x(i)) + c2 * r2 * (gbest - x(i))
+
+        With a local topology, gbest is replaced by the best pbest among the
+        particle's neighbors (lbest).
+
+        Every component is then limited to the velocity limit of the
+        domain in its dimension.
+
+        ## Parameters
+        rows : slice
+            The particles to update. Default is the whole swarm.
+
+        ### Notes
+        - The `w` constant (inertia coefficient) ranges between 0 and 1.
+        - The `c1` (cognitive coefficient) and `c2` (social coefficient) constants range between 1 and 3.
+        - The `r1` and `r2` values are random numbers between 0 and 1, one
+        per particle or one per particle and dimension (see
+        random_coefficients). Both are drawn for every row in a single call.
+        """
+        # * Slicing returns views, so the in-place operations reach the arrays
+        velocities: np.ndarray = self.__velocities[rows]
+        x_i: np.ndarray = self.__positions[rows]
+        columns: int = 1 if self.__random_coefficients == "particle" else x_i.shape[1]
+        r1, r2 = self.__rng.random((2, x_i.shape[0], columns))
+        w: float = self.__inertia_coefficient
+        c1: float = self.__cognitive_coefficient
+        c2: float = self.__social_coefficient
+        velocities *= w
+        velocities += c1 * r1 * (self.__pbests[rows] - x_i)
+        if self.__topology.is_global():
+            social: np.ndarray = self.__gbest.get_coordinates()
+        else:
+            social = self.__pbests[self.__topology.best_neighbors(self.__pbest_fitness, rows)]
+        velocities += c2 * r2 * (social - x_i)
+        self.__domain.clamp_velocities(velocities)
+
+    def _enforce_domain(self, rows: slice = slice(None)) -> None:
+        """Brings the coordinates of every particle (or of the given rows)
+        that left the domain back into it, according to its boundary mode."""
+        self.__domain.apply(self.__positions[rows], self.__velocities[rows], self.__rng)
+
+    def _update_positions(self, rows: slice = slice(None)) -> None:
+        """Moves every particle (or the given rows) by adding its velocity
+        to its position."""
+        self.__positions[rows] += self.__velocities[rows]
+
+    def _update_pbests(self, rows: slice = slice(None)) -> None:
+        """Updates the best position of every particle (or of the given
+        rows) whose current heuristic value is lower than the one of its
+        pbest (nan values, of positions that were not evaluated, never are)."""
+        improved: np.ndarray = self.__fitness[rows] < self.__pbest_fitness[rows]
+        self.__pbests[rows][improved] = self.__positions[rows][improved]
+        self.__pbest_fitness[rows][improved] = self.__fitness[rows][improved]
+
     # ? Should gbest be an instance of another class for it to have its own update method?
-    def update_gbest(self) -> None:
-        """Compares each particles' position (accessed through get_position()) 
-        with the global best position (__gbest)"""
-        dimensions: int = self.__particles[0].get_position().get_dimensions() # ? Might be a better way to do it
-        gbest_index: int = 0
-        for particle in self.__particles:
-            #if particle.get_heuristic().get_coordinates()[dimensions] < self._heuristic_f(self.__gbest):
-            if self._heuristic_f(particle.get_position().get_coordinates()) < self._heuristic_f(self.__gbest):
-                print(f"{particle.get_heuristic().get_coordinates()[dimensions]}  <  {self._heuristic_f(self.__gbest)}")
-                self.__gbest.set_coordinates(particle.get_position().get_coordinates().copy())
-                gbest_index = particle.get_index()
-        self.__particles[gbest_index].has_gbest = True
+    def update_gbest(self, index: int = None) -> None:
+        """Sets the global best position (__gbest) to the best of the
+        particles' personal best positions, using their stored heuristic
+        values (__pbest_fitness).
+
+        ## Parameters
+        index : int, optional
+            If given, only the pbest of that particle is compared with the
+            current gbest. Default is None (every particle).
+        """
+        if index is None:
+            self.__gbest_index = int(np.argmin(self.__pbest_fitness))
+        elif self.__pbest_fitness[index] < self.__gbest_fitness:
+            self.__gbest_index = index
+        else:
+            return
+        self.__gbest.set_coordinates(self.__pbests[self.__gbest_index].copy())
+        self.__gbest_fitness = float(self.__pbest_fitness[self.__gbest_index])
 
     # * Getters (setters not necessary for now)
 
@@ -172,15 +533,57 @@ class ParticleSwarm:
     def get_particles(self) -> list[Particle]:
         return self.__particles
     
+    def get_positions(self) -> np.ndarray:
+        return self.__positions
+    
+    def get_velocities(self) -> np.ndarray:
+        return self.__velocities
+    
+    def get_pbests(self) -> np.ndarray:
+        return self.__pbests
+    
+    def get_fitness(self) -> np.ndarray:
+        return self.__fitness
+    
+    def get_pbest_fitness(self) -> np.ndarray:
+        return self.__pbest_fitness
+    
     def get_gbest(self) -> Position:
         return self.__gbest
     
+    def get_gbest_index(self) -> int:
+        return self.__gbest_index
+    
+    def get_gbest_fitness(self) -> float:
+        return self.__gbest_fitness
+    
+    def get_evaluation_count(self) -> int:
+        return self.__evaluation_count
+    
     def get_heuristic(self) -> callable:
         return self._heuristic_f
+    
+    def get_evaluator(self) -> Evaluator:
+        return self.__evaluator
+    
+    def get_topology(self) -> Topology:
+        return self.__topology
+    
+    def get_rng(self) -> np.random.Generator:
+        return self.__rng
+    
+    def get_seed_sequence(self) -> np.random.SeedSequence:
+        return self.__seed_sequence
+    
+    def get_random_coefficients(self) -> str:
+        return self.__random_coefficients
+    
+    def get_domain(self) -> Domain:
+        return self.__domain
 
 if __name__ == "__main__":
     swarm = ParticleSwarm(1, 1, 1, 2, 5)
-    swarm._initialize_particles_randomly(5)
+    swarm._initialize_particles_randomly()
     print(swarm.get_particles())
     print(swarm.get_gbest())
     swarm.update_gbest()
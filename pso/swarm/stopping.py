@@ -0,0 +1,156 @@
+"""
+This module defines the stopping criteria that can end an optimization
+before its maximum number of iterations. They are checked after every
+iteration and the first one that is met stops the run.
+
+## Classes
+- StoppingCriterion: Base class of the stopping criteria.
+- ImprovementStagnation: The gbest has not improved for some iterations.
+- SwarmDiameter: The particles have collapsed onto a small region.
+- TargetFitness: The gbest has reached a target heuristic value.
+- VelocityStagnation: The particles have (almost) stopped moving.
+
+### Methods
+- reset() -> None
+- check(swarm: ParticleSwarm) -> bool
+- get_reason() -> str
+- _get_state() -> dict
+- _set_state(state: dict) -> None
+"""
+
+import numpy as np
+
+from pso.swarm.particle_swarm import ParticleSwarm
+
+class StoppingCriterion:
+    """
+    Base class of the stopping criteria.
+
+    ## Methods
+    - reset()
+        Forgets what the criterion saw in previous runs. Called at the
+        beginning of every optimization.
+    - check(swarm) -> bool
+        Returns True if the optimization must stop after the current
+        iteration of the swarm.
+    - get_reason() -> str
+        Returns the description of why the criterion was met.
+    - _get_state() -> dict
+        Returns what the criterion saw so far, for checkpoints.
+    - _set_state(state)
+        Restores a state returned by _get_state.
+    """
+
+    def reset(self) -> None:
+        pass
+
+    def _get_state(self) -> dict:
+        return {}
+
+    def _set_state(self, state: dict) -> None:
+        pass
+
+    def check(self, swarm: ParticleSwarm) -> bool:
+        raise NotImplementedError
+
+    def get_reason(self) -> str:
+        raise NotImplementedError
+
+class ImprovementStagnation(StoppingCriterion):
+    """
+    Met when the heuristic value of the gbest has not improved by more
+    than tolerance for patience consecutive iterations.
+
+    ## Parameters
+    - tolerance : float, optional
+        The minimum improvement that counts. Default is 1e-8.
+    - patience : int, optional
+        The number of iterations without improvement allowed. Default is 10.
+    """
+
+    def __init__(self, tolerance: float = 1e-8, patience: int = 10) -> None:
+        self.__tolerance: float = tolerance
+        self.__patience: int = patience
+        self.__best_fitness: float = np.inf
+        self.__stagnant_iterations: int = 0
+
+    def reset(self) -> None:
+        self.__best_fitness = np.inf
+        self.__stagnant_iterations = 0
+
+    def check(self, swarm: ParticleSwarm) -> bool:
+        if swarm.get_gbest_fitness() < self.__best_fitness - self.__tolerance:
+            self.__best_fitness = swarm.get_gbest_fitness()
+            self.__stagnant_iterations = 0
+        else:
+            self.__stagnant_iterations += 1
+        return self.__stagnant_iterations >= self.__patience
+
+    def _get_state(self) -> dict:
+        return {"best_fitness": self.__best_fitness, "stagnant_iterations": self.__stagnant_iterations}
+
+    def _set_state(self, state: dict) -> None:
+        self.__best_fitness = state["best_fitness"]
+        self.__stagnant_iterations = state["stagnant_iterations"]
+
+    def get_reason(self) -> str:
+        return f"The global best did not improve by more than {self.__tolerance} in {self.__patience} iterations."
+
+class SwarmDiameter(StoppingCriterion):
+    """
+    Met when the diameter of the swarm is below epsilon. The diameter is
+    measured as the diagonal of the box that contains every particle,
+    which bounds the largest distance between two of them and is linear
+    in the number of particles.
+
+    ## Parameters
+    - epsilon : float, optional
+        The diameter below which the swarm is considered collapsed. Default is 1e-6.
+    """
+
+    def __init__(self, epsilon: float = 1e-6) -> None:
+        self.__epsilon: float = epsilon
+
+    def check(self, swarm: ParticleSwarm) -> bool:
+        positions: np.ndarray = swarm.get_positions()
+        return float(np.linalg.norm(np.ptp(positions, axis=0))) < self.__epsilon
+
+    def get_reason(self) -> str:
+        return f"The diameter of the swarm fell below {self.__epsilon}."
+
+class TargetFitness(StoppingCriterion):
+    """
+    Met when the heuristic value of the gbest is lower than or equal to
+    target.
+
+    ## Parameters
+    - target : float
+        The heuristic value to reach.
+    """
+
+    def __init__(self, target: float) -> None:
+        self.__target: float = target
+
+    def check(self, swarm: ParticleSwarm) -> bool:
+        return swarm.get_gbest_fitness() <= self.__target
+
+    def get_reason(self) -> str:
+        return f"The global best reached the target heuristic value {self.__target}."
+
+class VelocityStagnation(StoppingCriterion):
+    """
+    Met when the norm of the velocity of every particle is below epsilon.
+
+    ## Parameters
+    - epsilon : float, optional
+        The norm below which a particle is considered stopped. Default is 1e-6.
+    """
+
+    def __init__(self, epsilon: float = 1e-6) -> None:
+        self.__epsilon: float = epsilon
+
+    def check(self, swarm: ParticleSwarm) -> bool:
+        return float(np.max(np.linalg.norm(swarm.get_velocities(), axis=1))) < self.__epsilon
+
+    def get_reason(self) -> str:
+        return f"The velocity of every particle fell below {self.__epsilon}."
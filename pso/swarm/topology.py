@@ -0,0 +1,215 @@
+"""
+This module defines the neighborhood topologies of a particle swarm, i.e.
+which particles' pbests attract each particle (the social term of the
+velocity update).
+
+Every topology except the global one precomputes an integer array with the
+indexes of the neighbors of each particle (including itself), so the best
+neighbor (lbest) of every particle is found with a single gather and
+argmin over the pbest heuristic values.
+
+## Classes
+- Topology: Base class, the single global best (gbest) of the whole swarm.
+- RingTopology: Each particle sees the k closest indexes on each side.
+- VonNeumannTopology: Each particle sees its four neighbors in a toroidal grid.
+- RandomTopology: Each particle sees k random particles, rewired periodically.
+- AdjacencyTopology: The neighbors are given by the user.
+
+### Methods
+- _build(particle_amount: int, rng: np.random.Generator = None) -> None
+- _next_iteration() -> None
+- best_neighbors(pbest_fitness: np.ndarray, rows: slice) -> np.ndarray
+- _get_state() -> dict
+- _set_state(state: dict) -> None
+
+#### Getters
+- get_neighbors() -> np.ndarray
+"""
+
+import numpy as np
+
+class Topology:
+    """
+    The global topology: every particle is attracted by the gbest, so there
+    is no neighbor array and best_neighbors is never needed. The other
+    topologies inherit from it.
+
+    ## Attributes
+    - _neighbors : np.ndarray | None
+        The (particles, neighbors) array of neighbor indexes, None for the
+        global topology.
+
+    ## Methods
+    - _build(particle_amount, rng=None)
+        Precomputes the neighbor indexes for a swarm of that size. rng is a
+        child stream of the swarm, used by the random topologies.
+    - _next_iteration()
+        Called after every iteration (used to rewire random topologies).
+    - best_neighbors(pbest_fitness, rows=slice(None)) -> np.ndarray
+        Returns the index of the best neighbor of each particle in rows.
+    - is_global() -> bool
+        If the topology is the global one.
+    - _get_state() -> dict
+        Returns what changes during a run, for checkpoints.
+    - _set_state(state)
+        Restores a state returned by _get_state.
+    """
+
+    def __init__(self) -> None:
+        self._neighbors: np.ndarray = None
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__} topology."
+
+    def _build(self, particle_amount: int, rng: np.random.Generator = None) -> None:
+        pass
+
+    def _next_iteration(self) -> None:
+        pass
+
+    def best_neighbors(self, pbest_fitness: np.ndarray, rows: slice = slice(None)) -> np.ndarray:
+        """Returns, for each particle in rows, the index of the neighbor
+        with the lowest pbest heuristic value (its lbest).
+
+        ## Parameters
+        pbest_fitness : np.ndarray
+            The (particles,) array of pbest heuristic values.
+        rows : slice
+            The particles whose lbest is needed. Default is the whole swarm.
+        """
+        if self._neighbors is None:
+            return np.full(pbest_fitness[rows].shape[0], int(np.argmin(pbest_fitness)))
+        neighbors: np.ndarray = self._neighbors[rows]
+        best: np.ndarray = np.argmin(pbest_fitness[neighbors], axis=1)
+        return neighbors[np.arange(neighbors.shape[0]), best]
+
+    def is_global(self) -> bool:
+        return self._neighbors is None
+
+    def _get_state(self) -> dict:
+        return {"neighbors": None if self._neighbors is None else self._neighbors.copy()}
+
+    def _set_state(self, state: dict) -> None:
+        if self._neighbors is not None:
+            # * In place, so the array handed out by get_neighbors stays valid
+            self._neighbors[...] = state["neighbors"]
+
+    def get_neighbors(self) -> np.ndarray:
+        return self._neighbors
+
+class RingTopology(Topology):
+    """
+    Each particle is connected to the k particles before and after it (by
+    index, wrapping around) and to itself.
+
+    ## Parameters
+    - k : int, optional
+        The number of neighbors on each side. Default is 1.
+    """
+
+    def __init__(self, k: int = 1) -> None:
+        super().__init__()
+        if k < 1:
+            raise ValueError("A ring topology needs at least one neighbor on each side.")
+        self.__k: int = k
+
+    def _build(self, particle_amount: int, rng: np.random.Generator = None) -> None:
+        offsets: np.ndarray = np.arange(-self.__k, self.__k + 1)
+        self._neighbors = (np.arange(particle_amount)[:, np.newaxis] + offsets) % particle_amount
+
+class VonNeumannTopology(Topology):
+    """
+    The particles are laid out row by row in a toroidal grid and each one
+    is connected to the particles above, below, to the left and to the
+    right of it, and to itself. The indexes wrap around the whole swarm,
+    so the number of particles does not need to fill the grid.
+
+    ## Parameters
+    - columns : int, optional
+        The number of columns of the grid. Default is None, the closest
+        integer to the square root of the number of particles.
+    """
+
+    def __init__(self, columns: int = None) -> None:
+        super().__init__()
+        self.__columns: int = columns
+
+    def _build(self, particle_amount: int, rng: np.random.Generator = None) -> None:
+        columns: int = self.__columns or max(1, int(round(np.sqrt(particle_amount))))
+        offsets: np.ndarray = np.array([0, -1, 1, -columns, columns])
+        self._neighbors = (np.arange(particle_amount)[:, np.newaxis] + offsets) % particle_amount
+
+class RandomTopology(Topology):
+    """
+    Each particle is connected to itself and to k other particles chosen at
+    random, which are chosen again every rewire_interval iterations.
+
+    ## Parameters
+    - k : int, optional
+        The number of random neighbors of each particle. Default is 3.
+    - rewire_interval : int, optional
+        The number of iterations between rewirings. Default is 10.
+    - seed : int, optional
+        Seed of the random neighbors. Default is None, which draws them
+        from the child stream the swarm gives to its topology.
+    """
+
+    def __init__(self, k: int = 3, rewire_interval: int = 10, seed: int = None) -> None:
+        super().__init__()
+        if k < 1 or rewire_interval < 1:
+            raise ValueError("The number of neighbors and the rewire interval must be greater than zero.")
+        self.__k: int = k
+        self.__rewire_interval: int = rewire_interval
+        self.__iteration: int = 0
+        self.__seed: int = seed
+        self.__rng: np.random.Generator = np.random.default_rng(seed)
+
+    def _build(self, particle_amount: int, rng: np.random.Generator = None) -> None:
+        if self.__seed is None and rng is not None:
+            self.__rng = rng
+        self.__iteration = 0
+        others: np.ndarray = self.__rng.integers(0, particle_amount, size=(particle_amount, self.__k))
+        self._neighbors = np.column_stack((np.arange(particle_amount), others))
+
+    def _next_iteration(self) -> None:
+        self.__iteration += 1
+        if self.__iteration % self.__rewire_interval == 0:
+            particle_amount: int = self._neighbors.shape[0]
+            # * In place, so the array handed out by get_neighbors stays valid
+            self._neighbors[:, 1:] = self.__rng.integers(0, particle_amount, size=(particle_amount, self.__k))
+
+    def _get_state(self) -> dict:
+        return {**super()._get_state(), "iteration": self.__iteration, "rng_state": self.__rng.bit_generator.state}
+
+    def _set_state(self, state: dict) -> None:
+        super()._set_state(state)
+        self.__iteration = state["iteration"]
+        self.__rng.bit_generator.state = state["rng_state"]
+
+class AdjacencyTopology(Topology):
+    """
+    The neighbors of each particle are given by the user, either as a
+    (particles, particles) boolean adjacency matrix or as a list with the
+    neighbors of each particle. Every particle is also its own neighbor,
+    and particles with fewer neighbors than the rest are padded with
+    their own index.
+
+    ## Parameters
+    - adjacency : np.ndarray | list[list[int]]
+        The adjacency matrix or the lists of neighbors.
+    """
+
+    def __init__(self, adjacency) -> None:
+        super().__init__()
+        if isinstance(adjacency, np.ndarray) and adjacency.ndim == 2 and adjacency.dtype == bool:
+            adjacency = [list(np.flatnonzero(row)) for row in adjacency]
+        self.__adjacency: list[list[int]] = [list(neighbors) for neighbors in adjacency]
+
+    def _build(self, particle_amount: int, rng: np.random.Generator = None) -> None:
+        if len(self.__adjacency) != particle_amount:
+            raise ValueError(f"The adjacency has {len(self.__adjacency)} particles, but the swarm has {particle_amount}.")
+        neighbors: list[list[int]] = [[particle] + [int(n) for n in row if n != particle] for particle, row in enumerate(self.__adjacency)]
+        if any(not 0 <= n < particle_amount for row in neighbors for n in row):
+            raise ValueError("The adjacency contains indexes outside of the swarm.")
+        degree: int = max(len(row) for row in neighbors)
+        self._neighbors = np.array([row + [row[0]] * (degree - len(row)) for row in neighbors])
@@ -8,7 +8,7 @@ Vector: A class to represent a vector in a n-dimensional space and
     facilitate its graphical representation.
 
 ### Methods
-- initialize_randomly(bound: float = 10): Initialize the coordinates of a
+- initialize_randomly(bound: float = 10, dimensions: int = 2, rng: np.random.Generator = None): Initialize the coordinates of a
 vector randomly within
 - _update(): Abstract method.
 
@@ -31,18 +31,24 @@ class Vector:
     ## Parameters
     - dimensions : int
         The number of dimensions of the vector. Default is 3.
+    - coordinates : np.ndarray, optional
+        An existing array the vector should wrap without copying (e.g. a
+        row of the swarm's arrays). Default is None.
     
     ## Attributes
     - _coordinates : np.ndarray
         An array with the coordinates of the vector.
     - _dimensions : int
         The number of dimensions of the vector.
+    - _is_view : bool
+        If the coordinates belong to an array owned by someone else, in
+        which case they are always written in place.
     
     ## Methods
     - __repr__() -> str
         Overwrites the __repr__ method to return a string with the
         coordinates of the vector.
-    - initialize_randomly(bound: float = 10)
+    - initialize_randomly(bound: float = 10, dimensions: int = 2, rng: np.random.Generator = None)
         Initialize the coordinates of a vector randomly within 
         the interval [-bound, bound].
     
@@ -56,22 +62,33 @@ class Vector:
         
     """
     
-    def __init__(self, dimensions = 3) -> None:
-        self._coordinates: np.ndarray = np.zeros(dimensions)
-        self._dimensions: int = dimensions
+    def __init__(self, dimensions = 3, coordinates: np.ndarray = None) -> None:
+        if coordinates is None:
+            self._coordinates: np.ndarray = np.zeros(dimensions)
+            self._dimensions: int = dimensions
+            self._is_view: bool = False
+        else:
+            self._coordinates = coordinates
+            self._dimensions = coordinates.shape[0]
+            self._is_view = True
 
     def __repr__(self) -> str:
         return f"Vector with coordinates {self.get_coordinates()}."
     
-    def initialize_randomly(self, bound: float = 10, dimensions: int = 2) -> None:
+    def initialize_randomly(self, bound: float = 10, dimensions: int = 2, rng: np.random.Generator = None) -> None:
         """Initialize the coordinates of a vector randomly within 
         the interval [-bound, bound].
 
         ## Parameters
         bound (float): 
             The maximum absolute value of the coordinates in all of its dimmensions.
+        rng (np.random.Generator):
+            The generator to draw the coordinates from (e.g. the one of a
+            swarm). Default is None, a new generator with fresh entropy.
         """
-        self._coordinates = np.random.uniform(low=-bound, high=np.nextafter(bound, bound + 1), size=dimensions)
+        if rng is None:
+            rng = np.random.default_rng()
+        self.set_coordinates(rng.uniform(low=-bound, high=np.nextafter(bound, bound + 1), size=dimensions))
     
     # def __lt__(self, other) -> bool:
     #     if not isinstance(other, Vector):
@@ -88,7 +105,11 @@ class Vector:
         return self._dimensions
 
     def set_coordinates(self, coordinates: np.ndarray) -> None:
-        self._coordinates = coordinates
+        if self._is_view:
+            # * Rebinding would detach the vector from the array it wraps
+            self._coordinates[...] = coordinates
+        else:
+            self._coordinates = coordinates
     
     def set_dimensions(self, dimensions: int) -> None:
         self._dimensions = dimensions
@@ -0,0 +1,256 @@
+"""
+This module provides a registry of standard benchmark functions to test
+the optimizer with. Every function is a batch heuristic (see the heuristic
+module) written as a NumPy kernel over (N, D) arrays, so it works in any
+number of dimensions it supports (D = 1000 included) without Python loops
+over the particles or the coordinates.
+
+Every function knows its default search bounds, the dimensions it supports
+and its global minimum (value and position, when they are known).
+
+## Functions
+- register_benchmark(benchmark) -> BenchmarkFunction: Adds a function to the registry.
+- get_benchmark(name) -> BenchmarkFunction: Returns a function of the registry by name.
+- get_benchmark_names() -> list[str]: Returns the names of the registered functions.
+
+## Classes
+- BenchmarkFunction: A batch heuristic function with its known optimum and bounds.
+
+### Methods
+- __call__(positions: np.ndarray) -> np.ndarray
+- supports(dimensions: int) -> bool
+
+#### Getters
+- get_name() -> str
+- get_bounds() -> tuple[float | np.ndarray, float | np.ndarray]
+- get_dimension_range() -> tuple[int, int | None]
+- get_optimum_value(dimensions: int) -> float | None
+- get_optimum_position(dimensions: int) -> np.ndarray | None
+"""
+
+import numpy as np
+
+class BenchmarkFunction:
+    """
+    A batch heuristic function of the registry together with what is known
+    about it. Instances are picklable (as long as their kernel is a
+    module-level function), so they can be sent to a ProcessPoolEvaluator.
+
+    ## Parameters
+    - name : str
+        The name of the function in the registry.
+    - kernel : callable
+        The function itself, from an (N, D) array to an (N,) array.
+    - lower : float | np.ndarray
+        The default lower bound of the search space (shared or per dimension).
+    - upper : float | np.ndarray
+        The default upper bound of the search space (shared or per dimension).
+    - optimum_value : float | callable | None
+        The global minimum, a function of the dimensions if it depends on
+        them, or None if it is not known. A callable may also return None
+        for the dimensions where it is not known.
+    - optimum_position : tuple | callable | None
+        The position of the global minimum of a fixed-dimension function,
+        a function that returns it for the given dimensions (None where it
+        is not known) or None if it is not known.
+    - min_dimensions : int, optional
+        The minimum number of dimensions. Default is 1.
+    - max_dimensions : int, optional
+        The maximum number of dimensions. Default is None (no maximum).
+
+    ## Attributes
+    - is_batch : bool
+        Always True (see the heuristic module).
+    - __name, __kernel, __lower, __upper, __optimum_value,
+    __optimum_position, __min_dimensions, __max_dimensions
+        The parameters above.
+    """
+
+    is_batch: bool = True
+
+    def __init__(self, name: str, kernel: callable, lower: float | np.ndarray, upper: float | np.ndarray, optimum_value = None, optimum_position = None, min_dimensions: int = 1, max_dimensions: int = None) -> None:
+        self.__name: str = name
+        self.__kernel: callable = kernel
+        self.__lower: float | np.ndarray = lower
+        self.__upper: float | np.ndarray = upper
+        self.__optimum_value = optimum_value
+        self.__optimum_position = optimum_position
+        self.__min_dimensions: int = min_dimensions
+        self.__max_dimensions: int = max_dimensions
+
+    def __repr__(self) -> str:
+        return f"{self.__name} benchmark function."
+
+    def __call__(self, positions: np.ndarray) -> np.ndarray:
+        if not self.supports(positions.shape[1]):
+            raise ValueError(f"The {self.__name} function does not support {positions.shape[1]} dimensions (supported: {self.get_dimension_range()}).")
+        return self.__kernel(positions)
+
+    def supports(self, dimensions: int) -> bool:
+        """Returns True if the function is defined in that number of
+        dimensions (the ones of the positions, without the heuristic value)."""
+        return dimensions >= self.__min_dimensions and (self.__max_dimensions is None or dimensions <= self.__max_dimensions)
+
+    # * Getters
+
+    def get_name(self) -> str:
+        return self.__name
+
+    def get_bounds(self) -> tuple:
+        return self.__lower, self.__upper
+
+    def get_dimension_range(self) -> tuple:
+        return self.__min_dimensions, self.__max_dimensions
+
+    def get_optimum_value(self, dimensions: int) -> float:
+        if callable(self.__optimum_value):
+            return self.__optimum_value(dimensions)
+        return self.__optimum_value
+
+    def get_optimum_position(self, dimensions: int) -> np.ndarray:
+        if self.__optimum_position is None:
+            return None
+        if callable(self.__optimum_position):
+            return self.__optimum_position(dimensions)
+        return np.array(self.__optimum_position, dtype=float)
+
+# * Kernels, all of them from an (N, D) array to an (N,) array
+
+def _indexes(positions: np.ndarray) -> np.ndarray:
+    return np.arange(1, positions.shape[1] + 1)
+
+def sphere(positions: np.ndarray) -> np.ndarray:
+    return np.einsum("ij,ij->i", positions, positions)
+
+def ellipsoid(positions: np.ndarray) -> np.ndarray:
+    # * Condition number of 1e6 between the first and the last dimension
+    exponents: np.ndarray = 6 * np.arange(positions.shape[1]) / max(positions.shape[1] - 1, 1)
+    return np.square(positions) @ 10**exponents
+
+def rastrigin(positions: np.ndarray) -> np.ndarray:
+    return 10 * positions.shape[1] + np.sum(np.square(positions) - 10 * np.cos(2 * np.pi * positions), axis=1)
+
+def rosenbrock(positions: np.ndarray) -> np.ndarray:
+    x: np.ndarray = positions[:, :-1]
+    return np.sum(100 * np.square(positions[:, 1:] - np.square(x)) + np.square(1 - x), axis=1)
+
+def ackley(positions: np.ndarray) -> np.ndarray:
+    dimensions: int = positions.shape[1]
+    root_mean_square: np.ndarray = np.sqrt(np.einsum("ij,ij->i", positions, positions) / dimensions)
+    mean_cosine: np.ndarray = np.sum(np.cos(2 * np.pi * positions), axis=1) / dimensions
+    return -20 * np.exp(-0.2 * root_mean_square) - np.exp(mean_cosine) + 20 + np.e
+
+def griewank(positions: np.ndarray) -> np.ndarray:
+    return 1 + np.einsum("ij,ij->i", positions, positions) / 4000 - np.prod(np.cos(positions / np.sqrt(_indexes(positions))), axis=1)
+
+def schwefel(positions: np.ndarray) -> np.ndarray:
+    return 418.9828872724338 * positions.shape[1] - np.sum(positions * np.sin(np.sqrt(np.abs(positions))), axis=1)
+
+def styblinski_tang(positions: np.ndarray) -> np.ndarray:
+    squares: np.ndarray = np.square(positions)
+    return 0.5 * np.sum(np.square(squares) - 16 * squares + 5 * positions, axis=1)
+
+def levy(positions: np.ndarray) -> np.ndarray:
+    w: np.ndarray = 1 + (positions - 1) / 4
+    first: np.ndarray = np.square(np.sin(np.pi * w[:, 0]))
+    middle: np.ndarray = np.sum(np.square(w[:, :-1] - 1) * (1 + 10 * np.square(np.sin(np.pi * w[:, :-1] + 1))), axis=1)
+    last: np.ndarray = np.square(w[:, -1] - 1) * (1 + np.square(np.sin(2 * np.pi * w[:, -1])))
+    return first + middle + last
+
+def michalewicz(positions: np.ndarray, steepness: int = 10) -> np.ndarray:
+    return -np.sum(np.sin(positions) * np.sin(_indexes(positions) * np.square(positions) / np.pi)**(2 * steepness), axis=1)
+
+def zakharov(positions: np.ndarray) -> np.ndarray:
+    weighted: np.ndarray = positions @ (0.5 * _indexes(positions))
+    return np.einsum("ij,ij->i", positions, positions) + weighted**2 + weighted**4
+
+def goldstein_price(positions: np.ndarray) -> np.ndarray:
+    x = positions[:, 0]
+    y = positions[:, 1]
+    return((1 + (x+y+1)**2 * (19 - 14 * x + 3 * x**2 - 14 * y + 6*x*y + 3*y**2)) * (30 + (2*x - 3*y)**2 * (18 - 32 * x + 12 * x**2 + 48 * y - 36*x*y + 27 * y**2)))
+
+def booth(positions: np.ndarray) -> np.ndarray:
+    x = positions[:, 0]
+    y = positions[:, 1]
+    return (x + 2*y - 7)**2 + (2*x + y - 5)**2
+
+def beale(positions: np.ndarray) -> np.ndarray:
+    x = positions[:, 0]
+    y = positions[:, 1]
+    return (1.5 - x + x*y)**2 + (2.25 - x + x*y**2)**2 + (2.625 - x + x*y**3)**2
+
+def six_hump_camel(positions: np.ndarray) -> np.ndarray:
+    x = positions[:, 0]
+    y = positions[:, 1]
+    return (4 - 2.1 * x**2 + x**4 / 3) * x**2 + x*y + (-4 + 4 * y**2) * y**2
+
+# * Optima that depend on the dimensions
+
+def _zeros(dimensions: int) -> np.ndarray:
+    return np.zeros(dimensions)
+
+def _ones(dimensions: int) -> np.ndarray:
+    return np.ones(dimensions)
+
+def _schwefel_optimum(dimensions: int) -> np.ndarray:
+    return np.full(dimensions, 420.9687463)
+
+def _styblinski_tang_optimum(dimensions: int) -> np.ndarray:
+    return np.full(dimensions, -2.903534027771178)
+
+def _styblinski_tang_value(dimensions: int) -> float:
+    return -39.16616570377142 * dimensions
+
+# * Only known (numerically) for a few dimensions
+_MICHALEWICZ_OPTIMA: dict[int, float] = {1: -0.8013034100985499, 2: -1.8013034100985499, 5: -4.687658179, 10: -9.66015171}
+
+def _michalewicz_value(dimensions: int) -> float:
+    return _MICHALEWICZ_OPTIMA.get(dimensions)
+
+def _michalewicz_optimum(dimensions: int) -> np.ndarray:
+    return np.array([2.2029055201726, 1.5707963267949])[:dimensions] if dimensions <= 2 else None
+
+_BENCHMARKS: dict[str, BenchmarkFunction] = {}
+
+def register_benchmark(benchmark: BenchmarkFunction) -> BenchmarkFunction:
+    """Adds a function to the registry (replacing the one with the same
+    name, if any) and returns it."""
+    _BENCHMARKS[benchmark.get_name()] = benchmark
+    return benchmark
+
+def get_benchmark(name: str) -> BenchmarkFunction:
+    """Returns the registered function with that name."""
+    try:
+        return _BENCHMARKS[name]
+    except KeyError:
+        raise ValueError(f"Unknown benchmark function: {name}. Available functions: {get_benchmark_names()}.") from None
+
+def get_benchmark_names() -> list[str]:
+    return list(_BENCHMARKS)
+
+for _benchmark in (
+    BenchmarkFunction("sphere", sphere, -5.12, 5.12, 0.0, _zeros),
+    BenchmarkFunction("ellipsoid", ellipsoid, -5.12, 5.12, 0.0, _zeros),
+    BenchmarkFunction("rastrigin", rastrigin, -5.12, 5.12, 0.0, _zeros),
+    BenchmarkFunction("rosenbrock", rosenbrock, -5.0, 10.0, 0.0, _ones, min_dimensions=2),
+    BenchmarkFunction("ackley", ackley, -32.768, 32.768, 0.0, _zeros),
+    BenchmarkFunction("griewank", griewank, -600.0, 600.0, 0.0, _zeros),
+    BenchmarkFunction("schwefel", schwefel, -500.0, 500.0, 0.0, _schwefel_optimum),
+    BenchmarkFunction("styblinski_tang", styblinski_tang, -5.0, 5.0, _styblinski_tang_value, _styblinski_tang_optimum),
+    BenchmarkFunction("levy", levy, -10.0, 10.0, 0.0, _ones),
+    BenchmarkFunction("michalewicz", michalewicz, 0.0, np.pi, _michalewicz_value, _michalewicz_optimum),
+    BenchmarkFunction("zakharov", zakharov, -5.0, 10.0, 0.0, _zeros),
+    BenchmarkFunction("goldstein_price", goldstein_price, -2.0, 2.0, 3.0, (0, -1), 2, 2),
+    BenchmarkFunction("booth", booth, -10.0, 10.0, 0.0, (1, 3), 2, 2),
+    BenchmarkFunction("beale", beale, -4.5, 4.5, 0.0, (3, 0.5), 2, 2),
+    BenchmarkFunction("six_hump_camel", six_hump_camel, np.array([-3.0, -2.0]), np.array([3.0, 2.0]), -1.031628453489877, (0.0898420131003, -0.7126564030207), 2, 2),
+):
+    register_benchmark(_benchmark)
+
+if __name__ == "__main__":
+    for name in get_benchmark_names():
+        benchmark: BenchmarkFunction = get_benchmark(name)
+        dimensions: int = 2 if benchmark.supports(2) else benchmark.get_dimension_range()[0]
+        optimum: np.ndarray = benchmark.get_optimum_position(dimensions)
+        if optimum is not None:
+            print(name, benchmark(optimum[np.newaxis])[0], benchmark.get_optimum_value(dimensions))
@@ -1,6 +1,19 @@
 """
 This module provides a Heuristic class that represents a vector with a 
-heuristic value.
+heuristic value, and the protocol used to evaluate heuristic functions.
+
+A heuristic function can be written in two ways:
+- Legacy (scalar): receives a single Position (Vector) and returns a float.
+- Batch: receives an (N, D) array with one position per row and returns
+  an (N,) array of heuristic values. Batch functions must be declared with
+  the batch_heuristic decorator so the swarm calls them once per iteration.
+
+## Functions
+- batch_heuristic(heuristic_f) -> callable: Declares a heuristic function as a batch one.
+- is_batch_heuristic(heuristic_f) -> bool: Checks if a heuristic function was declared as a batch one.
+- evaluate_batch(heuristic_f, positions) -> np.ndarray: Evaluates a heuristic function on every row of an array.
+- evaluate_position(heuristic_f, position) -> float: Evaluates a heuristic function on a single position.
+- default_heuristic(positions) -> np.ndarray | float: Goldstein-Price function (batch, or of a single Vector).
 
 ## Classes
 Heuristic: A class that represents a vector with a heuristic value.
@@ -19,14 +32,66 @@ Other getters inherited from the Vector class of the base_vector module.
 """
 
 import numpy as np
-import math
 from pso.vector.base_vector import Vector
+from pso.vector.position import Position
+
+def batch_heuristic(heuristic_f: callable) -> callable:
+    """Declares a heuristic function as a batch one: it receives an (N, D)
+    array of positions and returns an (N,) array of heuristic values.
+
+    ## Parameters
+    heuristic_f : callable
+        The heuristic function to declare. It is returned unchanged apart
+        from the is_batch attribute, so it can be used as a decorator.
+    """
+    heuristic_f.is_batch = True
+    return heuristic_f
+
+def is_batch_heuristic(heuristic_f: callable) -> bool:
+    # * Bound methods forward attribute access to their function
+    return getattr(heuristic_f, "is_batch", False)
 
-def default_heuristic(position: Vector) -> float:
-    x = position.get_coordinates()[0]
-    y = position.get_coordinates()[1]
+def evaluate_batch(heuristic_f: callable, positions: np.ndarray) -> np.ndarray:
+    """Evaluates a heuristic function on every row of positions. Batch
+    functions are called once, legacy ones once per row with a Position
+    wrapping that row.
+
+    ## Parameters
+    heuristic_f : callable
+        A batch or legacy (scalar) heuristic function.
+    positions : np.ndarray
+        An (N, D) array with one position per row.
+
+    ## Returns
+    np.ndarray
+        The (N,) array of heuristic values.
+    """
+    if is_batch_heuristic(heuristic_f):
+        values: np.ndarray = np.asarray(heuristic_f(positions), dtype=float)
+        if values.shape != (positions.shape[0],):
+            raise ValueError(f"A batch heuristic must return one value per row. Expected shape {(positions.shape[0],)} but got {values.shape}.")
+        return values
+    values = np.empty(positions.shape[0])
+    for row in range(positions.shape[0]):
+        values[row] = heuristic_f(Position(coordinates=positions[row]))
+    return values
+
+def evaluate_position(heuristic_f: callable, position: Vector) -> float:
+    """Evaluates a batch or legacy heuristic function on a single position."""
+    return float(evaluate_batch(heuristic_f, position.get_coordinates()[np.newaxis])[0])
+
+@batch_heuristic
+def default_heuristic(positions: np.ndarray | Vector) -> np.ndarray | float:
+    """Goldstein-Price function evaluated on the first two coordinates of
+    each row (minimum of 3 at (0, -1)). Given a single position (a Vector),
+    as legacy heuristic functions are, it returns its value as a float."""
+    if isinstance(positions, Vector):
+        return float(default_heuristic(positions.get_coordinates()[np.newaxis])[0])
+    x = positions[:, 0]
+    y = positions[:, 1]
     return((1 + (x+y+1)**2 * (19 - 14 * x + 3 * x**2 - 14 * y + 6*x*y + 3*y**2)) * (30 + (2*x - 3*y)**2 * (18 - 32 * x + 12 * x**2 + 48 * y - 36*x*y + 27 * y**2)))
-    #return np.sum(np.square(position.get_coordinates()))
+    #return np.sum(np.square(positions), axis=1)
+
 class Heuristic(Vector):
     """
     Represents a heuristic vector used in Particle Swarm Optimization.
@@ -69,7 +134,7 @@ class Heuristic(Vector):
         position : Position
             The position object used to update the vector.
         """
-        heuristic_value = self._heuristic_f(position) # TODO: Static type to be defined
+        heuristic_value: float = evaluate_position(self._heuristic_f, position)
         new_coordinates: np.ndarray = self.get_coordinates().copy()
         for i in range(self.get_dimensions() - 1):
             new_coordinates[i] = position.get_coordinates().copy()[i]
@@ -30,6 +30,8 @@ class Position(Vector):
     ## Parameters
     - dimensions : int, optional
         The number of dimensions of the vector. Default is 3.
+    - coordinates : np.ndarray, optional
+        Array to wrap without copying (see Vector). Default is None.
 
     ## Attributes
     - _color : dict
@@ -48,8 +50,8 @@ class Position(Vector):
     - Other getters and setters inherited.
     """
 
-    def __init__(self, dimensions: int = 3) -> None:
-        super().__init__(dimensions)
+    def __init__(self, dimensions: int = 3, coordinates: np.ndarray = None) -> None:
+        super().__init__(dimensions, coordinates)
     
     def _update(self, velocity: Velocity) -> None:
         # ? Should it be public?
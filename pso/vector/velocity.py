@@ -23,8 +23,8 @@ import numpy as np
 from pso.vector.base_vector import Vector
 
 class Velocity(Vector):
-    def __init__(self, dimensions: int = 3) -> None:
-        super().__init__(dimensions)
+    def __init__(self, dimensions: int = 3, coordinates: np.ndarray = None) -> None:
+        super().__init__(dimensions, coordinates)
     
 if __name__ ==  "__main__":
     v = Velocity(3)
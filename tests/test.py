@@ -0,0 +1,1012 @@
+"""
+Behavior tests of the package. Run from the root of the repository:
+
+    python -m pytest tests/test.py
+    python -m unittest tests/test.py
+
+The tests that write files run in a temporary directory with its own
+database folder, like the one the package expects to find.
+"""
+
+import contextlib
+import copy
+import io
+import math
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import openpyxl as px
+import pandas as pd
+
+from pso.evaluation.cache import FitnessCache
+from pso.evaluation.evaluator import Evaluator, ProcessPoolEvaluator, ThreadPoolEvaluator
+from pso.database.columnar import history_columns, read_columns
+from pso.database.data import ENGINES, Data
+from pso.evaluation.surrogate import SurrogateEvaluator
+from pso.history import History
+from pso.optimization import MAX_ITERATIONS_REASON, Optimization
+from pso.profiling import PHASES
+from pso.recording import DecimatedRecording, FinalStateRecording, FullRecording, GbestRecording, SummaryRecording
+from pso.swarm.domain import BOUNDARY_MODES, Domain
+from pso.swarm.islands import IslandModel
+from pso.swarm.particle_swarm import ParticleSwarm
+from pso.swarm.stopping import ImprovementStagnation, SwarmDiameter, TargetFitness, VelocityStagnation
+from pso.swarm.topology import AdjacencyTopology, RandomTopology, RingTopology, Topology, VonNeumannTopology
+from pso.vector.benchmarks import get_benchmark, get_benchmark_names
+from pso.vector.heuristic import default_heuristic, evaluate_batch
+from pso.vector.position import Position
+
+class CountingHeuristic:
+    """The sphere function as a batch heuristic that counts the positions
+    it evaluates."""
+
+    is_batch: bool = True
+
+    def __init__(self) -> None:
+        self.evaluations: int = 0
+
+    def __call__(self, positions: np.ndarray) -> np.ndarray:
+        self.evaluations += positions.shape[0]
+        return np.sum(np.square(positions), axis=1)
+
+class LegacySphere:
+    """The sphere function as a legacy (scalar) heuristic, which receives a
+    single Position, that counts its calls."""
+
+    def __init__(self) -> None:
+        self.calls: int = 0
+
+    def __call__(self, position: Position) -> float:
+        self.calls += 1
+        return float(np.sum(np.square(position.get_coordinates())))
+
+def noisy_heuristic(positions: np.ndarray) -> np.ndarray:
+    # * Module-level so it can be sent to worker processes, it draws from the global random state of the worker
+    return np.random.random(positions.shape[0])
+
+noisy_heuristic.is_batch = True
+
+class Interruption(Exception):
+    pass
+
+class InterruptedRecording(FullRecording):
+    """Records every iteration until the given one, where it raises an
+    Interruption as if the process had been killed."""
+
+    def __init__(self, iteration: int) -> None:
+        super().__init__()
+        self.__iteration: int = iteration
+
+    def record(self, snapshot) -> None:
+        if snapshot.get_iteration() == self.__iteration:
+            raise Interruption
+        super().record(snapshot)
+
+def run_snapshots(optimization: Optimization) -> list[dict]:
+    """Returns copies of everything in the snapshots of a whole run."""
+    return [{"iteration": snapshot.get_iteration(), "gbest": snapshot.get_gbest().copy(),
+        "gbest_fitness": snapshot.get_gbest_fitness(), "evaluation_count": snapshot.get_evaluation_count(),
+        "positions": snapshot.get_positions().copy(), "velocities": snapshot.get_velocities().copy(),
+        "fitness": snapshot.get_fitness().copy()}
+        for snapshot in optimization.iterate(include_arrays=True)]
+
+def vector_cell(vector: np.ndarray) -> str:
+    """Returns a vector as it is written in the cells of the workbook."""
+    return ", ".join(map(str, np.round(vector, 2).tolist()))
+
+def history_rows(history: History) -> list[tuple]:
+    """Returns the rows of the sheet of a history: the iteration (only in
+    the first row of each iteration), the particle and its four vectors."""
+    rows: list[tuple] = []
+    for row, iteration in enumerate(history.get_iteration_numbers()):
+        for particle in range(history.get_particle_amount()):
+            heuristic: np.ndarray = np.append(history.get_positions()[row, particle], history.get_fitness()[row, particle])
+            rows.append((int(iteration) if particle == 0 else None, particle + 1, vector_cell(heuristic),
+                vector_cell(history.get_positions()[row, particle]), vector_cell(history.get_velocities()[row, particle]),
+                vector_cell(history.get_pbests()[row, particle])))
+    return rows
+
+def sheet_rows(sheet) -> list[tuple]:
+    """Returns the rows of particles of a sheet (columns B to G)."""
+    return [row for row in sheet.iter_rows(min_col=2, max_col=7, values_only=True) if isinstance(row[1], int)]
+
+def assert_same_snapshots(actual: list[dict], expected: list[dict]) -> None:
+    """Fails unless both runs have the same snapshots, bit for bit."""
+    assert len(actual) == len(expected), f"{len(actual)} snapshots instead of {len(expected)}"
+    for actual_snapshot, expected_snapshot in zip(actual, expected):
+        for key, value in expected_snapshot.items():
+            np.testing.assert_array_equal(actual_snapshot[key], value, err_msg=f"{key} of iteration {expected_snapshot['iteration']}")
+
+class SessionDirectoryTest(unittest.TestCase):
+    """Runs every test in a new temporary directory with a database folder."""
+
+    def setUp(self) -> None:
+        self.__previous_directory: str = os.getcwd()
+        self.__directory = tempfile.TemporaryDirectory()
+        self.__sessions: list[Data] = []
+        os.chdir(self.__directory.name)
+        os.mkdir("database")
+
+    def tearDown(self) -> None:
+        # * Closed before leaving the directory, their files are relative to it
+        for data in self.__sessions:
+            data.close()
+        os.chdir(self.__previous_directory)
+        self.__directory.cleanup()
+
+    def new_session(self, name: str = "test", **parameters) -> Data:
+        """Returns a Data object that is closed when the test ends."""
+        data: Data = Data(name, **parameters)
+        self.__sessions.append(data)
+        return data
+
+class HeuristicProtocolTest(unittest.TestCase):
+    """Batch and legacy heuristic functions must give the same values."""
+
+    def test_default_heuristic_takes_a_vector_or_an_array(self) -> None:
+        self.assertEqual(default_heuristic(Position(coordinates=np.array([0.0, -1.0]))), 3.0)
+        positions: np.ndarray = np.array([[0.0, -1.0], [1.5, 0.5], [-2.0, 1.0]])
+        expected: list[float] = [default_heuristic(Position(coordinates=row)) for row in positions]
+        np.testing.assert_array_equal(default_heuristic(positions), expected)
+
+    def test_legacy_heuristic_is_evaluated_row_by_row(self) -> None:
+        legacy: LegacySphere = LegacySphere()
+        positions: np.ndarray = np.arange(12.0).reshape(4, 3)
+        np.testing.assert_array_equal(evaluate_batch(legacy, positions), np.sum(np.square(positions), axis=1))
+        self.assertEqual(legacy.calls, 4)
+        # * A whole run gives the same values as the batch version of the function
+        legacy = LegacySphere()
+        expected: list[dict] = run_snapshots(Optimization(0, None, particle_amount=6, iterations=5, seed=9, heuristic=CountingHeuristic()))
+        actual: list[dict] = run_snapshots(Optimization(0, None, particle_amount=6, iterations=5, seed=9, heuristic=legacy))
+        assert_same_snapshots(actual, expected)
+        self.assertEqual(legacy.calls, 6 * 6)
+
+class ParticleTest(unittest.TestCase):
+    """A Particle is a view into a row of the arrays of its swarm, and its
+    setters must keep the bests of the swarm consistent."""
+
+    def setUp(self) -> None:
+        self.heuristic: CountingHeuristic = CountingHeuristic()
+        self.swarm: ParticleSwarm = ParticleSwarm(dimensions=3, particle_amount=5, heuristic=self.heuristic, seed=8)
+        self.swarm._initialize_particles_randomly()
+
+    def assert_consistent_bests(self) -> None:
+        swarm: ParticleSwarm = self.swarm
+        np.testing.assert_allclose(swarm.get_pbest_fitness(), np.sum(np.square(swarm.get_pbests()), axis=1))
+        self.assertEqual(swarm.get_gbest_index(), int(np.argmin(swarm.get_pbest_fitness())))
+        np.testing.assert_array_equal(swarm.get_gbest().get_coordinates(), swarm.get_pbests()[swarm.get_gbest_index()])
+        self.assertEqual(swarm.get_gbest_fitness(), swarm.get_pbest_fitness().min())
+        self.assertEqual(swarm.get_evaluation_count(), self.heuristic.evaluations)
+
+    def test_getters_are_views(self) -> None:
+        particle = self.swarm.get_particles()[2]
+        particle.get_position().set_coordinates(np.array([1.0, 2.0]))
+        particle.get_velocity().get_coordinates()[0] = 3.0
+        np.testing.assert_array_equal(self.swarm.get_positions()[2], [1.0, 2.0])
+        self.assertEqual(self.swarm.get_velocities()[2, 0], 3.0)
+        np.testing.assert_array_equal(particle.get_heuristic().get_coordinates(),
+            np.append(self.swarm.get_positions()[2], self.swarm.get_fitness()[2]))
+
+    def test_setters_keep_the_bests_consistent(self) -> None:
+        worst: int = int(np.argmax(self.swarm.get_pbest_fitness()))
+        particle = self.swarm.get_particles()[worst]
+        # * A better pbest with its value, one without it (evaluated) and a worse one for the gbest
+        particle.set_pbest(Position(coordinates=np.array([0.1, 0.0])), 0.01)
+        self.assert_consistent_bests()
+        self.assertEqual(self.swarm.get_gbest_index(), worst)
+        particle.set_pbest(Position(coordinates=np.array([9.0, 9.0])))
+        self.assert_consistent_bests()
+        self.assertNotEqual(self.swarm.get_gbest_index(), worst)
+        # * Like an evaluation of the current position, but not counted as one
+        position: np.ndarray = np.array([0.0, 0.05])
+        particle.set_position(Position(coordinates=position))
+        heuristic = particle.get_heuristic()
+        heuristic.set_coordinates(np.append(position, np.sum(np.square(position))))
+        particle.set_heuristic(heuristic)
+        self.assert_consistent_bests()
+        self.assertEqual(self.swarm.get_gbest_index(), worst)
+
+    def test_particle_methods_delegate_to_the_swarm(self) -> None:
+        particle = self.swarm.get_particles()[1]
+        others: np.ndarray = np.delete(self.swarm.get_positions(), 1, axis=0)
+        particle.initialize_randomly()
+        np.testing.assert_array_equal(np.delete(self.swarm.get_positions(), 1, axis=0), others)
+        self.assertTrue(self.swarm.get_domain().contains(self.swarm.get_positions()[1:2]).all())
+        np.testing.assert_array_equal(self.swarm.get_pbests()[1], self.swarm.get_positions()[1])
+        self.assert_consistent_bests()
+        velocities: np.ndarray = self.swarm.get_velocities().copy()
+        particle._update_velocity(self.swarm.get_gbest())
+        np.testing.assert_array_equal(np.delete(self.swarm.get_velocities(), 1, axis=0), np.delete(velocities, 1, axis=0))
+        self.assertFalse(np.array_equal(self.swarm.get_velocities()[1], velocities[1]))
+        # * A current position better than every pbest becomes the pbest and the gbest
+        self.swarm.get_positions()[1] = 0.0
+        self.swarm.get_fitness()[1] = 0.0
+        particle._update_pbest()
+        self.assertEqual(self.swarm.get_gbest_index(), 1)
+        self.assertEqual(self.swarm.get_gbest_fitness(), 0.0)
+
+class EvaluatorParityTest(unittest.TestCase):
+    """The pool evaluators must give the same runs as the serial one."""
+
+    def assert_same_run(self, evaluator: Evaluator) -> None:
+        parameters: dict = {"particle_amount": 13, "dimensions": 4, "iterations": 15, "seed": 7}
+        expected: list[dict] = run_snapshots(Optimization(0, None, **parameters))
+        with evaluator:
+            actual: list[dict] = run_snapshots(Optimization(0, None, evaluator=evaluator, **parameters))
+        assert_same_snapshots(actual, expected)
+
+    def test_process_pool_matches_serial(self) -> None:
+        # * Chunks smaller than the swarm, so the positions do go to the workers
+        self.assert_same_run(ProcessPoolEvaluator(workers=2, chunk_size=4))
+
+    def test_thread_pool_matches_serial(self) -> None:
+        self.assert_same_run(ThreadPoolEvaluator(workers=3, chunk_size=2))
+
+class AsynchronousTest(unittest.TestCase):
+    """The asynchronous mode must spend the same budget as the synchronous
+    one, keep the bests consistent and, with a single particle, be the
+    same algorithm."""
+
+    PARAMETERS: dict = {"particle_amount": 6, "iterations": 10, "seed": 9, "heuristic": "sphere", "verbose": False}
+
+    def test_single_particle_runs_are_synchronous(self) -> None:
+        parameters: dict = {**self.PARAMETERS, "particle_amount": 1}
+        asynchronous: list[dict] = run_snapshots(Optimization(0, None, asynchronous=True, **parameters))
+        expected: list[dict] = run_snapshots(Optimization(0, None, **parameters))
+        for key in ("gbest", "gbest_fitness", "evaluation_count"):
+            np.testing.assert_array_equal([snapshot[key] for snapshot in asynchronous], [snapshot[key] for snapshot in expected], err_msg=key)
+        # * After an iteration the finished particle is already moved and submitted again, unless the budget is spent
+        np.testing.assert_array_equal([snapshot["positions"] for snapshot in asynchronous],
+            [snapshot["positions"] for snapshot in expected[:1] + expected[2:] + expected[-1:]])
+
+    def test_budget_and_bests(self) -> None:
+        sphere = get_benchmark("sphere")
+        for evaluator in (Evaluator(), ThreadPoolEvaluator(workers=3)):
+            with self.subTest(evaluator=type(evaluator).__name__):
+                optimization: Optimization = Optimization(0, None, asynchronous=True, evaluator=evaluator, **self.PARAMETERS)
+                snapshots = optimization.iterate(include_arrays=True)
+                counts: list[int] = []
+                for snapshot in snapshots:
+                    counts.append(snapshot.get_evaluation_count())
+                    np.testing.assert_allclose(snapshot.get_pbest_fitness(), sphere(snapshot.get_pbests()))
+                    self.assertEqual(snapshot.get_gbest_fitness(), snapshot.get_pbest_fitness().min())
+                evaluator.close()
+                # * An iteration is as many finished evaluations as particles
+                self.assertEqual(counts, [6 * (iteration + 1) for iteration in range(11)])
+                self.assertEqual(optimization.get_iterations_run(), 10)
+
+    def test_serial_runs_are_reproducible(self) -> None:
+        assert_same_snapshots(run_snapshots(Optimization(0, None, asynchronous=True, **self.PARAMETERS)),
+            run_snapshots(Optimization(0, None, asynchronous=True, **self.PARAMETERS)))
+
+    def test_checkpoints_are_refused(self) -> None:
+        optimization: Optimization = Optimization(0, None, asynchronous=True, **self.PARAMETERS)
+        with self.assertRaises(ValueError):
+            optimization.save_checkpoint(os.path.join(tempfile.gettempdir(), "asynchronous.checkpoint"))
+
+class SeedTest(unittest.TestCase):
+    """Runs with the same seed must be identical, whatever draws the random numbers."""
+
+    def test_same_seed_same_run(self) -> None:
+        for parameters in ({}, {"topology": RandomTopology(3)}, {"random_coefficients": "dimension"}, {"asynchronous": True}):
+            with self.subTest(parameters=parameters):
+                runs: list[list[dict]] = [run_snapshots(Optimization(0, None, particle_amount=9, iterations=12,
+                    seed=np.random.SeedSequence(11), **{key: copy.deepcopy(value) for key, value in parameters.items()})) for _ in range(2)]
+                assert_same_snapshots(runs[1], runs[0])
+
+    def test_other_seed_other_run(self) -> None:
+        first: list[dict] = run_snapshots(Optimization(0, None, iterations=5, seed=1))
+        second: list[dict] = run_snapshots(Optimization(0, None, iterations=5, seed=2))
+        self.assertFalse(np.array_equal(first[0]["positions"], second[0]["positions"]))
+
+    def test_worker_streams_do_not_depend_on_the_pids(self) -> None:
+        values: list[np.ndarray] = []
+        for _ in range(2):
+            # * A chunk per particle, so the values are drawn in the worker and not in this process
+            with ProcessPoolEvaluator(workers=1, chunk_size=1) as evaluator:
+                evaluator._seed(np.random.SeedSequence(5))
+                values.append(evaluator.evaluate(noisy_heuristic, np.zeros((4, 2))))
+        np.testing.assert_array_equal(values[1], values[0])
+
+class BenchmarkTest(unittest.TestCase):
+    """The functions of the registry must reach their known optimum, and
+    Optimization must search them in the right domain."""
+
+    def test_known_optima(self) -> None:
+        for name in get_benchmark_names():
+            benchmark = get_benchmark(name)
+            for dimensions in (2, 10):
+                optimum: np.ndarray = benchmark.get_optimum_position(dimensions) if benchmark.supports(dimensions) else None
+                if optimum is None or benchmark.get_optimum_value(dimensions) is None:
+                    continue
+                with self.subTest(name=name, dimensions=dimensions):
+                    # * Evaluated next to points around it, so the rows are evaluated independently
+                    positions: np.ndarray = np.vstack((optimum, optimum + 0.1, optimum - 0.1))
+                    values: np.ndarray = benchmark(positions)
+                    self.assertAlmostEqual(values[0], benchmark.get_optimum_value(dimensions), places=6)
+                    self.assertTrue(np.all(values[1:] > values[0]))
+
+    def test_domains(self) -> None:
+        # * Without a heuristic, the one of the heuristic method in the default domain of the swarm
+        default: Optimization = Optimization(0, None)
+        np.testing.assert_array_equal(default.get_swarm().get_domain().get_lower(), [-10, -10])
+        self.assertEqual(default.get_parameters()["heuristic"], "rastrigin")
+        named: Optimization = Optimization(0, None, heuristic="rastrigin")
+        np.testing.assert_array_equal(named.get_swarm().get_domain().get_upper(), [5.12, 5.12])
+        given: Optimization = Optimization(0, None, heuristic="rastrigin", domain=Domain(-1, 2))
+        np.testing.assert_array_equal(given.get_swarm().get_domain().get_upper(), [2, 2])
+        with self.assertRaises(ValueError):
+            Optimization(0, None, dimensions=4, heuristic="booth")
+
+    def test_heuristic_method(self) -> None:
+        optimization: Optimization = Optimization(0, None)
+        positions: np.ndarray = np.array([[1.0, 3.0], [0.5, -2.0]])
+        for selection, name in (("1", "sphere"), ("2", "rastrigin"), ("3", "goldstein_price"), ("4", "booth"), ("5", "sphere")):
+            with self.subTest(selection=selection):
+                expected: np.ndarray = get_benchmark(name)(positions)
+                np.testing.assert_array_equal(optimization.heuristic(positions, selection), expected)
+                self.assertEqual(optimization.heuristic(Position(coordinates=positions[0]), selection), expected[0])
+
+class StoppingTest(SessionDirectoryTest):
+    """A run must end at the first iteration a stopping criterion is met,
+    without changing the iterations before it, and report which one."""
+
+    PARAMETERS: dict = {"particle_amount": 8, "iterations": 40, "seed": 6, "heuristic": "sphere", "verbose": False}
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.expected: list[dict] = run_snapshots(Optimization(0, None, **self.PARAMETERS))
+
+    def run_until(self, *criteria) -> tuple[Optimization, list[dict]]:
+        optimization: Optimization = Optimization(0, None, stopping_criteria=list(criteria), **self.PARAMETERS)
+        return optimization, run_snapshots(optimization)
+
+    def test_target_fitness(self) -> None:
+        target: float = 1e-3
+        stop: int = next(snapshot["iteration"] for snapshot in self.expected if snapshot["gbest_fitness"] <= target)
+        self.assertLess(stop, 40)
+        criterion: TargetFitness = TargetFitness(target)
+        optimization, snapshots = self.run_until(criterion)
+        assert_same_snapshots(snapshots, self.expected[:stop + 1])
+        self.assertEqual(optimization.get_iterations_run(), stop)
+        self.assertEqual(optimization.get_stopping_reason(), criterion.get_reason())
+
+    def test_improvement_stagnation(self) -> None:
+        # * The iteration the gbest has not improved by more than the tolerance in patience iterations
+        tolerance, patience = 1e-2, 3
+        best, stagnant = np.inf, 0
+        for snapshot in self.expected:
+            if snapshot["gbest_fitness"] < best - tolerance:
+                best, stagnant = snapshot["gbest_fitness"], 0
+            else:
+                stagnant += 1
+            if stagnant >= patience:
+                break
+        criterion: ImprovementStagnation = ImprovementStagnation(tolerance, patience)
+        optimization, snapshots = self.run_until(criterion)
+        self.assertLess(snapshot["iteration"], 40)
+        self.assertEqual(optimization.get_iterations_run(), snapshot["iteration"])
+        assert_same_snapshots(snapshots, self.expected[:snapshot["iteration"] + 1])
+        self.assertEqual(optimization.get_stopping_reason(), criterion.get_reason())
+
+    def test_first_met_criterion_gives_the_reason(self) -> None:
+        # * Both are met by the initial swarm, the first one in the list is reported
+        diameter: SwarmDiameter = SwarmDiameter(np.inf)
+        velocity: VelocityStagnation = VelocityStagnation(np.inf)
+        for criteria in ((diameter, velocity), (velocity, diameter)):
+            with self.subTest(first=type(criteria[0]).__name__):
+                optimization, snapshots = self.run_until(*criteria)
+                self.assertEqual(len(snapshots), 1)
+                self.assertEqual(optimization.get_iterations_run(), 0)
+                self.assertEqual(optimization.get_stopping_reason(), criteria[0].get_reason())
+        optimization, _ = self.run_until(SwarmDiameter(0.0), TargetFitness(-np.inf))
+        self.assertEqual(optimization.get_iterations_run(), 40)
+        self.assertEqual(optimization.get_stopping_reason(), MAX_ITERATIONS_REASON)
+
+    def test_reason_is_written_to_the_sheet(self) -> None:
+        criterion: TargetFitness = TargetFitness(1e-3)
+        for engine in ENGINES:
+            with self.subTest(engine=engine):
+                data: Data = self.new_session(engine, engine=engine)
+                Optimization(0, data, stopping_criteria=[criterion], **self.PARAMETERS).optimize()
+                data.close()
+                self.assertEqual(data.get_stopping_reasons(), [criterion.get_reason()])
+                sheet = px.load_workbook(f"database/optimization_results/{engine}.xlsx")["Optimization 1"]
+                self.assertIn(f"Stopping reason: {criterion.get_reason()}", [cell.value for cell in sheet[2]])
+
+class SnapshotTest(unittest.TestCase):
+    """iterate must yield a snapshot of every iteration, with read-only views
+    of the live arrays only when they are asked for, and record nothing."""
+
+    PARAMETERS: dict = {"particle_amount": 6, "iterations": 8, "seed": 7, "verbose": False}
+
+    def test_snapshots_without_arrays(self) -> None:
+        optimization: Optimization = Optimization(0, None, **self.PARAMETERS)
+        snapshots: list = list(optimization.iterate())
+        self.assertEqual([snapshot.get_iteration() for snapshot in snapshots], list(range(9)))
+        for snapshot in snapshots:
+            self.assertIsNone(snapshot.get_positions())
+            self.assertIsNone(snapshot.get_pbest_fitness())
+        # * The gbest is a copy, kept as it was, and it never gets worse
+        self.assertFalse(np.shares_memory(snapshots[0].get_gbest(), optimization.get_swarm().get_gbest().get_coordinates()))
+        fitness: np.ndarray = np.array([snapshot.get_gbest_fitness() for snapshot in snapshots])
+        self.assertTrue(np.all(np.diff(fitness) <= 0))
+        self.assertEqual([snapshot.get_evaluation_count() for snapshot in snapshots], [6 * (iteration + 1) for iteration in range(9)])
+        self.assertIsNone(optimization.get_history())
+        # * The same run with the arrays
+        expected: list[dict] = run_snapshots(Optimization(0, None, **self.PARAMETERS))
+        np.testing.assert_array_equal(fitness, [snapshot["gbest_fitness"] for snapshot in expected])
+
+    def test_arrays_are_read_only_views(self) -> None:
+        optimization: Optimization = Optimization(0, None, **self.PARAMETERS)
+        swarm: ParticleSwarm = optimization.get_swarm()
+        snapshots = optimization.iterate(include_arrays=True)
+        snapshot = next(snapshots)
+        first: np.ndarray = snapshot.get_positions().copy()
+        for name in ("positions", "velocities", "pbests", "fitness", "pbest_fitness"):
+            with self.subTest(array=name):
+                array: np.ndarray = getattr(snapshot, f"get_{name}")()
+                self.assertTrue(np.shares_memory(array, getattr(swarm, f"get_{name}")()))
+                with self.assertRaises(ValueError):
+                    array[0] = 0
+        self.assertTrue(swarm.get_positions().flags.writeable)
+        # * The views show the next iteration once the generator is resumed
+        next(snapshots)
+        self.assertFalse(np.array_equal(snapshot.get_positions(), first))
+        np.testing.assert_array_equal(snapshot.get_positions(), swarm.get_positions())
+        snapshots.close()
+
+    def test_closing_ends_the_run(self) -> None:
+        optimization: Optimization = Optimization(0, None, **self.PARAMETERS)
+        snapshots = optimization.iterate()
+        for snapshot in snapshots:
+            if snapshot.get_iteration() == 3:
+                break
+        snapshots.close()
+        self.assertEqual(list(snapshots), [])
+        # * The next call starts a new run
+        self.assertEqual(next(optimization.iterate()).get_iteration(), 0)
+
+class TopologyTest(unittest.TestCase):
+    """The topologies must precompute the right neighbors, and the lbest of
+    every particle must be its best neighbor."""
+
+    def test_neighbors(self) -> None:
+        ring: RingTopology = RingTopology(k=1)
+        ring._build(5)
+        np.testing.assert_array_equal(ring.get_neighbors(), [[4, 0, 1], [0, 1, 2], [1, 2, 3], [2, 3, 4], [3, 4, 0]])
+        # * 6 particles in 2 columns: itself, left, right, above and below, wrapping around the swarm
+        grid: VonNeumannTopology = VonNeumannTopology()
+        grid._build(6)
+        np.testing.assert_array_equal(grid.get_neighbors()[0], [0, 5, 1, 4, 2])
+        np.testing.assert_array_equal(grid.get_neighbors()[3], [3, 2, 4, 1, 5])
+        # * Every particle is its own neighbor, and shorter rows are padded with it
+        adjacency: AdjacencyTopology = AdjacencyTopology([[1, 2], [0], [2]])
+        adjacency._build(3)
+        np.testing.assert_array_equal(adjacency.get_neighbors(), [[0, 1, 2], [1, 0, 1], [2, 2, 2]])
+        matrix: AdjacencyTopology = AdjacencyTopology(np.array([[False, True, True], [True, False, False], [False, False, False]]))
+        matrix._build(3)
+        np.testing.assert_array_equal(matrix.get_neighbors(), adjacency.get_neighbors())
+        with self.assertRaises(ValueError):
+            adjacency._build(4)
+        with self.assertRaises(ValueError):
+            AdjacencyTopology([[3], [0], [1]])._build(3)
+        with self.assertRaises(ValueError):
+            RingTopology(k=0)
+
+    def test_best_neighbors(self) -> None:
+        pbest_fitness: np.ndarray = np.random.default_rng(0).random(12)
+        for topology in (RingTopology(k=2), VonNeumannTopology(), RandomTopology(k=3, seed=0), Topology()):
+            with self.subTest(topology=type(topology).__name__):
+                topology._build(12, np.random.default_rng(1))
+                neighbors: np.ndarray = topology.get_neighbors() if not topology.is_global() else np.tile(np.arange(12), (12, 1))
+                expected: np.ndarray = np.array([row[np.argmin(pbest_fitness[row])] for row in neighbors])
+                np.testing.assert_array_equal(topology.best_neighbors(pbest_fitness), expected)
+                np.testing.assert_array_equal(topology.best_neighbors(pbest_fitness, slice(3, 7)), expected[3:7])
+
+    def test_random_topology_rewires_in_place(self) -> None:
+        topology: RandomTopology = RandomTopology(k=2, rewire_interval=3)
+        topology._build(8, np.random.default_rng(2))
+        neighbors: np.ndarray = topology.get_neighbors()
+        first: np.ndarray = neighbors.copy()
+        for _ in range(2):
+            topology._next_iteration()
+        np.testing.assert_array_equal(neighbors, first)
+        topology._next_iteration()
+        self.assertIs(topology.get_neighbors(), neighbors)
+        self.assertFalse(np.array_equal(neighbors, first))
+        np.testing.assert_array_equal(neighbors[:, 0], np.arange(8))
+
+    def test_fully_connected_topologies_follow_the_gbest(self) -> None:
+        # * When every particle sees every other one, the lbest is the gbest
+        parameters: dict = {"particle_amount": 5, "iterations": 15, "seed": 3, "verbose": False}
+        expected: list[dict] = run_snapshots(Optimization(0, None, **parameters))
+        for topology in (RingTopology(k=2), AdjacencyTopology(np.ones((5, 5), dtype=bool))):
+            with self.subTest(topology=type(topology).__name__):
+                assert_same_snapshots(run_snapshots(Optimization(0, None, topology=topology, **parameters)), expected)
+        # * A sparse ring does not
+        ring: list[dict] = run_snapshots(Optimization(0, None, topology=RingTopology(k=1), **parameters))
+        self.assertFalse(all(np.array_equal(actual["positions"], snapshot["positions"]) for actual, snapshot in zip(ring, expected)))
+
+class IslandTest(unittest.TestCase):
+    """Seeded island runs must be reproducible, and the migrants must
+    replace the worst particles of the islands they reach."""
+
+    PARAMETERS: dict = {"island_amount": 2, "particle_amount": 5, "iterations": 6, "migration_size": 2, "seed": 3}
+
+    def run_islands(self, **parameters) -> Optimization:
+        return IslandModel(0, **{**self.PARAMETERS, **parameters}).run()
+
+    def assert_same_history(self, actual: History, expected: History) -> None:
+        for name in ("positions", "velocities", "pbests", "fitness", "gbest_indexes"):
+            np.testing.assert_array_equal(getattr(actual, f"get_{name}")(), getattr(expected, f"get_{name}")(), err_msg=name)
+
+    def test_seeded_runs_are_reproducible(self) -> None:
+        first: Optimization = self.run_islands(migration_interval=3)
+        self.assert_same_history(self.run_islands(migration_interval=3).get_history(), first.get_history())
+        self.assertEqual(first.get_stopping_reason(), MAX_ITERATIONS_REASON)
+        self.assertEqual(first.get_iterations_run(), 6)
+        self.assertEqual(first.get_history().get_positions().shape, (7, 10, 2))
+        # * A pool evaluator in an island gives the same run
+        pooled: Optimization = self.run_islands(migration_interval=3,
+            islands=[{"evaluator": ProcessPoolEvaluator(workers=2, chunk_size=2)}, {}])
+        self.assert_same_history(pooled.get_history(), first.get_history())
+
+    def test_migrants_replace_the_worst_particles(self) -> None:
+        migrated: History = self.run_islands(migration_interval=3).get_history()
+        # * Without migrations (the interval is longer than the run) the islands are independent
+        isolated: History = self.run_islands(migration_interval=10).get_history()
+        np.testing.assert_array_equal(migrated.get_pbests()[:3], isolated.get_pbests()[:3])
+        # * Before the migration after iteration 3, both runs are in the state of the isolated one
+        rastrigin = get_benchmark("rastrigin")
+        pbests: np.ndarray = isolated.get_pbests()[3]
+        fitness: np.ndarray = rastrigin(pbests)
+        for source, target in ((0, 1), (1, 0)):
+            with self.subTest(source=source, target=target):
+                sources: slice = slice(5 * source, 5 * source + 5)
+                targets: slice = slice(5 * target, 5 * target + 5)
+                migrants: np.ndarray = pbests[sources][np.argsort(fitness[sources], kind="stable")[:2]]
+                accepted: np.ndarray = rastrigin(migrants) < np.sort(fitness[targets])[::-1][:2]
+                self.assertTrue(accepted.any())
+                received: np.ndarray = migrated.get_pbests()[3, targets]
+                for migrant in migrants[accepted]:
+                    self.assertTrue(np.any(np.all(received == migrant, axis=1)), f"{migrant} did not reach island {target}")
+
+class BoundaryTest(unittest.TestCase):
+    """Every boundary mode must keep the particles inside the domain."""
+
+    def test_particles_stay_in_bounds(self) -> None:
+        lower: np.ndarray = np.array([-1.0, 0.0, 5.0])
+        upper: np.ndarray = np.array([1.0, 100.0, 5.5])
+        for boundary in BOUNDARY_MODES:
+            with self.subTest(boundary=boundary):
+                # * A large velocity limit, so the particles often try to leave
+                optimization: Optimization = Optimization(0, None, particle_amount=15, dimensions=4, iterations=30, seed=3,
+                    heuristic="sphere", domain=Domain(lower, upper, boundary, velocity_fraction=2.0))
+                for snapshot in run_snapshots(optimization):
+                    self.assertTrue(np.all((snapshot["positions"] >= lower) & (snapshot["positions"] <= upper)),
+                        f"iteration {snapshot['iteration']}")
+
+    def test_reflect_flips_the_velocity_on_odd_bounces(self) -> None:
+        domain: Domain = Domain(0, 1, "reflect")
+        domain._build(1)
+        # * One, two, one and two bounces, and one coordinate that stays inside
+        positions: np.ndarray = np.array([[1.2], [2.2], [-0.3], [-1.3], [0.5]])
+        velocities: np.ndarray = np.ones_like(positions)
+        domain.apply(positions, velocities, np.random.default_rng(0))
+        np.testing.assert_allclose(positions.ravel(), [0.8, 0.2, 0.3, 0.7, 0.5])
+        np.testing.assert_array_equal(velocities.ravel(), [-1, 1, -1, 1, 1])
+
+class HistoryTest(unittest.TestCase):
+    """The preallocated History must give the DataFrame the per-iteration
+    pd.concat of optimize used to build."""
+
+    @staticmethod
+    def concatenated_dataframe(snapshots: list[dict]) -> pd.DataFrame:
+        """Returns the DataFrame of a run built like before History existed."""
+        dataframe: pd.DataFrame = pd.DataFrame(columns=["Heuristic", "Position", "Velocity", "Pbest"])
+        spacer: pd.DataFrame = pd.DataFrame(([np.nan] * 4), index=["Heuristic", "Position", "Velocity", "Pbest"]).T
+        for snapshot in snapshots:
+            if snapshot["iteration"] > 0:
+                dataframe = pd.concat([dataframe, spacer])
+            dataframe = pd.concat([dataframe, pd.DataFrame({
+                "Heuristic": list(np.round(np.column_stack((snapshot["positions"], snapshot["fitness"])), 2)),
+                "Position": list(np.round(snapshot["positions"], 2)),
+                "Velocity": list(np.round(snapshot["velocities"], 2)),
+                "Pbest": list(np.round(snapshot["pbests"], 2))})])
+        return dataframe
+
+    def assert_same_dataframe(self, actual: pd.DataFrame, expected: pd.DataFrame) -> None:
+        self.assertEqual(list(actual.columns), list(expected.columns))
+        self.assertEqual(list(actual.index), list(expected.index))
+        for column in expected.columns:
+            for actual_cell, expected_cell in zip(actual[column], expected[column]):
+                if isinstance(expected_cell, np.ndarray):
+                    np.testing.assert_array_equal(actual_cell, expected_cell)
+                else:
+                    self.assertTrue(np.isnan(actual_cell) and np.isnan(expected_cell))
+
+    def test_dataframe_matches_the_concatenation(self) -> None:
+        history: History = History(5, 4, 2)
+        snapshots: list[dict] = []
+        for snapshot in Optimization(0, None, particle_amount=4, iterations=5, seed=8, verbose=False).iterate(include_arrays=True):
+            history.record(snapshot.get_iteration(), snapshot.get_positions(), snapshot.get_velocities(), snapshot.get_pbests(),
+                snapshot.get_fitness(), snapshot.get_gbest_index())
+            snapshots.append({"iteration": snapshot.get_iteration(), "positions": snapshot.get_positions().copy(),
+                "velocities": snapshot.get_velocities().copy(), "pbests": snapshot.get_pbests().copy(), "fitness": snapshot.get_fitness().copy()})
+        dataframe: pd.DataFrame = history.to_dataframe()
+        self.assert_same_dataframe(dataframe, self.concatenated_dataframe(snapshots))
+        self.assertIs(history.to_dataframe(), dataframe)
+        # * A range of iterations is laid out as if it were the whole run
+        self.assert_same_dataframe(history.to_dataframe(2, 4),
+            self.concatenated_dataframe([{**snapshot, "iteration": snapshot["iteration"] - 2} for snapshot in snapshots[2:4]]))
+
+    def test_rows_are_copies(self) -> None:
+        history: History = History(3, 2, 2)
+        positions: np.ndarray = np.ones((2, 2))
+        history.record(0, positions, positions, positions, np.zeros(2), 1)
+        positions[...] = 5
+        np.testing.assert_array_equal(history.get_positions(), np.ones((1, 2, 2)))
+        self.assertEqual(history.get_iterations_recorded(), 1)
+        self.assertEqual(history.get_gbest_indexes().tolist(), [1])
+        dataframe: pd.DataFrame = history.to_dataframe()
+        history.record(1, positions, positions, positions, np.zeros(2), 0)
+        # * Recording a row invalidates the DataFrame built before it
+        self.assertIsNot(history.to_dataframe(), dataframe)
+        self.assertEqual(len(history.to_dataframe()), 5)
+
+class MemoryMappedHistoryTest(SessionDirectoryTest):
+    """A memory-mapped history must hold the same run as an in-memory one
+    and be readable again with History.open."""
+
+    def test_open_matches_the_run(self) -> None:
+        data: Data = self.new_session()
+        expected: Optimization = Optimization(0, data, particle_amount=7, iterations=9, seed=4)
+        expected.optimize()
+        mapped: Optimization = Optimization(1, data, particle_amount=7, iterations=9, seed=4, memory_mapped_history=True)
+        mapped.optimize()
+        # * Numbered like its sheet, the second optimization of the session
+        directory: str = data.get_optimization_path(2)
+        self.assertEqual(mapped.get_history().get_directory(), directory)
+        history: History = History.open(directory)
+        self.assertEqual(history.get_iterations_recorded(), 10)
+        self.assertEqual(history.get_metadata()["parameters"]["index"], 1)
+        for name in ("positions", "velocities", "pbests", "fitness", "gbest_indexes", "iteration_numbers"):
+            actual: np.ndarray = getattr(history, f"get_{name}")()
+            self.assertIsInstance(actual, np.memmap)
+            np.testing.assert_array_equal(actual, getattr(expected.get_history(), f"get_{name}")(), err_msg=name)
+        self.assertFalse(history.get_positions().flags.writeable)
+
+class ColumnarExportTest(SessionDirectoryTest):
+    """The NPZ export must read back the columns and metadata of a run."""
+
+    def test_npz_round_trip(self) -> None:
+        data: Data = self.new_session(columnar_format="npz")
+        for index, recording in enumerate((FullRecording(), GbestRecording())):
+            with self.subTest(recording=recording):
+                optimization: Optimization = Optimization(index, data, particle_amount=6, iterations=8, seed=5, recording=recording)
+                optimization.optimize()
+                path: str = data.get_columnar_paths()[-1]
+                self.assertEqual(path, data.get_optimization_path(index + 1) + ".npz")
+                columns, metadata = read_columns(path)
+                expected: dict[str, np.ndarray] = history_columns(optimization.get_history())
+                self.assertEqual(list(columns), list(expected))
+                for name, column in expected.items():
+                    np.testing.assert_array_equal(columns[name], column, err_msg=name)
+                self.assertEqual(metadata["optimization_number"], index + 1)
+                self.assertEqual(metadata["stopping_reason"], optimization.get_stopping_reason())
+                self.assertEqual(metadata["parameters"]["seed_entropy"], optimization.get_parameters()["seed_entropy"])
+
+    def test_full_history_columns(self) -> None:
+        data: Data = self.new_session(columnar_format="npz")
+        optimization: Optimization = Optimization(0, data, particle_amount=6, iterations=8, seed=5)
+        optimization.optimize()
+        columns, _ = read_columns(data.get_columnar_paths()[0])
+        history: History = optimization.get_history()
+        self.assertEqual(columns["iteration"].shape, (9 * 6,))
+        np.testing.assert_array_equal(columns["position_1"].reshape(9, 6), history.get_positions()[:, :, 1])
+        np.testing.assert_array_equal(np.flatnonzero(columns["is_gbest"]) % 6, history.get_gbest_indexes())
+
+class WorkbookTest(SessionDirectoryTest):
+    """Both engines must write the same cells, in the foreground and in the
+    background."""
+
+    def test_round_trip(self) -> None:
+        for engine in ENGINES:
+            for background in (False, True):
+                with self.subTest(engine=engine, background=background):
+                    data: Data = self.new_session(f"{engine}_{background}", engine=engine, background=background)
+                    histories: list[History] = []
+                    for index in range(2):
+                        optimization: Optimization = Optimization(index, data, particle_amount=4, iterations=3, seed=index)
+                        optimization.optimize()
+                        histories.append(optimization.get_history())
+                    data.close()
+                    workbook: px.Workbook = px.load_workbook(f"database/optimization_results/{engine}_{background}.xlsx")
+                    self.assertEqual(workbook.sheetnames, ["Optimization 1", "Optimization 2"])
+                    for sheet_name, history in zip(workbook.sheetnames, histories):
+                        self.assertEqual(sheet_rows(workbook[sheet_name]), history_rows(history))
+
+    def test_default_session_writes_every_optimization(self) -> None:
+        data: Data = self.new_session()
+        for index in range(2):
+            Optimization(index, data, iterations=2, seed=index).optimize()
+            # * Complete after every optimization, without saving or closing the session
+            workbook: px.Workbook = px.load_workbook("database/optimization_results/test.xlsx")
+            self.assertEqual(workbook.sheetnames, [f"Optimization {number}" for number in range(1, index + 2)])
+        self.assertEqual(len(data.get_particle_history()), 2)
+        self.assertEqual(data.get_particle_history()[1].shape, (3 * 10 + 2, 4))
+
+    def test_saved_session_needs_the_histories_to_append(self) -> None:
+        data: Data = self.new_session(engine="xlsxwriter", keep_histories=False)
+        optimization: Optimization = Optimization(0, data, iterations=2, seed=0)
+        optimization.optimize()
+        data.save()
+        with self.assertRaises(ValueError):
+            data.append_optimization(optimization.get_history())
+        kept: Data = self.new_session("kept", engine="xlsxwriter")
+        for index in range(2):
+            Optimization(index, kept, iterations=2, seed=index).optimize()
+            kept.save()
+        workbook: px.Workbook = px.load_workbook("database/optimization_results/kept.xlsx")
+        self.assertEqual(workbook.sheetnames, ["Optimization 1", "Optimization 2"])
+
+class RecordingTest(SessionDirectoryTest):
+    """The recording policies must keep what they describe, and Data must
+    write it with both engines."""
+
+    def test_summary_of_a_surrogate_run(self) -> None:
+        for engine in ENGINES:
+            with self.subTest(engine=engine):
+                data: Data = self.new_session(engine, engine=engine)
+                optimization: Optimization = Optimization(0, data, particle_amount=20, dimensions=2, iterations=30, seed=1,
+                    evaluator=SurrogateEvaluator(evaluation_fraction=0.3), recording=SummaryRecording())
+                optimization.optimize()
+                data.close()
+                columns: dict[str, np.ndarray] = optimization.get_history().get_columns()
+                # * The positions the surrogate skipped are left out of the statistics
+                for name in ("best_fitness", "mean_fitness", "std_fitness", "worst_fitness"):
+                    self.assertTrue(np.all(np.isfinite(columns[name])), name)
+                workbook: px.Workbook = px.load_workbook(f"database/optimization_results/{engine}.xlsx")
+                sheet = workbook["Optimization 1"]
+                self.assertAlmostEqual(sheet["C4"].value, columns["best_fitness"][0])
+                self.assertEqual(sheet.max_row, 3 + optimization.get_history().get_iterations_recorded())
+                self.assertEqual(workbook.sheetnames, ["Optimization 1"])
+
+    def test_policies_keep_what_they_describe(self) -> None:
+        parameters: dict = {"particle_amount": 5, "iterations": 7, "seed": 2, "verbose": False}
+        snapshots: list[dict] = run_snapshots(Optimization(0, None, **parameters))
+        for engine in ENGINES:
+            data: Data = self.new_session(engine, engine=engine)
+            policies: dict = {"decimated": DecimatedRecording(every=3), "final": FinalStateRecording(),
+                "gbest": GbestRecording(), "summary": SummaryRecording()}
+            recordings: dict = {}
+            for index, (name, policy) in enumerate(policies.items()):
+                optimization: Optimization = Optimization(index, data, recording=policy, **parameters)
+                optimization.optimize()
+                recordings[name] = optimization.get_history()
+            data.close()
+            with self.subTest(engine=engine, recording="decimated"):
+                # * Every third iteration and the last one
+                self.assertEqual(recordings["decimated"].get_iteration_numbers().tolist(), [0, 3, 6, 7])
+                np.testing.assert_array_equal(recordings["decimated"].get_positions(),
+                    [snapshots[iteration]["positions"] for iteration in (0, 3, 6, 7)])
+            with self.subTest(engine=engine, recording="final"):
+                self.assertEqual(recordings["final"].get_iteration_numbers().tolist(), [7])
+                np.testing.assert_array_equal(recordings["final"].get_velocities()[0], snapshots[-1]["velocities"])
+            with self.subTest(engine=engine, recording="gbest"):
+                columns: dict[str, np.ndarray] = recordings["gbest"].get_columns()
+                np.testing.assert_array_equal(columns["gbest_fitness"], [snapshot["gbest_fitness"] for snapshot in snapshots])
+                np.testing.assert_array_equal(np.column_stack([columns[f"gbest_{coordinate}"] for coordinate in range(2)]),
+                    [snapshot["gbest"] for snapshot in snapshots])
+                np.testing.assert_array_equal(columns["evaluation_count"], [snapshot["evaluation_count"] for snapshot in snapshots])
+            with self.subTest(engine=engine, recording="summary"):
+                columns = recordings["summary"].get_columns()
+                np.testing.assert_array_equal(columns["best_fitness"], [snapshot["fitness"].min() for snapshot in snapshots])
+                np.testing.assert_array_equal(columns["worst_fitness"], [snapshot["fitness"].max() for snapshot in snapshots])
+            with self.subTest(engine=engine, recording="sheets"):
+                workbook: px.Workbook = px.load_workbook(f"database/optimization_results/{engine}.xlsx")
+                self.assertEqual(workbook.sheetnames, [f"Optimization {index}" for index in range(1, 5)])
+                # * The sheets label their rows with the iterations they were recorded at
+                self.assertEqual(sheet_rows(workbook["Optimization 1"]), history_rows(recordings["decimated"]))
+                self.assertEqual(sheet_rows(workbook["Optimization 2"]), history_rows(recordings["final"]))
+
+class ProfilerTest(SessionDirectoryTest):
+    """The profiler must time every phase of optimize, and the series must
+    have an entry for every iteration."""
+
+    def test_phases_of_a_run(self) -> None:
+        data: Data = self.new_session()
+        output: io.StringIO = io.StringIO()
+        optimization: Optimization = Optimization(0, data, particle_amount=6, iterations=5, seed=0, profile=True)
+        with contextlib.redirect_stdout(output):
+            optimization.optimize()
+        # * Verbose by default, one line per recorded iteration
+        self.assertEqual(output.getvalue().count("Global best"), 6)
+        profiler = optimization.get_profiler()
+        report: dict = profiler.get_report()
+        self.assertEqual(tuple(report), PHASES)
+        for phase in ("velocity", "position", "clipping", "evaluation", "pbest", "gbest"):
+            self.assertEqual(report[phase]["calls"], 5, phase)
+        # * Every snapshot is recorded, then the recording is finished
+        self.assertEqual(report["history"]["calls"], 7)
+        self.assertEqual(report["persistence"]["calls"], 1)
+        self.assertAlmostEqual(sum(row["fraction"] for row in report.values()), 1.0)
+        series: list[dict] = profiler.get_series()
+        self.assertEqual(len(series), 6)
+        # * The persistence is done after the last iteration, so it is only in the report
+        self.assertTrue(all(row["persistence"] == 0.0 for row in series))
+        self.assertAlmostEqual(sum(row["velocity"] for row in series), report["velocity"]["seconds"])
+
+    def test_disabled_profiler(self) -> None:
+        optimization: Optimization = Optimization(0, self.new_session(), iterations=3, seed=0, verbose=False)
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            optimization.optimize()
+        self.assertEqual(output.getvalue(), "")
+        self.assertFalse(optimization.get_profiler().is_enabled())
+        self.assertEqual(optimization.get_profiler().get_series(), [])
+        self.assertTrue(all(row["calls"] == 0 for row in optimization.get_profiler().get_report().values()))
+
+class CheckpointTest(SessionDirectoryTest):
+    """A run resumed from a checkpoint must continue bit for bit."""
+
+    PARAMETERS: dict = {"particle_amount": 8, "dimensions": 4, "iterations": 25, "seed": 6}
+
+    def new_optimization(self, data: Data = None, **parameters) -> Optimization:
+        return Optimization(0, data, **{**self.PARAMETERS, "topology": RandomTopology(3, rewire_interval=4), **parameters})
+
+    def test_iterate_resumes_exactly(self) -> None:
+        # * The criterion stops the run at iteration 10, with a count of stagnant iterations that started before the checkpoint
+        for criteria in (None, (ImprovementStagnation(tolerance=1e-3, patience=5),)):
+            with self.subTest(stopping_criteria=criteria):
+                expected_run: Optimization = self.new_optimization(stopping_criteria=copy.deepcopy(criteria))
+                expected: list[dict] = run_snapshots(expected_run)
+                interrupted: Optimization = self.new_optimization(stopping_criteria=copy.deepcopy(criteria))
+                snapshots = interrupted.iterate()
+                for snapshot in snapshots:
+                    if snapshot.get_iteration() == 7:
+                        break
+                interrupted.save_checkpoint("checkpoint.npz")
+                snapshots.close()
+                resumed: Optimization = self.new_optimization(stopping_criteria=copy.deepcopy(criteria))
+                resumed.load_checkpoint("checkpoint.npz")
+                assert_same_snapshots(run_snapshots(resumed), expected[7:])
+                self.assertEqual(resumed.get_stopping_reason(), expected_run.get_stopping_reason())
+                self.assertEqual(resumed.get_iterations_run(), expected_run.get_iterations_run())
+
+    def test_optimize_resumes_with_the_whole_history(self) -> None:
+        data: Data = self.new_session()
+        expected: Optimization = self.new_optimization(data)
+        expected.optimize()
+        interrupted: Optimization = self.new_optimization(data, recording=InterruptedRecording(13),
+            checkpoint_path="checkpoint.npz", checkpoint_interval=5)
+        with self.assertRaises(Interruption):
+            interrupted.optimize()
+        resumed: Optimization = self.new_optimization(data, checkpoint_path="checkpoint.npz")
+        # * The last checkpoint was written after iteration 10
+        resumed.load_checkpoint()
+        self.assertEqual(resumed.get_iterations_run(), 10)
+        resumed.optimize()
+        for name in ("positions", "velocities", "pbests", "fitness", "gbest_indexes", "iteration_numbers"):
+            np.testing.assert_array_equal(getattr(resumed.get_history(), f"get_{name}")(),
+                getattr(expected.get_history(), f"get_{name}")(), err_msg=name)
+
+class FitnessCacheTest(unittest.TestCase):
+    """Positions in the same cell of the tolerance grid must share a value,
+    and the least recently used values must be discarded first."""
+
+    def test_tolerance(self) -> None:
+        heuristic: CountingHeuristic = CountingHeuristic()
+        cache: FitnessCache = FitnessCache(heuristic, tolerance=0.1, max_size=10)
+        first: np.ndarray = cache(np.array([[1.0, 2.0]]))
+        # * 0.04 away rounds to the same cell, 0.06 to the next one
+        np.testing.assert_array_equal(cache(np.array([[1.04, 1.96]])), first)
+        self.assertEqual((cache.get_hits(), cache.get_misses(), heuristic.evaluations), (1, 1, 1))
+        np.testing.assert_array_equal(cache(np.array([[1.06, 2.0]])), [1.06**2 + 4])
+        self.assertEqual((cache.get_hits(), cache.get_misses(), heuristic.evaluations), (1, 2, 2))
+        # * The default tolerance only merges positions that are equal up to rounding
+        exact: FitnessCache = FitnessCache(CountingHeuristic())
+        exact(np.array([[0.1 + 0.2, 1.0]]))
+        exact(np.array([[0.3, 1.0], [0.3 + 1e-6, 1.0]]))
+        self.assertEqual((exact.get_hits(), exact.get_misses()), (1, 2))
+        with self.assertRaises(ValueError):
+            FitnessCache(heuristic, tolerance=0)
+
+    def test_least_recently_used_are_discarded(self) -> None:
+        heuristic: CountingHeuristic = CountingHeuristic()
+        cache: FitnessCache = FitnessCache(heuristic, tolerance=1e-9, max_size=2)
+        cache(np.array([[1.0], [2.0]]))
+        cache(np.array([[1.0]]))
+        # * 2 is the least recently used, so 3 replaces it
+        cache(np.array([[3.0]]))
+        self.assertEqual(cache.get_size(), 2)
+        evaluations: int = heuristic.evaluations
+        cache(np.array([[1.0], [3.0]]))
+        self.assertEqual(heuristic.evaluations, evaluations)
+        cache(np.array([[2.0]]))
+        self.assertEqual(heuristic.evaluations, evaluations + 1)
+
+class EvaluationCountTest(unittest.TestCase):
+    """The evaluation count of the swarm must be the number of positions
+    the heuristic function really evaluated."""
+
+    def test_every_position_is_evaluated_once(self) -> None:
+        heuristic: CountingHeuristic = CountingHeuristic()
+        optimization: Optimization = Optimization(0, None, particle_amount=7, iterations=12, seed=3, heuristic=heuristic, verbose=False)
+        counts: list[int] = [snapshot["evaluation_count"] for snapshot in run_snapshots(optimization)]
+        self.assertEqual(counts, [7 * (iteration + 1) for iteration in range(13)])
+        self.assertEqual(heuristic.evaluations, optimization.get_evaluation_count())
+
+    def test_bests_use_the_stored_values(self) -> None:
+        heuristic: CountingHeuristic = CountingHeuristic()
+        swarm: ParticleSwarm = ParticleSwarm(particle_amount=8, heuristic=heuristic, seed=4)
+        swarm._initialize_particles_randomly()
+        for _ in range(5):
+            swarm._update_velocities()
+            swarm._update_positions()
+            swarm._evaluate()
+            swarm._update_pbests()
+            evaluations: int = heuristic.evaluations
+            swarm.update_gbest()
+            # * The gbest is chosen and kept with the stored values, nothing is evaluated again
+            self.assertEqual(heuristic.evaluations, evaluations)
+            np.testing.assert_array_equal(swarm.get_pbest_fitness(), np.sum(np.square(swarm.get_pbests()), axis=1))
+            self.assertEqual(swarm.get_gbest_fitness(), swarm.get_pbest_fitness().min())
+            self.assertEqual(swarm.get_gbest_index(), int(np.argmin(swarm.get_pbest_fitness())))
+            np.testing.assert_array_equal(swarm.get_gbest().get_coordinates(), swarm.get_pbests()[swarm.get_gbest_index()])
+        self.assertEqual(swarm.get_evaluation_count(), heuristic.evaluations)
+        self.assertEqual(heuristic.evaluations, 8 * 6)
+
+    def test_cache_hits_are_not_evaluations(self) -> None:
+        for asynchronous in (False, True):
+            with self.subTest(asynchronous=asynchronous):
+                heuristic: CountingHeuristic = CountingHeuristic()
+                # * A coarse grid, so many positions hit the cache
+                optimization: Optimization = Optimization(0, None, particle_amount=10, iterations=20, seed=1, heuristic=heuristic,
+                    cache_size=1000, cache_tolerance=1.0, asynchronous=asynchronous)
+                run_snapshots(optimization)
+                cache = optimization.get_cache()
+                self.assertGreater(cache.get_hits(), 0)
+                self.assertEqual(optimization.get_evaluation_count(), heuristic.evaluations)
+                self.assertEqual(optimization.get_evaluation_count(), cache.get_misses())
+
+    def test_skipped_surrogate_positions_are_not_evaluations(self) -> None:
+        heuristic: CountingHeuristic = CountingHeuristic()
+        surrogate: SurrogateEvaluator = SurrogateEvaluator(evaluation_fraction=0.3)
+        optimization: Optimization = Optimization(0, None, particle_amount=12, iterations=20, seed=2, heuristic=heuristic,
+            evaluator=surrogate)
+        snapshots: list[dict] = run_snapshots(optimization)
+        self.assertGreater(surrogate.get_skipped_evaluations(), 0)
+        self.assertEqual(optimization.get_evaluation_count(), heuristic.evaluations)
+        self.assertEqual(optimization.get_evaluation_count(), surrogate.get_true_evaluations())
+        # * Once the model is fitted, only the chosen fraction of each iteration is evaluated
+        self.assertEqual(snapshots[-1]["evaluation_count"] - snapshots[-2]["evaluation_count"], 4)
+
+    def test_surrogate_refits_only_with_new_samples(self) -> None:
+        surrogate: SurrogateEvaluator = SurrogateEvaluator()
+        positions: np.ndarray = np.random.default_rng(0).uniform(-5, 5, (12, 2))
+        surrogate.evaluate(default_heuristic, positions)
+        predictions: np.ndarray = surrogate.predict(positions)
+        np.testing.assert_array_equal(surrogate.predict(positions), predictions)
+        self.assertEqual(surrogate.get_fit_count(), 1)
+        # * An RBF interpolates the samples it was fitted on
+        np.testing.assert_allclose(predictions, default_heuristic(positions), atol=1e-6)
+        # * The screening uses the model of the samples so far, the new ones refit the next prediction
+        surrogate.evaluate(default_heuristic, positions + 1)
+        self.assertEqual(surrogate.get_fit_count(), 1)
+        surrogate.predict(positions)
+        self.assertEqual(surrogate.get_fit_count(), 2)
+        # * A longer interval fits once every few iterations
+        for refit_interval in (1, 3):
+            with self.subTest(refit_interval=refit_interval):
+                surrogate = SurrogateEvaluator(refit_interval=refit_interval)
+                optimization: Optimization = Optimization(0, None, particle_amount=12, iterations=20, seed=2,
+                    heuristic=CountingHeuristic(), evaluator=surrogate)
+                run_snapshots(optimization)
+                screenings: int = surrogate.get_skipped_evaluations() // 8
+                self.assertEqual(surrogate.get_fit_count(), math.ceil(screenings / refit_interval))
+
+if __name__ == "__main__":
+    unittest.main()
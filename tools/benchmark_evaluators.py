@@ -0,0 +1,106 @@
+"""
+Benchmark of the evaluation backends of the swarm (Evaluator,
+ThreadPoolEvaluator and ProcessPoolEvaluator).
+
+Each backend evaluates swarms of increasing size with heuristic functions
+of different kinds, and the crossover point of a parallel backend is the
+smallest swarm for which it is faster than the serial one. The crossover
+of the process pool against the thread pool is reported too: the smallest
+swarm for which the process pool is faster, i.e. where its extra parallelism
+outweighs pickling the positions and the round trips to other processes.
+
+## Heuristic functions
+- numpy: a NumPy kernel per particle that releases the GIL.
+- sleep: an I/O wait per particle (time.sleep releases the GIL).
+- python: a pure-Python loop per particle that holds the GIL.
+
+Run from the root of the repository:
+
+    python tools/benchmark_evaluators.py --particles 8 32 128 512 --workers 4
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pso.evaluation.evaluator import Evaluator, ProcessPoolEvaluator, ThreadPoolEvaluator
+from pso.vector.heuristic import batch_heuristic
+
+# * The heuristic functions are module-level so they can be pickled
+
+@batch_heuristic
+def numpy_heuristic(positions: np.ndarray) -> np.ndarray:
+    values: np.ndarray = np.empty(positions.shape[0])
+    for row in range(positions.shape[0]):
+        matrix: np.ndarray = np.outer(np.resize(positions[row], 200), np.arange(200.0))
+        values[row] = np.linalg.norm(matrix @ matrix.T)
+    return values
+
+@batch_heuristic
+def sleep_heuristic(positions: np.ndarray) -> np.ndarray:
+    time.sleep(0.001 * positions.shape[0])
+    return np.sum(np.square(positions), axis=1)
+
+def python_heuristic(position) -> float:
+    total: float = 0.0
+    for step in range(5000):
+        for coordinate in position.get_coordinates():
+            total += (coordinate * step) % 7
+    return total
+
+HEURISTICS: dict = {"numpy": numpy_heuristic, "sleep": sleep_heuristic, "python": python_heuristic}
+
+def time_backend(evaluator: Evaluator, heuristic_f: callable, positions: np.ndarray, repeats: int) -> float:
+    """Returns the best time of repeats evaluations of the whole swarm (the
+    first one is a warm up that also starts the pool)."""
+    evaluator.evaluate(heuristic_f, positions)
+    best: float = np.inf
+    for _ in range(repeats):
+        start: float = time.perf_counter()
+        evaluator.evaluate(heuristic_f, positions)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--particles", type=int, nargs="+", default=[4, 16, 64, 256])
+    parser.add_argument("--dimensions", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--heuristics", nargs="+", choices=list(HEURISTICS), default=list(HEURISTICS))
+    arguments = parser.parse_args()
+
+    backends: dict = {
+        "serial": Evaluator(),
+        "thread": ThreadPoolEvaluator(workers=arguments.workers),
+        "process": ProcessPoolEvaluator(workers=arguments.workers)}
+    rng: np.random.Generator = np.random.default_rng(0)
+    try:
+        for name in arguments.heuristics:
+            print(f"\nHeuristic: {name} ({arguments.workers} workers, times in ms)")
+            print(f"{'particles':>10}" + "".join(f"{backend:>12}" for backend in backends))
+            # * The (faster, slower) pairs of backends whose crossover is reported
+            pairs: list[tuple[str, str]] = [("thread", "serial"), ("process", "serial"), ("process", "thread")]
+            crossover: dict = {pair: None for pair in pairs}
+            for particles in arguments.particles:
+                positions: np.ndarray = rng.uniform(-10, 10, size=(particles, arguments.dimensions))
+                times: dict = {backend: time_backend(evaluator, HEURISTICS[name], positions, arguments.repeats)
+                    for backend, evaluator in backends.items()}
+                print(f"{particles:>10}" + "".join(f"{1000 * times[backend]:>12.2f}" for backend in backends))
+                for faster, slower in crossover:
+                    if crossover[(faster, slower)] is None and times[faster] < times[slower]:
+                        crossover[(faster, slower)] = particles
+            for (faster, slower), particles in crossover.items():
+                found: str = f"{particles} particles" if particles is not None else "not reached"
+                print(f"Crossover {faster} vs {slower}: {found}")
+    finally:
+        for evaluator in backends.values():
+            evaluator.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+"""
+Micro-benchmarks of the hot paths of an optimization: the velocity update,
+the position update, the evaluation of the heuristic function, the gbest
+update, the recording of the history and Data.append_optimization (with
+each engine, until the workbook is written).
+
+Every benchmark runs over a grid of particle amounts, dimensions (of the
+positions, without the heuristic value) and iterations. The per-iteration
+operations are called once per iteration, the history is recorded for
+every iteration and append_optimization stores the resulting history, so
+the iterations matter for every benchmark. Each measurement is repeated
+and the best and median times are kept.
+
+The results are written as JSON and, if a baseline (a previous results
+file) is given, every measurement is compared with it. A measurement whose
+best time is more than the threshold slower than the baseline's is a
+regression, and the script exits with status 1 if there is any.
+
+Run from the root of the repository:
+
+    python tools/benchmark_hot_paths.py --output results.json
+    python tools/benchmark_hot_paths.py --baseline results.json --threshold 0.2
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pso.database.data import ENGINES, Data
+from pso.history import History
+from pso.swarm.particle_swarm import ParticleSwarm
+from pso.vector.benchmarks import get_benchmark
+
+def make_swarm(particles: int, dimensions: int) -> ParticleSwarm:
+    """Returns an initialized swarm with a fixed seed."""
+    swarm: ParticleSwarm = ParticleSwarm(0.7, 2.05, 2.05, dimensions + 1, particles, get_benchmark("sphere"), seed=0)
+    swarm._initialize_particles_randomly()
+    return swarm
+
+def record_history(swarm: ParticleSwarm, iterations: int) -> History:
+    """Records the history of the swarm the way Optimization.optimize does,
+    once for the initial state and once per iteration."""
+    history: History = History(iterations, swarm.get_particle_amount(), swarm.get_positions().shape[1])
+    for iteration_num in range(iterations + 1):
+        history.record(iteration_num, swarm.get_positions(), swarm.get_velocities(), swarm.get_pbests(),
+            swarm.get_fitness(), swarm.get_gbest_index())
+    return history
+
+def per_iteration(operation: str) -> callable:
+    """Returns a benchmark that calls a method of the swarm once per iteration."""
+    def benchmark(swarm: ParticleSwarm, iterations: int) -> callable:
+        method: callable = getattr(swarm, operation)
+        def run() -> None:
+            for _ in range(iterations):
+                method()
+        return run
+    return benchmark
+
+def history_benchmark(swarm: ParticleSwarm, iterations: int) -> callable:
+    return lambda: record_history(swarm, iterations)
+
+def append_optimization(engine: str) -> callable:
+    """Returns a benchmark that stores the history in a new session with
+    the given engine, until its workbook is complete on disk."""
+    def benchmark(swarm: ParticleSwarm, iterations: int) -> callable:
+        history: History = record_history(swarm, iterations)
+        gbest_indexes: list[int] = history.get_gbest_indexes().tolist()
+        def run() -> None:
+            data: Data = Data(f"benchmark_{engine}", engine=engine)
+            data.append_gbest_indexes(gbest_indexes)
+            data.append_optimization(history)
+            # * xlsxwriter only builds the workbook when the session is closed
+            data.close()
+            # * So the next run starts a new file instead of loading this one
+            os.remove(f"database/optimization_results/benchmark_{engine}.xlsx")
+        return run
+    return benchmark
+
+BENCHMARKS: dict[str, callable] = {
+    "velocity_update": per_iteration("_update_velocities"),
+    "position_update": per_iteration("_update_positions"),
+    "evaluation": per_iteration("_evaluate"),
+    "update_gbest": per_iteration("update_gbest"),
+    "history_recording": history_benchmark,
+    **{f"append_optimization_{engine}": append_optimization(engine) for engine in ENGINES}}
+
+# * The benchmarks whose cost grows with the number of recorded rows
+ROW_BOUND: tuple[str, ...] = ("history_recording",) + tuple(f"append_optimization_{engine}" for engine in ENGINES)
+
+def measure(run: callable, repeats: int) -> dict:
+    """Returns the best and median time of repeats calls of run, after a
+    warm up call."""
+    run()
+    times: list[float] = []
+    for _ in range(repeats):
+        start: float = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    return {"best_seconds": min(times), "median_seconds": statistics.median(times), "repeats": repeats}
+
+def run_benchmarks(names: list[str], particles: list[int], dimensions: list[int], iterations: list[int], repeats: int, max_rows: int) -> list[dict]:
+    results: list[dict] = []
+    for name in names:
+        for particle_amount in particles:
+            for dimension_amount in dimensions:
+                for iteration_amount in iterations:
+                    result: dict = {"benchmark": name, "particles": particle_amount,
+                        "dimensions": dimension_amount, "iterations": iteration_amount}
+                    rows: int = (particle_amount + 1) * (iteration_amount + 1)
+                    if name in ROW_BOUND and rows > max_rows:
+                        result["skipped"] = f"{rows} rows (more than --max-rows)"
+                    else:
+                        swarm: ParticleSwarm = make_swarm(particle_amount, dimension_amount)
+                        result.update(measure(BENCHMARKS[name](swarm, iteration_amount), repeats))
+                    results.append(result)
+                    print(format_result(result))
+    return results
+
+def format_result(result: dict) -> str:
+    label: str = f"{result['benchmark']:>32} N={result['particles']:<6} D={result['dimensions']:<6} T={result['iterations']:<6}"
+    if "skipped" in result:
+        return f"{label} skipped: {result['skipped']}"
+    return f"{label} best {1000 * result['best_seconds']:>10.3f} ms  median {1000 * result['median_seconds']:>10.3f} ms"
+
+def key(result: dict) -> tuple:
+    return result["benchmark"], result["particles"], result["dimensions"], result["iterations"]
+
+def compare(results: list[dict], baseline: list[dict], threshold: float) -> list[dict]:
+    """Returns the comparison of every measurement that is also in the
+    baseline, with the ratio of the best times and if it is a regression."""
+    baseline_by_key: dict = {key(result): result for result in baseline if "best_seconds" in result}
+    comparisons: list[dict] = []
+    for result in results:
+        previous: dict = baseline_by_key.get(key(result))
+        if previous is None or "best_seconds" not in result:
+            continue
+        ratio: float = result["best_seconds"] / previous["best_seconds"]
+        comparisons.append({"benchmark": result["benchmark"], "particles": result["particles"],
+            "dimensions": result["dimensions"], "iterations": result["iterations"],
+            "baseline_seconds": previous["best_seconds"], "best_seconds": result["best_seconds"],
+            "ratio": ratio, "regression": ratio > 1 + threshold})
+    return comparisons
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--benchmarks", nargs="+", choices=list(BENCHMARKS), default=list(BENCHMARKS))
+    parser.add_argument("--particles", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--dimensions", type=int, nargs="+", default=[2, 30, 300])
+    parser.add_argument("--iterations", type=int, nargs="+", default=[10, 100])
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--max-rows", type=int, default=20000,
+        help="skip the history benchmarks that would record more rows than this")
+    parser.add_argument("--output", help="where to write the results as JSON")
+    parser.add_argument("--baseline", help="a previous results file to compare with")
+    parser.add_argument("--threshold", type=float, default=0.2,
+        help="relative slowdown of the best time that counts as a regression")
+    arguments = parser.parse_args()
+
+    # * Data writes to database/optimization_results, so it runs in a scratch directory
+    working_directory: str = os.getcwd()
+    with tempfile.TemporaryDirectory() as scratch:
+        os.chdir(scratch)
+        os.mkdir("database")
+        try:
+            results: list[dict] = run_benchmarks(arguments.benchmarks, arguments.particles, arguments.dimensions,
+                arguments.iterations, arguments.repeats, arguments.max_rows)
+        finally:
+            os.chdir(working_directory)
+
+    report: dict = {
+        "metadata": {
+            "date": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(), "numpy": np.__version__, "pandas": pd.__version__,
+            "platform": platform.platform(), "processor": platform.processor()},
+        "results": results}
+    regressions: list[dict] = []
+    if arguments.baseline is not None:
+        with open(arguments.baseline) as baseline_file:
+            baseline: list[dict] = json.load(baseline_file)["results"]
+        report["comparison"] = compare(results, baseline, arguments.threshold)
+        report["threshold"] = arguments.threshold
+        regressions = [comparison for comparison in report["comparison"] if comparison["regression"]]
+        print(f"\n{len(report['comparison'])} measurements compared, {len(regressions)} regressions (threshold {arguments.threshold:.0%})")
+        for comparison in regressions:
+            print(f"{comparison['benchmark']:>32} N={comparison['particles']:<6} D={comparison['dimensions']:<6} T={comparison['iterations']:<6} {comparison['ratio']:.2f}x slower")
+    if arguments.output is not None:
+        with open(arguments.output, "w") as output_file:
+            json.dump(report, output_file, indent=2)
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
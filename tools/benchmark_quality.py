@@ -0,0 +1,208 @@
+"""
+Quality versus cost benchmark of the optimizer: how many heuristic
+evaluations (and how much wall time) it needs to get within fixed target
+precisions of the known optimum of the benchmark functions.
+
+Every function of the set is optimized in every dimension several times
+with independent seeds (child streams of --seed). A run stops when it
+reaches the smallest target precision or runs out of iterations, and the
+first evaluation count and time at which each target was reached are
+recorded. For every function, dimension and target the report shows:
+- The success rate: the fraction of runs that reached the target.
+- The expected running time (ERT): the evaluations (or seconds) spent by
+all the runs until they reached the target or gave up, divided by the
+number of successful runs (inf if none succeeded).
+- An empirical cumulative distribution (ECDF) table: the fraction of
+(run, target) pairs reached within increasing evaluation budgets.
+
+The results (every run included) are saved as JSON, and a previous results
+file can be given with --compare to show both side by side, so two
+versions of the engine or two configurations can be compared directly.
+
+With --surrogate every run evaluates through a SurrogateEvaluator (its
+parameters as a JSON object). The evaluations counted are the true ones,
+so comparing with a serial run shows how many evaluations the surrogate
+saves at each precision, and the report adds the model fits per run.
+
+Run from the root of the repository:
+
+    python tools/benchmark_quality.py --output before.json
+    python tools/benchmark_quality.py --parameters '{"inertia_coefficient": 0.5}' --compare before.json
+    python tools/benchmark_quality.py --surrogate '{"refit_interval": 3}' --label surrogate --compare before.json
+"""
+
+import argparse
+import contextlib
+import datetime
+import json
+import math
+import os
+import platform
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pso.evaluation.surrogate import SurrogateEvaluator
+from pso.optimization import Optimization
+from pso.vector.benchmarks import BenchmarkFunction, get_benchmark, get_benchmark_names
+
+def target_key(precision: float) -> str:
+    return f"{precision:g}"
+
+def run_once(function: str, dimensions: int, seed: np.random.SeedSequence, targets: list[float], particles: int, iterations: int, parameters: dict, surrogate: dict = None) -> dict:
+    """Runs a single optimization and returns when it reached every target."""
+    benchmark: BenchmarkFunction = get_benchmark(function)
+    optimum: float = benchmark.get_optimum_value(dimensions)
+    hits: dict = {target_key(precision): None for precision in targets}
+    evaluator: SurrogateEvaluator = SurrogateEvaluator(**surrogate) if surrogate is not None else None
+    start: float = time.perf_counter()
+    optimization: Optimization = Optimization(0, None, particle_amount=particles, dimensions=dimensions + 1,
+        iterations=iterations, seed=seed, heuristic=function, evaluator=evaluator, **parameters)
+    # * Closed when the smallest target is reached, which ends the run early
+    with contextlib.closing(optimization.iterate()) as snapshots:
+        for snapshot in snapshots:
+            error: float = snapshot.get_gbest_fitness() - optimum
+            elapsed: float = time.perf_counter() - start
+            for precision in targets:
+                if hits[target_key(precision)] is None and error <= precision:
+                    hits[target_key(precision)] = {"evaluations": snapshot.get_evaluation_count(), "seconds": elapsed,
+                        "iteration": snapshot.get_iteration()}
+            if hits[target_key(min(targets))] is not None:
+                break
+    run: dict = {"function": function, "dimensions": dimensions, "final_error": float(error),
+        "evaluations": snapshot.get_evaluation_count(), "seconds": time.perf_counter() - start,
+        "iterations": snapshot.get_iteration(), "hits": hits}
+    if evaluator is not None:
+        run["fits"] = evaluator.get_fit_count()
+    return run
+
+def summarize(runs: list[dict], targets: list[float]) -> list[dict]:
+    """Returns the success rate and ERT of every function, dimension and target."""
+    summary: list[dict] = []
+    groups: dict = {}
+    for run in runs:
+        groups.setdefault((run["function"], run["dimensions"]), []).append(run)
+    for (function, dimensions), group in groups.items():
+        for precision in targets:
+            hits: list[dict] = [run["hits"][target_key(precision)] for run in group]
+            successes: int = sum(hit is not None for hit in hits)
+            # * Successful runs count until they hit the target, the others until they gave up
+            spent_evaluations: float = sum(hit["evaluations"] if hit is not None else run["evaluations"] for hit, run in zip(hits, group))
+            spent_seconds: float = sum(hit["seconds"] if hit is not None else run["seconds"] for hit, run in zip(hits, group))
+            summary.append({"function": function, "dimensions": dimensions, "target": precision,
+                "runs": len(group), "success_rate": successes / len(group),
+                "ert_evaluations": spent_evaluations / successes if successes else math.inf,
+                "ert_seconds": spent_seconds / successes if successes else math.inf})
+    return summary
+
+def ecdf(runs: list[dict], targets: list[float], budgets: list[int]) -> dict:
+    """Returns, for every function and dimension (and all of them together),
+    the fraction of (run, target) pairs reached within each budget."""
+    groups: dict = {"all": runs}
+    for run in runs:
+        groups.setdefault(f"{run['function']} D={run['dimensions']}", []).append(run)
+    table: dict = {}
+    for name, group in groups.items():
+        reached: np.ndarray = np.array([run["hits"][target_key(precision)]["evaluations"]
+            if run["hits"][target_key(precision)] is not None else np.inf
+            for run in group for precision in targets])
+        table[name] = [float(np.mean(reached <= budget)) for budget in budgets]
+    return table
+
+def print_summary(summary: list[dict], baseline: list[dict] = None) -> None:
+    baseline_by_key: dict = {(row["function"], row["dimensions"], row["target"]): row for row in baseline or []}
+    header: str = f"{'function':>16} {'D':>5} {'target':>8} {'success':>8} {'ERT evals':>12} {'ERT s':>10}"
+    if baseline is not None:
+        header += f" {'base succ':>10} {'base ERT':>12} {'ratio':>7}"
+    print(header)
+    for row in summary:
+        line: str = (f"{row['function']:>16} {row['dimensions']:>5} {row['target']:>8g} {row['success_rate']:>8.0%}"
+            f" {row['ert_evaluations']:>12.1f} {row['ert_seconds']:>10.4f}")
+        previous: dict = baseline_by_key.get((row["function"], row["dimensions"], row["target"]))
+        if previous is not None:
+            ratio: float = row["ert_evaluations"] / previous["ert_evaluations"] if math.isfinite(previous["ert_evaluations"]) else math.nan
+            line += f" {previous['success_rate']:>10.0%} {previous['ert_evaluations']:>12.1f} {ratio:>7.2f}"
+        print(line)
+
+def print_ecdf(table: dict, budgets: list[int]) -> None:
+    print(f"\n{'ECDF (budget in evaluations)':>28}" + "".join(f"{budget:>9}" for budget in budgets))
+    for name, fractions in table.items():
+        print(f"{name:>28}" + "".join(f"{fraction:>9.2f}" for fraction in fractions))
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--functions", nargs="+", choices=get_benchmark_names(),
+        default=["sphere", "rastrigin", "rosenbrock", "ackley", "griewank"])
+    parser.add_argument("--dimensions", type=int, nargs="+", default=[2, 10])
+    parser.add_argument("--runs", type=int, default=15)
+    parser.add_argument("--particles", type=int, default=30)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--targets", type=float, nargs="+", default=[1e1, 1e0, 1e-1, 1e-2, 1e-4, 1e-8],
+        help="precisions (distance to the optimum value) to reach")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--parameters", default="{}",
+        help="other parameters of Optimization as a JSON object")
+    parser.add_argument("--surrogate", help="parameters of a SurrogateEvaluator as a JSON object, to evaluate through it")
+    parser.add_argument("--label", default="", help="a name for this configuration or version")
+    parser.add_argument("--output", help="where to write the results as JSON")
+    parser.add_argument("--compare", help="a previous results file to compare with")
+    arguments = parser.parse_args()
+    parameters: dict = json.loads(arguments.parameters)
+    surrogate: dict = json.loads(arguments.surrogate) if arguments.surrogate is not None else None
+
+    cases: list[tuple[str, int]] = []
+    for function in arguments.functions:
+        for dimensions in arguments.dimensions:
+            benchmark: BenchmarkFunction = get_benchmark(function)
+            if not benchmark.supports(dimensions) or benchmark.get_optimum_value(dimensions) is None:
+                print(f"Skipping {function} in {dimensions} dimensions (not supported or unknown optimum).")
+                continue
+            cases.append((function, dimensions))
+
+    # * Every case gets the same independent seeds, so configurations are compared on equal terms
+    seeds: list[np.random.SeedSequence] = np.random.SeedSequence(arguments.seed).spawn(arguments.runs)
+    runs: list[dict] = []
+    for function, dimensions in cases:
+        for seed_index, seed in enumerate(seeds):
+            run: dict = run_once(function, dimensions, seed, arguments.targets, arguments.particles, arguments.iterations, parameters, surrogate)
+            run["seed_index"] = seed_index
+            runs.append(run)
+        print(f"{function} D={dimensions}: {arguments.runs} runs done")
+
+    targets: list[float] = sorted(arguments.targets, reverse=True)
+    summary: list[dict] = summarize(runs, targets)
+    maximum_budget: int = arguments.particles * (arguments.iterations + 1)
+    budgets: list[int] = sorted({int(budget) for budget in np.geomspace(arguments.particles, maximum_budget, 10)})
+    table: dict = ecdf(runs, targets, budgets)
+
+    baseline: dict = None
+    if arguments.compare is not None:
+        with open(arguments.compare) as baseline_file:
+            baseline = json.load(baseline_file)
+        print(f"\nComparing '{arguments.label}' with '{baseline.get('label', '')}' ({arguments.compare})")
+    print()
+    print_summary(summary, baseline["summary"] if baseline is not None else None)
+    print_ecdf(table, budgets)
+    if surrogate is not None:
+        print(f"\nSurrogate model fits per run: {np.mean([run['fits'] for run in runs]):.1f}")
+
+    if arguments.output is not None:
+        report: dict = {
+            "label": arguments.label,
+            "metadata": {
+                "date": datetime.datetime.now().isoformat(timespec="seconds"),
+                "python": platform.python_version(), "numpy": np.__version__, "platform": platform.platform()},
+            "configuration": {"functions": arguments.functions, "dimensions": arguments.dimensions,
+                "runs": arguments.runs, "particles": arguments.particles, "iterations": arguments.iterations,
+                "seed": arguments.seed, "parameters": parameters, "surrogate": surrogate},
+            "targets": targets, "budgets": budgets,
+            "summary": summary, "ecdf": table, "runs": runs}
+        with open(arguments.output, "w") as output_file:
+            # * inf is written as Infinity, which json.load reads back
+            json.dump(report, output_file, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Opens a memory-mapped history (see Optimization's memory_mapped_history)
+without loading it and prints its header and a range of its iterations.
+
+Only the pages of the sliced iterations are read from disk, so this works
+on histories larger than the memory.
+
+Run from the root of the repository:
+
+    python tools/inspect_history.py database/optimization_results/test/optimization_1
+    python tools/inspect_history.py database/optimization_results/test/optimization_1 --start 100 --stop 110 --table
+
+The range is given in iterations of the run, which are not the rows of the
+history when it was recorded with a decimated or final state policy.
+"""
+
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pso.history import History
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("directory", help="the directory of the history")
+    parser.add_argument("--start", type=int, default=0, help="first iteration of the run to show")
+    parser.add_argument("--stop", type=int, help="iteration of the run after the last one to show (default: the last recorded)")
+    parser.add_argument("--table", action="store_true", help="print the iterations in the layout of the workbook")
+    arguments = parser.parse_args()
+
+    history: History = History.open(arguments.directory)
+    print(json.dumps(history.get_metadata(), indent=2))
+    # * The rows of the recorded iterations in the range (one number per row, so reading them all is cheap)
+    iteration_numbers: np.ndarray = np.asarray(history.get_iteration_numbers())
+    start: int = int(np.searchsorted(iteration_numbers, arguments.start))
+    stop: int = iteration_numbers.shape[0] if arguments.stop is None else int(np.searchsorted(iteration_numbers, arguments.stop))
+
+    # * Slicing the memory-mapped arrays only reads the iterations asked for
+    fitness: np.ndarray = history.get_fitness()[start:stop]
+    gbest_indexes: np.ndarray = history.get_gbest_indexes()[start:stop]
+    print(f"\n{'iteration':>10} {'best':>14} {'mean':>14} {'worst':>14} {'gbest particle':>15}")
+    for offset in range(stop - start):
+        print(f"{iteration_numbers[start + offset]:>10} {fitness[offset].min():>14.6g} {fitness[offset].mean():>14.6g} {fitness[offset].max():>14.6g} {gbest_indexes[offset]:>15}")
+    if arguments.table:
+        pd.set_option("display.max_columns", None)
+        pd.set_option("display.expand_frame_repr", False)
+        print(history.to_dataframe(start, stop))
+
+if __name__ == "__main__":
+    main()